@@ -0,0 +1,76 @@
+"""Balanced allocation throughput across group counts: indexed selector vs the old linear scan.
+
+Usage: python benchmarks/bench_group_selection.py [--groups 2,10,100,1000] [--animals 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from animal_randomizer.models import ConstraintConfig
+from animal_randomizer.randomization import _GroupSelector
+
+
+def linear_scan(cages, group_names, constraints, rng):
+    """The pre-index ``_choose_group`` loop, kept here for comparison only."""
+
+    counts = {g: 0 for g in group_names}
+    cage_counts = {g: defaultdict(int) for g in group_names}
+    out = []
+    for cage in cages:
+        min_size = min(counts.values())
+        candidates = [g for g in group_names if counts[g] == min_size]
+        if constraints.max_animals_per_cage_per_group is not None:
+            limited = [g for g in candidates if cage_counts[g][cage] < constraints.max_animals_per_cage_per_group]
+            if limited:
+                candidates = limited
+        if constraints.minimize_cage_clustering:
+            min_cage = min(cage_counts[g][cage] for g in candidates)
+            candidates = [g for g in candidates if cage_counts[g][cage] == min_cage]
+        chosen = rng.choice(candidates)
+        counts[chosen] += 1
+        cage_counts[chosen][cage] += 1
+        out.append(chosen)
+    return out
+
+
+def indexed(cages, group_names, constraints, rng):
+    selector = _GroupSelector(group_names, constraints)
+    out = []
+    for cage in cages:
+        chosen = selector.choose(cage, rng)
+        selector.add(chosen, cage)
+        out.append(chosen)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", default="2,10,100,1000")
+    parser.add_argument("--animals", type=int, default=20_000)
+    parser.add_argument("--cage-size", type=int, default=4)
+    args = parser.parse_args()
+
+    constraints = ConstraintConfig(max_animals_per_cage_per_group=1)
+    cages = [f"C{i // args.cage_size}" for i in range(args.animals)]
+    random.Random(0).shuffle(cages)
+
+    print(f"{'groups':>7} {'indexed/s':>14} {'scan/s':>14} {'speedup':>8}")
+    for g in (int(x) for x in args.groups.split(",")):
+        names = [f"G{k}" for k in range(g)]
+        timings = {}
+        results = {}
+        for label, fn in (("indexed", indexed), ("scan", linear_scan)):
+            start = time.perf_counter()
+            results[label] = fn(cages, names, constraints, random.Random(42))
+            timings[label] = time.perf_counter() - start
+        assert results["indexed"] == results["scan"], "selectors diverged"
+        rate = {k: args.animals / v for k, v in timings.items()}
+        print(f"{g:>7} {rate['indexed']:14,.0f} {rate['scan']:14,.0f} {timings['scan'] / timings['indexed']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Input/output hash throughput: ``sha256_of([asdict(...)])`` vs the streaming ``stream_sha256``.
+
+Usage: python benchmarks/bench_hashing.py [--animals 10000,200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from dataclasses import asdict
+
+from animal_randomizer.hashing import sha256_of, stream_sha256
+from animal_randomizer.models import AnimalRecord, AssignmentRecord
+
+
+def cohort(n: int):
+    rng = random.Random(n)
+    animals = [
+        AnimalRecord(
+            f"A{i}", sex=rng.choice("MF"), weight=round(rng.uniform(180, 320), 1), age=10.0, cage=f"C{i // 4}"
+        )
+        for i in range(n)
+    ]
+    return animals, [AssignmentRecord(a.animal_id, f"G{i % 4}") for i, a in enumerate(animals)]
+
+
+def _measure(fn, *args) -> tuple[float, float, str]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    digest = fn(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, digest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--animals", default="10000,200000")
+    args = parser.parse_args()
+
+    print(f"{'animals':>8}  {'records':<11}  {'asdict s':>9}  {'MiB':>7}  {'stream s':>9}  {'MiB':>7}")
+    for n in [int(x) for x in args.animals.split(",")]:
+        animals, assignments = cohort(n)
+        for label, records in (("animals", animals), ("assignments", assignments)):
+            old_s, old_mib, old = _measure(lambda rows: sha256_of([asdict(r) for r in rows]), records)
+            new_s, new_mib, new = _measure(stream_sha256, records)
+            assert old == new
+            print(f"{n:>8}  {label:<11}  {old_s:9.3f}  {old_mib:7.1f}  {new_s:9.3f}  {new_mib:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Import throughput: the importers' CSV read (text dtypes) + column-wise conversion, in rows/second.
+
+Usage: python benchmarks/bench_import.py [--sizes 1000,100000,1000000] [--legacy-max 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from animal_randomizer.io_handlers import _read_animal_frame, animals_from_dataframe, table_from_dataframe
+from animal_randomizer.models import AnimalRecord
+from animal_randomizer.validation import normalize_sex_value
+
+
+def write_registry(path: Path, n: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    pd.DataFrame(
+        {
+            "Animal ID": [f"RAT_{i:07d}" for i in range(n)],
+            "Sex": [rng.choice(["M", "F", "Male", "female", None]) for _ in range(n)],
+            "Weight": [round(rng.uniform(180, 320), 1) for _ in range(n)],
+            "Age": [rng.choice([8, 9, 10, 11]) for _ in range(n)],
+            "Cage": [f"C{i // 4}" for i in range(n)],
+            "Strain": ["Wistar"] * n,
+            "Species": ["Rat"] * n,
+        }
+    ).to_csv(path, index=False)
+
+
+def iterrows_baseline(df: pd.DataFrame) -> list[AnimalRecord]:
+    """The pre-vectorization converter, kept here for comparison only."""
+
+    rows = []
+    for _, row in df.iterrows():
+        rows.append(
+            AnimalRecord(
+                animal_id=str(row.get("Animal ID", "")).strip(),
+                sex=None if pd.isna(row.get("Sex")) else normalize_sex_value(str(row.get("Sex"))),
+                weight=None if pd.isna(row.get("Weight")) else float(row.get("Weight")),
+                age=None if pd.isna(row.get("Age")) else float(row.get("Age")),
+                cage=None if pd.isna(row.get("Cage")) else str(row.get("Cage")),
+                strain=None if pd.isna(row.get("Strain")) else str(row.get("Strain")),
+                species=None if pd.isna(row.get("Species")) else str(row.get("Species")),
+            )
+        )
+    return rows
+
+
+def _rate(fn, path: Path, n: int) -> float:
+    start = time.perf_counter()
+    fn(_read_animal_frame(path))
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="Skip the iterrows baseline above this size")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'records/s':>14} {'table/s':>14} {'iterrows/s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(x) for x in args.sizes.split(",")):
+            path = Path(tmp) / f"registry_{n}.csv"
+            write_registry(path, n)
+            records = _rate(animals_from_dataframe, path, n)
+            table = _rate(table_from_dataframe, path, n)
+            legacy = f"{_rate(iterrows_baseline, path, n):14,.0f}" if n <= args.legacy_max else f"{'-':>14}"
+            print(f"{n:>10,} {records:14,.0f} {table:14,.0f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
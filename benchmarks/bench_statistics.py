@@ -0,0 +1,73 @@
+"""compute_statistics throughput for large cohorts and group counts vs the old per-pair implementation.
+
+Usage: python benchmarks/bench_statistics.py [--animals 10000,200000] [--groups 2,20,200] [--legacy-max 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from itertools import combinations
+from statistics import mean, pstdev
+
+from animal_randomizer.models import AnimalRecord, AssignmentRecord
+from animal_randomizer.stats import _cohens_d, compute_statistics
+from animal_randomizer.table import AnimalTable
+
+
+def per_pair_baseline(animals, assignments):
+    """The pre-vectorization loop (lists per pair, ``statistics`` on each), kept for comparison only."""
+
+    animal_map = {a.animal_id: a for a in animals}
+    by_group = defaultdict(list)
+    for row in assignments:
+        by_group[row.group].append(animal_map[row.animal_id])
+    out = {}
+    for group, rows in by_group.items():
+        weights = [float(a.weight) for a in rows if a.weight is not None]
+        out[group] = (round(mean(weights), 4), round(pstdev(weights), 4))
+    for ga, gb in combinations(sorted(by_group), 2):
+        wa = [float(a.weight) for a in by_group[ga] if a.weight is not None]
+        wb = [float(a.weight) for a in by_group[gb] if a.weight is not None]
+        out[(ga, gb)] = round(_cohens_d(wa, wb), 4)
+    return out
+
+
+def cohort(n: int, groups: int):
+    rng = random.Random(n)
+    animals = [
+        AnimalRecord(f"A{i}", sex=rng.choice("MF"), weight=round(rng.uniform(180, 320), 1), cage=f"C{i // 4}")
+        for i in range(n)
+    ]
+    assignments = [AssignmentRecord(a.animal_id, f"G{i % groups}") for i, a in enumerate(animals)]
+    return animals, assignments
+
+
+def _seconds(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--animals", default="10000,200000")
+    parser.add_argument("--groups", default="2,20,200")
+    parser.add_argument("--legacy-max", type=int, default=20_000, help="Skip the per-pair baseline above this size")
+    args = parser.parse_args()
+
+    print(f"{'animals':>9} {'groups':>7} {'records s':>10} {'table s':>9} {'per-pair s':>11}")
+    for n in (int(x) for x in args.animals.split(",")):
+        for g in (int(x) for x in args.groups.split(",")):
+            animals, assignments = cohort(n, g)
+            table = AnimalTable.from_records(animals)
+            records = _seconds(compute_statistics, animals, assignments)
+            columnar = _seconds(compute_statistics, table, assignments)
+            legacy = f"{_seconds(per_pair_baseline, animals, assignments):11.3f}" if n <= args.legacy_max else f"{'-':>11}"
+            print(f"{n:>9,} {g:>7} {records:10.3f} {columnar:9.3f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
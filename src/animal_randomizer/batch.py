@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .io_handlers import export_assignments, import_animals
+from .models import ConstraintConfig, ProjectModel, RandomizationConfig, StudyMetadata
+from .project_io import save_project
+from .report import generate_html_report
+from .service import RandomizerService
+
+
+@dataclass(slots=True)
+class BatchJob:
+    input: str
+    groups: List[str]
+    output: str
+    method: str = "balanced"
+    seed: Optional[int] = None
+    study_id: Optional[str] = None
+    title: str = "Animal Study"
+    researcher: str = "Unknown"
+    institution: str = "Unknown"
+    stratify_by: List[str] = field(default_factory=list)
+    block_size: Optional[int] = None
+    random_block_sizes: List[int] = field(default_factory=list)
+    max_cage_per_group: Optional[int] = None
+    algorithm_version: str = "1.0.0"
+
+
+@dataclass(slots=True)
+class BatchResult:
+    study_id: str
+    output: str
+    seconds: float
+    seed: Optional[int] = None
+    allocation: Optional[str] = None
+    report: Optional[str] = None
+    project: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _split(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [x.strip() for x in value.split(",") if x.strip()]
+    return [str(x).strip() for x in value]
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return int(value)
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    # JSON manifests may give numbers (e.g. "study_id": 7); everything downstream expects text.
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return str(value)
+
+
+def _job_from_row(row: Dict[str, Any], base: Path, line: int) -> BatchJob:
+    missing = [key for key in ("input", "groups", "output") if not row.get(key)]
+    if missing:
+        raise ValueError(f"Manifest entry {line} is missing: {', '.join(missing)}")
+    return BatchJob(
+        input=str(base / str(row["input"])),
+        groups=_split(row["groups"]),
+        output=str(base / str(row["output"])),
+        method=str(row.get("method") or "balanced"),
+        seed=_optional_int(row.get("seed")),
+        study_id=_optional_str(row.get("study_id")),
+        title=_optional_str(row.get("title")) or "Animal Study",
+        researcher=_optional_str(row.get("researcher")) or "Unknown",
+        institution=_optional_str(row.get("institution")) or "Unknown",
+        stratify_by=_split(row.get("stratify_by")),
+        block_size=_optional_int(row.get("block_size")),
+        random_block_sizes=[int(x) for x in _split(row.get("random_block_sizes"))],
+        max_cage_per_group=_optional_int(row.get("max_cage_per_group")),
+        algorithm_version=str(row.get("algorithm_version") or "1.0.0"),
+    )
+
+
+def load_manifest(path: str | Path) -> List[BatchJob]:
+    """Read one study per JSONL line or CSV row; relative paths resolve against the manifest's folder."""
+
+    path = Path(path)
+    base = path.parent
+    if path.suffix.lower() in {".jsonl", ".ndjson"}:
+        rows = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            rows.append(json.loads(line) if line.strip() else None)
+        return [_job_from_row(row, base, n) for n, row in enumerate(rows, start=1) if row is not None]
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as handle:
+            return [_job_from_row(row, base, n) for n, row in enumerate(csv.DictReader(handle), start=1)]
+    raise ValueError("Batch manifest must be .jsonl, .ndjson, or .csv")
+
+
+def run_job(job: BatchJob) -> BatchResult:
+    """Import, randomize and write allocation CSV, HTML report and ``.nprj`` for one study."""
+
+    started = time.perf_counter()
+    output = Path(job.output)
+    study_id = job.study_id or output.name
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        cfg = RandomizationConfig(
+            method=job.method,
+            group_names=job.groups,
+            seed=job.seed,
+            stratify_by=job.stratify_by,
+            block_size=job.block_size,
+            random_block_sizes=job.random_block_sizes,
+            algorithm_version=job.algorithm_version,
+            constraints=ConstraintConfig(max_animals_per_cage_per_group=job.max_cage_per_group),
+        )
+        meta = StudyMetadata(
+            study_id=study_id,
+            title=job.title,
+            researcher_name=job.researcher,
+            institution=job.institution,
+        )
+        project = ProjectModel(metadata=meta, animals=import_animals(job.input), config=cfg, groups=job.groups)
+        artifacts = RandomizerService().run(project)
+
+        allocation = output.with_name(f"{output.name}.csv")
+        report = output.with_name(f"{output.name}_report.html")
+        project_path = output.with_name(f"{output.name}.nprj")
+        export_assignments(artifacts.assignments, allocation, animals=project.animals)
+        generate_html_report(project, report)
+        save_project(project, project_path)
+    except Exception as exc:
+        return BatchResult(
+            study_id=study_id,
+            output=str(output),
+            seconds=time.perf_counter() - started,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return BatchResult(
+        study_id=study_id,
+        output=str(output),
+        seconds=time.perf_counter() - started,
+        seed=artifacts.seed,
+        allocation=str(allocation),
+        report=str(report),
+        project=str(project_path),
+    )
+
+
+def run_batch(jobs: List[BatchJob], workers: int = 1) -> List[BatchResult]:
+    """Run jobs in input order; ``workers > 1`` uses a process pool whose workers are reused across studies."""
+
+    if workers <= 1 or len(jobs) <= 1:
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(run_job, jobs))
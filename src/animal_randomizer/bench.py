@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import platform
+import random
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from . import __version__
+from .hashing import stream_sha256
+from .io_handlers import export_assignments, import_animals
+from .models import AnimalRecord, ProjectModel, RandomizationConfig, StudyMetadata
+from .project_io import load_project, save_project
+from .randomization import METHODS, randomize
+from .stats import compute_statistics
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    name: str
+    animals: int
+    groups: int
+    seconds: float
+    repeats: int
+
+
+def synthetic_cohort(n: int, seed: int = 0) -> List[AnimalRecord]:
+    """Deterministic cohort of ``n`` animals: mixed sex, uniform weights, four animals per cage, some gaps."""
+
+    rng = random.Random(seed)
+    return [
+        AnimalRecord(
+            animal_id=f"A{i:07d}",
+            sex=rng.choice(("M", "F")),
+            weight=None if rng.random() < 0.02 else round(rng.uniform(180.0, 320.0), 1),
+            age=rng.choice((8.0, 9.0, 10.0, 11.0)),
+            cage=f"C{i // 4}",
+            strain=rng.choice(("Wistar", "Sprague-Dawley")),
+            species="Rat",
+        )
+        for i in range(n)
+    ]
+
+
+def _config(method: str, groups: int) -> RandomizationConfig:
+    return RandomizationConfig(
+        method=method,
+        group_names=[f"G{g}" for g in range(groups)],
+        seed=1,
+        stratify_by=["sex"],
+        block_size=2 * groups,
+    )
+
+
+def _best_of(fn: Callable[[], Any], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(
+    sizes: Sequence[int],
+    group_counts: Sequence[int],
+    methods: Sequence[str] = METHODS,
+    repeats: int = 3,
+    progress: Callable[[BenchmarkResult], None] | None = None,
+) -> List[BenchmarkResult]:
+    """Time every method, statistics, hashing, CSV export/import and project save/load.
+
+    Each measurement is the best of ``repeats`` runs on :func:`synthetic_cohort`.
+    Randomization and statistics run once per group count; hashing and I/O use the
+    first group count only, as they do not depend on it.
+    """
+
+    results: List[BenchmarkResult] = []
+
+    def record(name: str, n: int, groups: int, fn: Callable[[], Any]) -> None:
+        result = BenchmarkResult(name, n, groups, _best_of(fn, repeats), repeats)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        for n in sizes:
+            animals = synthetic_cohort(n)
+            for groups in group_counts:
+                assignments = None
+                for method in methods:
+                    cfg = _config(method, groups)
+                    record(f"randomize:{method}", n, groups, lambda: randomize(animals, cfg))
+                    if assignments is None:
+                        assignments = randomize(animals, cfg)[0]
+                record("statistics", n, groups, lambda: compute_statistics(animals, assignments))
+
+            groups = group_counts[0]
+            cfg = _config("balanced", groups)
+            assignments = randomize(animals, cfg)[0]
+            project = ProjectModel(
+                metadata=StudyMetadata("BENCH", "Benchmark", "bench", "bench"),
+                animals=animals,
+                config=cfg,
+                groups=cfg.group_names,
+                assignments=assignments,
+            )
+            csv_path = folder / "allocation.csv"
+            project_path = folder / "project.nprj"
+            record("hash:input", n, groups, lambda: stream_sha256(animals))
+            record("export:csv", n, groups, lambda: export_assignments(assignments, csv_path, animals=animals))
+            record("import:csv", n, groups, lambda: import_animals(csv_path))
+            record("project:save", n, groups, lambda: save_project(project, project_path))
+            record("project:load", n, groups, lambda: load_project(project_path))
+    return results
+
+
+def results_to_dict(results: Sequence[BenchmarkResult]) -> Dict[str, Any]:
+    return {
+        "software_version": __version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def write_results(results: Sequence[BenchmarkResult], path: str | Path) -> None:
+    Path(path).write_text(json.dumps(results_to_dict(results), indent=2), encoding="utf-8")
+
+
+def load_results(path: str | Path) -> List[BenchmarkResult]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [BenchmarkResult(**row) for row in payload["results"]]
+
+
+def compare_results(
+    current: Sequence[BenchmarkResult], baseline: Sequence[BenchmarkResult], tolerance: float = 0.25
+) -> List[str]:
+    """Benchmarks more than ``tolerance`` (relative) slower than the matching baseline entry."""
+
+    previous = {(r.name, r.animals, r.groups): r.seconds for r in baseline}
+    regressions = []
+    for r in current:
+        before = previous.get((r.name, r.animals, r.groups))
+        if before and r.seconds > before * (1.0 + tolerance):
+            regressions.append(
+                f"{r.name} (animals={r.animals}, groups={r.groups}): {before:.4f}s -> {r.seconds:.4f}s "
+                f"(+{(r.seconds / before - 1.0) * 100:.0f}%)"
+            )
+    return regressions
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of finished runs.
+
+    Entries are JSON files named by ``sha256(input_hash:config_hash:algorithm_version)``,
+    so only a byte-identical cohort and configuration (including the seed) under the
+    same engine version can hit. Entries older than ``max_age_seconds`` are dropped,
+    and after each write the least recently used entries are evicted until the folder
+    holds at most ``max_bytes``. With ``verify`` the service recomputes on every hit
+    and replaces entries that disagree with the fresh result. Eviction and ``clear``
+    only touch files named like an entry, so the folder may be shared with other files.
+    """
+
+    SUFFIX = ".json"
+    _KEY = re.compile(r"[0-9a-f]{64}")
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = 512 * 2**20,
+        max_age_seconds: float | None = 30 * 24 * 3600,
+        verify: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.verify = verify
+
+    @staticmethod
+    def key(input_hash: str, config_hash: str, algorithm_version: str) -> str:
+        return hashlib.sha256(f"{input_hash}:{config_hash}:{algorithm_version}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        if not self._KEY.fullmatch(key):
+            raise ValueError(f"Not a cache key: {key!r}")
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def _entries(self) -> Iterator[Path]:
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            if self._KEY.fullmatch(path.name[: -len(self.SUFFIX)]):
+                yield path
+
+    def _expired(self, modified: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - modified > self.max_age_seconds
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            if self._expired(path.stat().st_mtime, time.time()):
+                path.unlink(missing_ok=True)
+                return None
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        # The modification time doubles as the last-use time for eviction.
+        os.utime(path)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        payload = json.dumps({**entry, "key": key}, ensure_ascii=True)
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as out:
+                out.write(payload)
+            os.replace(temp, self._path(key))
+        except BaseException:
+            Path(temp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self._expired(stat.st_mtime, now):
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
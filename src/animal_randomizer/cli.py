@@ -1,28 +1,68 @@
 from __future__ import annotations
 
 import argparse
+import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
+from typing import List, Optional
 
-from .io_handlers import export_assignments, export_interop_bundle, import_animals
-from .models import ConstraintConfig, ProjectModel, RandomizationConfig, StudyMetadata
-from .project_io import save_project
+from .batch import load_manifest, run_batch
+from .bench import compare_results, load_results, run_benchmarks, write_results
+from .cache import ResultCache
+from .io_handlers import export_assignments, export_interop_bundle, import_animals, stream_animals
+from .models import (
+    ConstraintConfig,
+    OptimizerConfig,
+    ProjectModel,
+    RandomizationConfig,
+    RerandomizationConfig,
+    StudyMetadata,
+)
+from .profiling import StageProfiler
+from .project_io import diff_projects, save_project
+from .randomization import ALGORITHM_VERSIONS, METHODS
 from .report import generate_html_report
+from .sequence import SequenceTable, write_sequence
 from .service import RandomizerService
 
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Neuroprocessing Randomizer CLI")
-    p.add_argument("--input", required=True, help="Input CSV/XLSX animal file")
+    p.add_argument("--input", required=True, help="Input CSV/XLSX/Parquet/Feather animal file")
+    p.add_argument("--stream", action="store_true", help="Read and validate the input in chunks (CSV/XLSX).")
+    p.add_argument("--chunk-size", type=int, default=50_000, help="Rows per chunk with --stream")
     p.add_argument("--study-id", required=True)
     p.add_argument("--title", default="Animal Study")
     p.add_argument("--researcher", default="Unknown")
     p.add_argument("--institution", default="Unknown")
-    p.add_argument("--method", choices=["simple", "balanced", "stratified", "block"], default="balanced")
+    p.add_argument("--method", choices=METHODS, default="balanced")
     p.add_argument("--groups", required=True, help="Comma-separated group names")
     p.add_argument("--seed", type=int, default=None)
     p.add_argument("--stratify-by", default="", help="Comma-separated fields: sex,cage,weight,age")
     p.add_argument("--block-size", type=int, default=None)
+    p.add_argument(
+        "--algorithm-version",
+        choices=ALGORITHM_VERSIONS,
+        default="1.0.0",
+        help=(
+            "Engine version; 1.1.0 orders strata by integer-coded field levels, 1.2.0 adds per-stratum RNG streams, "
+            "1.3.0 enforces the cage cap exactly"
+        ),
+    )
     p.add_argument("--random-block-sizes", default="", help="e.g. 4,6,8")
+    p.add_argument("--rerandomize", type=int, default=None, metavar="N", help="Evaluate up to N candidate allocations")
+    p.add_argument("--max-weight-d", type=float, default=None, help="Accept the first candidate with max |d| <= this")
+    p.add_argument(
+        "--optimize",
+        type=int,
+        default=None,
+        metavar="MOVES",
+        help="Refine the allocation with MOVES simulated-annealing swaps (weight, age, sex, cage balance)",
+    )
+    p.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for rerandomization and 1.2.0 strata/blocks"
+    )
     p.add_argument("--max-cage-per-group", type=int, default=None)
     p.add_argument("--no-minimize-cage", action="store_true")
     p.add_argument("--no-weight-balance", action="store_true")
@@ -30,12 +70,180 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--out-report", default="allocation_report.html")
     p.add_argument("--out-project", default="study.nprj")
     p.add_argument("--export-bundle", action="store_true", help="Also export Excel/TSV/Prism-compatible files.")
+    p.add_argument("--bundle-columnar", action="store_true", help="Add Parquet/Feather files to the bundle.")
+    p.add_argument(
+        "--cache-dir", default=None, help="Reuse results of identical runs (same animals, config and seed) from here"
+    )
+    p.add_argument("--cache-verify", action="store_true", help="Recompute cached results and replace stale ones")
+    p.add_argument("--cache-max-mb", type=float, default=512.0, help="Evict least recently used entries above this")
+    p.add_argument(
+        "--profile", action="store_true", help="Print wall/CPU time and peak memory for each stage of the run"
+    )
+    return p
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="animal-randomizer batch",
+        description="Randomize many studies listed in a JSONL/CSV manifest",
+    )
+    p.add_argument(
+        "manifest",
+        help="One study per line/row with input, groups, output (stem) and optional method, seed, study_id, "
+        "stratify_by, block_size, random_block_sizes, max_cage_per_group, algorithm_version",
+    )
+    p.add_argument("--jobs", type=int, default=1, help="Studies to run concurrently")
+    return p
+
+
+def batch_main(argv: List[str]) -> None:
+    args = build_batch_parser().parse_args(argv)
+    jobs = load_manifest(args.manifest)
+    started = time.perf_counter()
+    results = run_batch(jobs, workers=args.jobs)
+    elapsed = time.perf_counter() - started
+
+    width = max([len(r.study_id) for r in results] + [5])
+    print(f"{'Study':<{width}}  {'Seed':>10}  {'Seconds':>8}  Status")
+    for r in results:
+        status = "OK" if r.error is None else f"FAILED {r.error}"
+        seed = "" if r.seed is None else str(r.seed)
+        print(f"{r.study_id:<{width}}  {seed:>10}  {r.seconds:8.2f}  {status}")
+    failed = sum(r.error is not None for r in results)
+    print(f"[OK] {len(results) - failed}/{len(results)} studies completed in {elapsed:.2f}s with --jobs {args.jobs}")
+    if failed:
+        raise SystemExit(1)
+
+
+def build_sequence_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="animal-randomizer sequence",
+        description="Pre-generate a permuted-block allocation sequence table, or look up entries in one",
+    )
+    commands = p.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Write a binary sequence table")
+    generate.add_argument("output", help="Sequence table file to write")
+    generate.add_argument("--count", type=int, required=True, help="Number of enrollment slots")
+    generate.add_argument("--groups", required=True, help="Comma-separated group names")
+    generate.add_argument("--seed", type=int, default=None)
+    generate.add_argument("--block-size", type=int, default=None)
+    generate.add_argument("--random-block-sizes", default="", help="e.g. 4,6,8")
+    generate.add_argument("--algorithm-version", default="1.0.0", choices=ALGORITHM_VERSIONS)
+    query = commands.add_parser("query", help="Print the header, or the groups at the given indices")
+    query.add_argument("table", help="Sequence table file")
+    query.add_argument("indices", nargs="*", type=int, help="0-based enrollment indices")
     return p
 
 
-def main() -> None:
-    args = build_parser().parse_args()
-    animals = import_animals(args.input)
+def sequence_main(argv: List[str]) -> None:
+    args = build_sequence_parser().parse_args(argv)
+    if args.command == "generate":
+        cfg = RandomizationConfig(
+            method="block",
+            group_names=[x.strip() for x in args.groups.split(",") if x.strip()],
+            seed=args.seed,
+            block_size=args.block_size,
+            random_block_sizes=[int(x.strip()) for x in args.random_block_sizes.split(",") if x.strip()],
+            algorithm_version=args.algorithm_version,
+        )
+        header = write_sequence(args.output, args.count, cfg)
+        print(f"[OK] Sequence table: {Path(args.output).resolve()} ({header.count} entries, Seed={header.seed})")
+        return
+    with SequenceTable(args.table) as table:
+        if not args.indices:
+            header = table.header
+            print(f"Entries: {header.count}")
+            print(f"Groups: {', '.join(header.group_names)}")
+            print(f"Seed: {header.seed}")
+            print(f"Algorithm version: {header.algorithm_version}")
+            print(f"Config hash: {header.config_hash}")
+            return
+        try:
+            for index in args.indices:
+                print(f"{index}\t{table[index]}")
+        except IndexError as exc:
+            raise SystemExit(f"[ERROR] {exc}") from exc
+
+
+def bench_main(argv: List[str]) -> None:
+    p = argparse.ArgumentParser(
+        prog="animal-randomizer bench",
+        description="Time randomization, statistics, hashing and I/O on synthetic cohorts",
+    )
+    p.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated cohort sizes")
+    p.add_argument("--groups", default="2,8", help="Comma-separated group counts")
+    p.add_argument("--methods", default=",".join(METHODS), help="Comma-separated randomization methods")
+    p.add_argument("--repeats", type=int, default=3, help="Runs per measurement; the fastest is kept")
+    p.add_argument("--output", default="bench_results.json", help="JSON results file")
+    p.add_argument("--compare", default=None, metavar="BASELINE", help="Earlier results file to check against")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    args = p.parse_args(argv)
+
+    methods = [x.strip() for x in args.methods.split(",") if x.strip()]
+    unknown = sorted(set(methods) - set(METHODS))
+    if unknown:
+        p.error(f"unknown methods: {', '.join(unknown)}")
+
+    def show(result) -> None:
+        print(f"{result.name:<24}  {result.animals:>9}  {result.groups:>6}  {result.seconds:10.4f}")
+
+    print(f"{'Benchmark':<24}  {'Animals':>9}  {'Groups':>6}  {'Seconds':>10}")
+    results = run_benchmarks(
+        [int(x) for x in args.sizes.split(",") if x.strip()],
+        [int(x) for x in args.groups.split(",") if x.strip()],
+        methods,
+        repeats=args.repeats,
+        progress=show,
+    )
+    write_results(results, args.output)
+    print(f"[OK] Results: {Path(args.output).resolve()}")
+    if args.compare:
+        regressions = compare_results(results, load_results(args.compare), args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"[OK] No benchmark slower than {args.compare} by more than {args.tolerance:.0%}")
+
+
+def diff_main(argv: List[str]) -> None:
+    p = argparse.ArgumentParser(
+        prog="animal-randomizer diff", description="List animals and assignments that differ between two projects"
+    )
+    p.add_argument("old", help="Earlier .nprj file")
+    p.add_argument("new", help="Later .nprj file")
+    args = p.parse_args(argv)
+    differences = diff_projects(args.old, args.new)
+    for section, diff in differences.items():
+        for label, ids in (("added", diff.added), ("removed", diff.removed), ("changed", diff.changed)):
+            for animal_id in ids:
+                print(f"{section}\t{label}\t{animal_id}")
+    if not any(d.added or d.removed or d.changed for d in differences.values()):
+        print("[OK] No differences")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["batch"]:
+        batch_main(argv[1:])
+        return
+    if argv[:1] == ["bench"]:
+        bench_main(argv[1:])
+        return
+    if argv[:1] == ["diff"]:
+        diff_main(argv[1:])
+        return
+    if argv[:1] == ["sequence"]:
+        sequence_main(argv[1:])
+        return
+    args = build_parser().parse_args(argv)
+    profiler = StageProfiler() if args.profile else None
+
+    def stage(name: str):
+        return profiler.stage(name) if profiler is not None else nullcontext()
+
+    with stage("import"):
+        animals = stream_animals(args.input, chunksize=args.chunk_size) if args.stream else import_animals(args.input)
 
     group_names = [x.strip() for x in args.groups.split(",") if x.strip()]
     stratify_by = [x.strip() for x in args.stratify_by.split(",") if x.strip()]
@@ -48,6 +256,7 @@ def main() -> None:
         stratify_by=stratify_by,
         block_size=args.block_size,
         random_block_sizes=random_block_sizes,
+        algorithm_version=args.algorithm_version,
         constraints=ConstraintConfig(
             max_animals_per_cage_per_group=args.max_cage_per_group,
             minimize_cage_clustering=not args.no_minimize_cage,
@@ -62,20 +271,34 @@ def main() -> None:
     )
     project = ProjectModel(metadata=meta, animals=animals, config=cfg, groups=group_names)
 
-    service = RandomizerService()
-    artifacts = service.run(project)
+    rerandomization = None
+    if args.rerandomize is not None:
+        rerandomization = RerandomizationConfig(candidates=args.rerandomize, max_abs_weight_d=args.max_weight_d)
+
+    optimizer = OptimizerConfig(moves=args.optimize) if args.optimize is not None else None
 
-    export_assignments(artifacts.assignments, args.out_alloc, animals=project.animals)
-    generate_html_report(project, args.out_report)
-    save_project(project, args.out_project)
+    cache = None
+    if args.cache_dir:
+        cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 2**20), verify=args.cache_verify)
+    service = RandomizerService(profiler=profiler, cache=cache)
+    artifacts = service.run(project, rerandomization=rerandomization, workers=args.workers, optimizer=optimizer)
+
+    with stage("export"):
+        export_assignments(artifacts.assignments, args.out_alloc, animals=project.animals)
+    with stage("report"):
+        generate_html_report(project, args.out_report)
+    with stage("save"):
+        save_project(project, args.out_project)
 
     if args.export_bundle:
-        bundle_paths = export_interop_bundle(
-            artifacts.assignments,
-            animals=project.animals,
-            output_dir=Path(args.out_alloc).parent,
-            stem=Path(args.out_alloc).stem,
-        )
+        with stage("bundle"):
+            bundle_paths = export_interop_bundle(
+                artifacts.assignments,
+                animals=project.animals,
+                output_dir=Path(args.out_alloc).parent,
+                stem=Path(args.out_alloc).stem,
+                columnar=args.bundle_columnar,
+            )
         print("[OK] Interop bundle exported:")
         for key, value in bundle_paths.items():
             print(f"  - {key}: {value.resolve()}")
@@ -84,6 +307,8 @@ def main() -> None:
     print(f"[OK] Allocation file: {Path(args.out_alloc).resolve()}")
     print(f"[OK] Report file: {Path(args.out_report).resolve()}")
     print(f"[OK] Project file: {Path(args.out_project).resolve()}")
+    if profiler is not None:
+        print(profiler.format())
 
 
 if __name__ == "__main__":
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import hashlib
 import json
-from dataclasses import asdict, is_dataclass
-from typing import Any
+from functools import lru_cache
+from operator import attrgetter
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
+from typing import Any, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from .table import AnimalTable
 
 
 def to_canonical_json(value: Any) -> str:
     """Serialize in a deterministic JSON format for reproducibility hashing."""
 
-    if is_dataclass(value):
+    if isinstance(value, AnimalTable):
+        value = [asdict(a) for a in value]
+    elif is_dataclass(value):
         value = asdict(value)
     return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=True, default=str)
 
@@ -17,3 +25,244 @@ def to_canonical_json(value: Any) -> str:
 def sha256_of(value: Any) -> str:
     payload = to_canonical_json(value).encode("utf-8")
     return hashlib.sha256(payload).hexdigest()
+
+
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=True, default=str)
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+def _json_key(key: Any) -> str:
+    # The conversions json.dumps applies to non-string keys.
+    if isinstance(key, str):
+        return key
+    if key is True or key is False or key is None or isinstance(key, float):
+        return _ENCODER.encode(key)
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+@lru_cache(maxsize=None)
+def _field_getter(cls: type) -> tuple[tuple[str, ...], attrgetter]:
+    names = tuple(f.name for f in fields(cls))
+    return names, attrgetter(*names)
+
+
+def _flat_dataclass_json(value: Any) -> str | None:
+    """One-piece encoding of a dataclass whose fields are all plain scalars, else ``None``."""
+
+    if not is_dataclass(value) or isinstance(value, type):
+        return None
+    names, getter = _field_getter(type(value))
+    values = getter(value) if len(names) > 1 else (getter(value),)
+    if not _SCALARS.issuperset(map(type, values)):
+        return None
+    return _ENCODER.encode(dict(zip(names, values)))
+
+
+def iter_canonical_json(value: Any) -> Iterator[str]:
+    """Yield :func:`to_canonical_json` output in pieces, encoding dataclasses field by field.
+
+    Dataclass instances are encoded as ``asdict`` would convert them, at any depth,
+    without copying them first; a dataclass whose fields are all plain scalars is one
+    piece. An :class:`AnimalTable` is encoded record by record, exactly like the list
+    of its records. Everything else (including ``default=str`` fallbacks) matches
+    ``json.dumps``, except NumPy arrays, which raise ``TypeError`` instead of being
+    hashed through their (possibly truncated) ``str``.
+    """
+
+    if isinstance(value, AnimalTable):
+        yield from _iter_json_array(value)
+        return
+    if is_dataclass(value) and not isinstance(value, type):
+        flat = _flat_dataclass_json(value)
+        if flat is not None:
+            yield flat
+            return
+        value = {f.name: getattr(value, f.name) for f in fields(value)}
+    if isinstance(value, dict):
+        if not value:
+            yield "{}"
+            return
+        separator = "{"
+        for key, item in sorted(value.items(), key=lambda kv: kv[0]):
+            yield f"{separator}{_ENCODER.encode(_json_key(key))}:"
+            yield from iter_canonical_json(item)
+            separator = ","
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield from _iter_json_array(value)
+    elif isinstance(value, np.ndarray):
+        raise TypeError("NumPy arrays cannot be hashed canonically; convert them to lists or records first")
+    else:
+        yield _ENCODER.encode(value)
+
+
+def _iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    separator = "["
+    for item in items:
+        flat = _flat_dataclass_json(item)
+        if flat is not None:
+            yield separator + flat
+        else:
+            yield separator
+            yield from iter_canonical_json(item)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+def stream_sha256(value: Any, buffer_size: int = 1 << 16) -> str:
+    """SHA256 of the canonical JSON of ``value``, fed to the hasher in ``buffer_size`` chunks.
+
+    Equals ``sha256_of`` of the same value with its dataclasses converted by ``asdict``
+    (``sha256_of([asdict(a) for a in animals]) == stream_sha256(animals)``), but never
+    builds the whole payload, so memory stays flat for large cohorts.
+    """
+
+    digest = hashlib.sha256()
+    pending: List[str] = []
+    size = 0
+    for piece in iter_canonical_json(value):
+        pending.append(piece)
+        size += len(piece)
+        if size >= buffer_size:
+            digest.update("".join(pending).encode("utf-8"))
+            pending = []
+            size = 0
+    digest.update("".join(pending).encode("utf-8"))
+    return digest.hexdigest()
+
+
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(record: Any) -> bytes:
+    """Merkle leaf for one record: SHA256 over a domain-separation byte and the record's canonical JSON."""
+
+    return hashlib.sha256(_LEAF_PREFIX + "".join(iter_canonical_json(record)).encode("utf-8")).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """Binary hash tree over per-record leaves; a node without a sibling is carried up unchanged.
+
+    Every level is kept, so replacing or appending a record rehashes only its path
+    to the root (O(log n)) and two trees of the same size can be compared top-down
+    to find the differing leaves without visiting identical subtrees.
+    """
+
+    __slots__ = ("levels",)
+
+    def __init__(self, leaves: Iterable[bytes] = ()) -> None:
+        self.levels: List[List[bytes]] = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            below = self.levels[-1]
+            self.levels.append([self._parent(below, i) for i in range((len(below) + 1) // 2)])
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "MerkleTree":
+        return cls(leaf_hash(r) for r in records)
+
+    @classmethod
+    def from_hex(cls, leaves: Iterable[str]) -> "MerkleTree":
+        """Rebuild from stored leaves (see :attr:`leaves`) without rehashing the records."""
+
+        return cls(bytes.fromhex(h) for h in leaves)
+
+    @property
+    def leaves(self) -> List[str]:
+        return [h.hex() for h in self.levels[0]]
+
+    @staticmethod
+    def _parent(level: List[bytes], index: int) -> bytes:
+        left = 2 * index
+        return _node_hash(level[left], level[left + 1]) if left + 1 < len(level) else level[left]
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    @property
+    def root(self) -> str:
+        top = self.levels[-1]
+        return (top[0] if top else hashlib.sha256(b"").digest()).hex()
+
+    def _refresh(self, index: int) -> None:
+        level = 0
+        while len(self.levels[level]) > 1:
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            above = self.levels[level + 1]
+            index //= 2
+            value = self._parent(self.levels[level], index)
+            if index == len(above):
+                above.append(value)
+            else:
+                above[index] = value
+            level += 1
+
+    def update(self, index: int, record: Any) -> None:
+        self.levels[0][index] = leaf_hash(record)
+        self._refresh(index)
+
+    def append(self, record: Any) -> None:
+        self.levels[0].append(leaf_hash(record))
+        self._refresh(len(self.levels[0]) - 1)
+
+    def changed_leaves(self, other: "MerkleTree") -> List[int]:
+        """Positions whose leaves differ from ``other`` (same size), found by descending differing subtrees."""
+
+        if len(self) != len(other):
+            raise ValueError("Positional Merkle comparison needs trees with the same number of leaves")
+        changed: List[int] = []
+        stack = [(len(self.levels) - 1, i) for i in range(len(self.levels[-1]))]
+        while stack:
+            level, index = stack.pop()
+            if self.levels[level][index] == other.levels[level][index]:
+                continue
+            if level == 0:
+                changed.append(index)
+                continue
+            for child in (2 * index + 1, 2 * index):
+                if child < len(self.levels[level - 1]):
+                    stack.append((level - 1, child))
+        return sorted(changed)
+
+
+@dataclass(slots=True)
+class RecordDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+
+def diff_records(
+    old: Sequence[Any],
+    new: Sequence[Any],
+    key: str = "animal_id",
+    old_tree: MerkleTree | None = None,
+    new_tree: MerkleTree | None = None,
+) -> RecordDiff:
+    """Records added, removed or changed between two lists, keyed by ``key``.
+
+    When both lists hold the same keys in the same order the Merkle trees are compared
+    top-down; otherwise leaf hashes are matched by key. Trees already built over ``old``
+    or ``new`` (e.g. from a project's stored leaves) are used instead of rehashing the records.
+    """
+
+    old_keys = [getattr(r, key) for r in old]
+    new_keys = [getattr(r, key) for r in new]
+    old_tree = old_tree if old_tree is not None else MerkleTree.from_records(old)
+    new_tree = new_tree if new_tree is not None else MerkleTree.from_records(new)
+    if old_keys == new_keys:
+        return RecordDiff(changed=[new_keys[i] for i in old_tree.changed_leaves(new_tree)])
+    old_leaves = dict(zip(old_keys, old_tree.levels[0]))
+    new_leaves = dict(zip(new_keys, new_tree.levels[0]))
+    return RecordDiff(
+        added=[k for k in new_leaves if k not in old_leaves],
+        removed=[k for k in old_leaves if k not in new_leaves],
+        changed=[k for k, h in new_leaves.items() if k in old_leaves and old_leaves[k] != h],
+    )
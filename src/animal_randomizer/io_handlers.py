@@ -2,63 +2,285 @@ from __future__ import annotations
 
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
+import numpy as np
 import pandas as pd
 
 from .models import AnimalRecord, AssignmentRecord
-from .validation import normalize_sex_value
+from .table import AnimalCollection, AnimalTable, Categorical
+from .validation import AnimalValidator, normalize_sex_value
 
 
-def animals_from_dataframe(df: pd.DataFrame) -> List[AnimalRecord]:
-    required = {"Animal ID", "Animal_ID", "animal_id"}
-    available = set(df.columns)
-    col = next((c for c in required if c in available), None)
-    if col is None:
+ID_COLUMNS = ("Animal ID", "Animal_ID", "animal_id")
+# Import headers first, then the names the allocation exporters write, so exports round-trip.
+NOTES_COLUMNS = ("Condition/Notes", "Notes")
+ARRIVAL_COLUMNS = ("Date of arrival", "Date_of_arrival")
+# Read as text by every CSV/Excel reader, so full and chunked imports (and every chunk) see the same values.
+_TEXT_DTYPES = {
+    c: str for c in (*ID_COLUMNS, "Sex", "Cage", "Strain", "Species", *NOTES_COLUMNS, "Source", *ARRIVAL_COLUMNS)
+}
+
+ARROW_SUFFIXES = {".parquet", ".feather", ".arrow", ".ipc"}
+
+
+def _first_column(columns: Iterable[str], names: tuple[str, ...]) -> str:
+    available = set(columns)
+    return next((c for c in names if c in available), names[0])
+
+
+def _id_column(columns: Iterable[str]) -> str:
+    col = _first_column(columns, ID_COLUMNS)
+    if col not in set(columns):
         raise ValueError("Input file must include an Animal ID column")
+    return col
+
+
+def _categorical_column(df: pd.DataFrame, name: str, fn=str) -> Categorical:
+    if name not in df.columns:
+        return Categorical(codes=np.full(len(df), -1, dtype=np.int32), categories=[])
+    codes, uniques = pd.factorize(df[name], use_na_sentinel=True)
+    raw = Categorical(codes=codes.astype(np.int32, copy=False), categories=list(uniques))
+    return raw.map(fn)
+
+
+def _float_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    series = df[name]
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = series.isna().to_numpy()
+    values = np.full(len(series), np.nan)
+    values[~missing] = [float(v) for v in series[~missing].tolist()]
+    return values
+
+
+def _text_column(df: pd.DataFrame, name: str) -> List[str | None]:
+    if name not in df.columns:
+        return [None] * len(df)
+    series = df[name]
+    missing = series.isna().tolist()
+    return [None if na else str(v) for v, na in zip(series.tolist(), missing)]
+
+
+def table_from_dataframe(df: pd.DataFrame) -> AnimalTable:
+    """Convert an import frame column by column, without per-row pandas access."""
+
+    col = _id_column(df.columns)
+    return AnimalTable(
+        animal_id=[str(v).strip() for v in df[col].tolist()],
+        sex=_categorical_column(df, "Sex", lambda v: normalize_sex_value(str(v))),
+        weight=_float_column(df, "Weight"),
+        age=_float_column(df, "Age"),
+        cage=_categorical_column(df, "Cage"),
+        strain=_categorical_column(df, "Strain"),
+        species=_categorical_column(df, "Species"),
+        notes=_text_column(df, _first_column(df.columns, NOTES_COLUMNS)),
+        source=_text_column(df, "Source"),
+        date_of_arrival=_text_column(df, _first_column(df.columns, ARRIVAL_COLUMNS)),
+    )
+
+
+def animals_from_dataframe(df: pd.DataFrame) -> List[AnimalRecord]:
+    return table_from_dataframe(df).to_records()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Parquet/Arrow support requires the optional 'pyarrow' package "
+            "(pip install animal-randomizer[arrow])"
+        ) from None
+    return pyarrow
 
-    rows: List[AnimalRecord] = []
-    for _, row in df.iterrows():
-        rows.append(
-            AnimalRecord(
-                animal_id=str(row.get(col, "")).strip(),
-                sex=(
-                    None
-                    if pd.isna(row.get("Sex"))
-                    else normalize_sex_value(str(row.get("Sex")))
-                ),
-                weight=(None if pd.isna(row.get("Weight")) else float(row.get("Weight"))),
-                age=(None if pd.isna(row.get("Age")) else float(row.get("Age"))),
-                cage=(None if pd.isna(row.get("Cage")) else str(row.get("Cage"))),
-                strain=(None if pd.isna(row.get("Strain")) else str(row.get("Strain"))),
-                species=(None if pd.isna(row.get("Species")) else str(row.get("Species"))),
-                notes=(None if pd.isna(row.get("Condition/Notes")) else str(row.get("Condition/Notes"))),
-                source=(None if pd.isna(row.get("Source")) else str(row.get("Source"))),
-                date_of_arrival=(None if pd.isna(row.get("Date of arrival")) else str(row.get("Date of arrival"))),
-            )
-        )
-    return rows
+
+def _read_arrow_table(path: Path):
+    _require_pyarrow()
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path)
+    import pyarrow.feather as feather
+
+    # Uncompressed Feather/IPC files (as written by export_assignments) are memory-mapped, not copied.
+    return feather.read_table(path, memory_map=True)
+
+
+def _arrow_array(table, name: str):
+    pa = _require_pyarrow()
+    column = table.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else pa.concat_arrays(column.chunks)
+
+
+def _arrow_float_column(table, name: str) -> np.ndarray:
+    if name not in table.column_names:
+        return np.full(table.num_rows, np.nan)
+    pa = _require_pyarrow()
+    array = _arrow_array(table, name)
+    if array.type != pa.float64():
+        array = array.cast(pa.float64())
+    # Zero-copy when the column has no nulls; nulls become NaN otherwise.
+    return array.to_numpy(zero_copy_only=False)
+
+
+def _arrow_categorical_column(table, name: str, fn=str) -> Categorical:
+    if name not in table.column_names:
+        return Categorical(codes=np.full(table.num_rows, -1, dtype=np.int32), categories=[])
+    pa = _require_pyarrow()
+    array = _arrow_array(table, name)
+    if not pa.types.is_dictionary(array.type):
+        array = array.cast(pa.string()).dictionary_encode()
+    codes = array.indices.cast(pa.int32()).fill_null(-1).to_numpy(zero_copy_only=False)
+    return Categorical(codes=codes, categories=array.dictionary.to_pylist()).map(fn)
+
+
+def _arrow_text_column(table, name: str) -> List[str | None]:
+    if name not in table.column_names:
+        return [None] * table.num_rows
+    pa = _require_pyarrow()
+    return _arrow_array(table, name).cast(pa.string()).to_pylist()
+
+
+def table_from_arrow(table) -> AnimalTable:
+    """Convert a ``pyarrow.Table`` using the same column names and coercions as the DataFrame path."""
+
+    pa = _require_pyarrow()
+    col = _id_column(table.column_names)
+    return AnimalTable(
+        animal_id=[("" if v is None else v.strip()) for v in _arrow_array(table, col).cast(pa.string()).to_pylist()],
+        sex=_arrow_categorical_column(table, "Sex", lambda v: normalize_sex_value(str(v))),
+        weight=_arrow_float_column(table, "Weight"),
+        age=_arrow_float_column(table, "Age"),
+        cage=_arrow_categorical_column(table, "Cage"),
+        strain=_arrow_categorical_column(table, "Strain"),
+        species=_arrow_categorical_column(table, "Species"),
+        notes=_arrow_text_column(table, _first_column(table.column_names, NOTES_COLUMNS)),
+        source=_arrow_text_column(table, "Source"),
+        date_of_arrival=_arrow_text_column(table, _first_column(table.column_names, ARRIVAL_COLUMNS)),
+    )
+
+
+def _read_animal_frame(path: Path) -> pd.DataFrame:
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path, dtype=_TEXT_DTYPES)
+    if path.suffix.lower() in {".xlsx", ".xls"}:
+        return pd.read_excel(path, dtype=_TEXT_DTYPES)
+    raise ValueError("Only CSV, Excel, Parquet and Arrow/Feather imports are supported")
 
 
 def import_animals(path: str | Path) -> List[AnimalRecord]:
+    return import_animal_table(path).to_records()
+
+
+def import_animal_table(path: str | Path) -> AnimalTable:
     path = Path(path)
-    if path.suffix.lower() == ".csv":
-        df = pd.read_csv(path)
-    elif path.suffix.lower() in {".xlsx", ".xls"}:
-        df = pd.read_excel(path)
+    if path.suffix.lower() in ARROW_SUFFIXES:
+        return table_from_arrow(_read_arrow_table(path))
+    return table_from_dataframe(_read_animal_frame(path))
+
+
+def _excel_value(value: Any) -> Any:
+    # Same cell conversion as pd.read_excel: whole-number floats are read as ints ("1", not "1.0").
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _iter_excel_frames(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        buffer: List[tuple] = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            buffer.append(tuple(_excel_value(v) for v in row[: len(columns)]))
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=columns, dtype=object)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _iter_animal_frames(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with pd.read_csv(path, chunksize=chunksize, dtype=_TEXT_DTYPES) as reader:
+            yield from reader
+    elif suffix == ".xlsx":
+        yield from _iter_excel_frames(path, chunksize)
     else:
-        raise ValueError("Only CSV and Excel imports are supported")
-    return animals_from_dataframe(df)
+        raise ValueError("Streaming import supports CSV and .xlsx files")
+
+
+def iter_animal_chunks(
+    path: str | Path, chunksize: int = 50_000, validate: bool = True
+) -> Iterator[List[AnimalRecord]]:
+    """Yield animals in chunks of at most ``chunksize`` rows without loading the whole file.
+
+    CSV files are read with ``pd.read_csv(chunksize=...)`` and Excel workbooks with
+    openpyxl read-only row iteration. With ``validate`` each chunk is checked as it
+    arrives (sex normalization, empty/duplicate IDs across the whole stream,
+    non-positive weights); only the set of seen IDs grows with file size.
+    """
+
+    validator = AnimalValidator() if validate else None
+    for frame in _iter_animal_frames(Path(path), chunksize):
+        chunk = animals_from_dataframe(frame)
+        if validator is not None:
+            validator.validate(chunk)
+        yield chunk
+
+
+def stream_animals(path: str | Path, chunksize: int = 50_000) -> List[AnimalRecord]:
+    """Collect a validated cohort chunk by chunk, never holding the whole raw file in pandas."""
+
+    animals: List[AnimalRecord] = []
+    for chunk in iter_animal_chunks(path, chunksize=chunksize):
+        animals.extend(chunk)
+    return animals
+
+
+def _table_metadata_frame(table: AnimalTable) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Animal_ID": table.animal_id,
+            "Sex": table.sex.to_pandas(),
+            "Weight": table.weight,
+            "Age": table.age,
+            "Cage": table.cage.to_pandas(),
+            "Strain": table.strain.to_pandas(),
+            "Species": table.species.to_pandas(),
+            "Notes": table.notes,
+            "Source": table.source,
+            "Date_of_arrival": table.date_of_arrival,
+        }
+    )
 
 
 def build_allocation_dataframe(
-    assignments: List[AssignmentRecord], animals: List[AnimalRecord] | None = None
+    assignments: List[AssignmentRecord], animals: AnimalCollection | None = None
 ) -> pd.DataFrame:
     base = pd.DataFrame([asdict(x) for x in assignments]).rename(
         columns={"animal_id": "Animal_ID", "group": "Group"}
     )
-    if not animals:
+    if animals is None or len(animals) == 0:
         return base
+    if isinstance(animals, AnimalTable):
+        return base.merge(_table_metadata_frame(animals), on="Animal_ID", how="left")
 
     meta = pd.DataFrame(
         [
@@ -81,10 +303,45 @@ def build_allocation_dataframe(
     return merged
 
 
+# Arrow column types mirroring AnimalRecord: floats for measurements, dictionary-encoded
+# categoricals for low-cardinality fields, plain strings for identifiers and free text.
+_ARROW_FLOAT_COLUMNS = {"Weight", "Age"}
+_ARROW_DICTIONARY_COLUMNS = {"Group", "Sex", "Cage", "Strain", "Species"}
+
+
+def allocation_arrow_table(frame: pd.DataFrame):
+    pa = _require_pyarrow()
+    arrays = []
+    for name in frame.columns:
+        array = pa.array(frame[name], from_pandas=True)
+        if name in _ARROW_FLOAT_COLUMNS:
+            array = array.cast(pa.float64())
+        elif name in _ARROW_DICTIONARY_COLUMNS:
+            if not pa.types.is_dictionary(array.type):
+                array = array.cast(pa.string()).dictionary_encode()
+            array = array.cast(pa.dictionary(pa.int32(), pa.string()))
+        else:
+            array = array.cast(pa.string())
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in frame.columns])
+
+
+def _write_arrow(frame: pd.DataFrame, path: Path) -> None:
+    table = allocation_arrow_table(frame)
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, path, compression="uncompressed")
+
+
 def export_assignments(
     assignments: List[AssignmentRecord],
     path: str | Path,
-    animals: List[AnimalRecord] | None = None,
+    animals: AnimalCollection | None = None,
 ) -> None:
     frame = build_allocation_dataframe(assignments, animals)
     path = Path(path)
@@ -94,8 +351,65 @@ def export_assignments(
         frame.to_excel(path, index=False)
     elif path.suffix.lower() in {".tsv", ".txt"}:
         frame.to_csv(path, index=False, sep="\t", encoding="utf-8")
+    elif path.suffix.lower() in ARROW_SUFFIXES:
+        _write_arrow(frame, path)
     else:
-        raise ValueError("Export format must be .csv, .xlsx, .tsv, or .txt")
+        raise ValueError("Export format must be .csv, .xlsx, .tsv, .txt, .parquet, .feather, .arrow, or .ipc")
+
+
+def _allocation_metadata(animals: AnimalCollection) -> pd.DataFrame:
+    if isinstance(animals, AnimalTable):
+        meta = _table_metadata_frame(animals)
+    else:
+        meta = build_allocation_dataframe([AssignmentRecord(animal_id=a.animal_id, group="") for a in animals], animals)
+        meta = meta.drop(columns="Group")
+    return meta.set_index("Animal_ID")
+
+
+def export_assignment_stream(
+    assignments: Iterable[AssignmentRecord],
+    path: str | Path,
+    animals: AnimalCollection | None = None,
+    chunk_size: int = 10_000,
+) -> int:
+    """Write assignments to ``.csv``/``.tsv``/``.txt`` as they arrive, ``chunk_size`` rows at a time.
+
+    Produces the same file as :func:`export_assignments` without holding the full
+    allocation; the animal metadata is indexed once and joined per chunk. Returns the
+    number of rows written.
+    """
+
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        sep, encoding = ",", "utf-8-sig"
+    elif suffix in {".tsv", ".txt"}:
+        sep, encoding = "\t", "utf-8"
+    else:
+        raise ValueError("Streaming export format must be .csv, .tsv, or .txt")
+    meta = _allocation_metadata(animals) if animals is not None and len(animals) else None
+
+    written = 0
+    chunk: List[AssignmentRecord] = []
+    with path.open("w", encoding=encoding, newline="") as handle:
+
+        def flush() -> None:
+            ids = [a.animal_id for a in chunk]
+            frame = pd.DataFrame({"Animal_ID": ids, "Group": [a.group for a in chunk]})
+            if meta is not None:
+                frame = pd.concat([frame, meta.reindex(ids).reset_index(drop=True)], axis=1)
+            frame.to_csv(handle, index=False, sep=sep, header=written == 0)
+
+        for assignment in assignments:
+            chunk.append(assignment)
+            if len(chunk) >= chunk_size:
+                flush()
+                written += len(chunk)
+                chunk = []
+        if chunk or written == 0:
+            flush()
+            written += len(chunk)
+    return written
 
 
 def assignments_to_dict(assignments: List[AssignmentRecord]) -> List[Dict[str, Any]]:
@@ -104,12 +418,15 @@ def assignments_to_dict(assignments: List[AssignmentRecord]) -> List[Dict[str, A
 
 def export_interop_bundle(
     assignments: List[AssignmentRecord],
-    animals: List[AnimalRecord],
+    animals: AnimalCollection,
     output_dir: str | Path,
     stem: str = "allocation",
+    columnar: bool = False,
 ) -> Dict[str, Path]:
     """
     Export an interoperability bundle suitable for Excel, Prism, and Origin.
+
+    With ``columnar`` the long table is also written as Parquet and Feather (requires pyarrow).
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -146,10 +463,16 @@ def export_interop_bundle(
             )
             grouped_weights.to_csv(weights_grouped_path, index=False, encoding="utf-8-sig")
 
-    return {
+    paths = {
         "csv": csv_path,
         "xlsx": xlsx_path,
         "tsv": tsv_path,
         "prism_grouped": prism_grouped_path,
         "prism_weights_grouped": weights_grouped_path,
     }
+    if columnar:
+        paths["parquet"] = output_dir / f"{stem}.parquet"
+        paths["feather"] = output_dir / f"{stem}.feather"
+        _write_arrow(long_df, paths["parquet"])
+        _write_arrow(long_df, paths["feather"])
+    return paths
@@ -47,6 +47,24 @@ class RandomizationConfig:
     algorithm_version: str = "1.0.0"
 
 
+@dataclass(slots=True)
+class RerandomizationConfig:
+    candidates: int = 1000
+    max_abs_weight_d: Optional[float] = None
+    max_group_size_spread: int = 1
+
+
+@dataclass(slots=True)
+class OptimizerConfig:
+    moves: int = 200_000
+    start_temperature: float = 0.05
+    end_temperature: float = 1e-5
+    weight_smd: float = 1.0
+    age_smd: float = 1.0
+    sex_imbalance: float = 1.0
+    cage_clustering: float = 1.0
+
+
 @dataclass(slots=True)
 class AssignmentRecord:
     animal_id: str
@@ -61,6 +79,7 @@ class RandomizationArtifacts:
     seed: int
     hashes: Dict[str, str]
     generated_at: str
+    profile: List[Dict[str, Any]] = field(default_factory=list)
 
 
 @dataclass(slots=True)
@@ -81,5 +100,7 @@ class ProjectModel:
     stats: Dict[str, Any] = field(default_factory=dict)
     warnings: List[str] = field(default_factory=list)
     hashes: Dict[str, str] = field(default_factory=dict)
+    allocation_state: Dict[str, Any] = field(default_factory=dict)
+    merkle_leaves: List[str] = field(default_factory=list)
     software_version: str = "0.3.0"
     build_date: str = field(default_factory=lambda: datetime.now(timezone.utc).date().isoformat())
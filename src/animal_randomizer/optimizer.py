@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .models import AssignmentRecord, OptimizerConfig, RandomizationConfig
+from .randomization import _normalize_sex, randomize, stream_seed
+from .table import AnimalCollection, AnimalTable
+
+
+@dataclass(slots=True)
+class OptimizationResult:
+    assignments: List[AssignmentRecord]
+    seed: int
+    optimizer_seed: int
+    moves: int
+    accepted: int
+    initial_objective: float
+    objective: float
+    terms: Dict[str, float]
+
+
+class _SwapState:
+    """Per-group sufficient statistics for the optimizer objective.
+
+    Swaps keep group sizes fixed, so with ``D_g = sum_g - n_g * mean`` the weight
+    term ``sum_g (D_g / (n_g * sd))**2`` (squared standardized mean difference of
+    each group from the cohort) changes in O(1) per swap; age works the same way.
+    Sex uses ``sum_g sum_s (count_gs - n_g * p_s)**2 / n_g`` and cage clustering
+    counts cage-mate pairs sharing a group, divided by the cohort size. Missing
+    weights and ages are imputed with the cohort mean, so they never add imbalance.
+    """
+
+    __slots__ = (
+        "group",
+        "weight",
+        "age",
+        "sex",
+        "cage",
+        "n",
+        "weight_dev",
+        "age_dev",
+        "weight_scale",
+        "age_scale",
+        "sex_dev",
+        "cage_counts",
+        "cage_scale",
+    )
+
+    def __init__(
+        self,
+        group: List[int],
+        sizes: int,
+        weight: np.ndarray,
+        age: np.ndarray,
+        sex: List[int],
+        cage: List[int],
+    ) -> None:
+        self.group = group
+        self.weight, weight_scale = self._standardize(weight)
+        self.age, age_scale = self._standardize(age)
+        self.sex = sex
+        self.cage = cage
+        self.n = [0] * sizes
+        for g in group:
+            self.n[g] += 1
+        self.weight_dev = [0.0] * sizes
+        self.age_dev = [0.0] * sizes
+        for idx, g in enumerate(group):
+            self.weight_dev[g] += self.weight[idx]
+            self.age_dev[g] += self.age[idx]
+        self.weight_scale = [weight_scale / (n * n) if n else 0.0 for n in self.n]
+        self.age_scale = [age_scale / (n * n) if n else 0.0 for n in self.n]
+
+        levels = max(sex, default=-1) + 1
+        share = [sex.count(s) / len(sex) for s in range(levels)] if sex else []
+        self.sex_dev = [[-self.n[g] * share[s] for s in range(levels)] for g in range(sizes)]
+        for idx, g in enumerate(group):
+            self.sex_dev[g][sex[idx]] += 1.0
+        self.cage_counts = [[0] * sizes for _ in range(max(cage, default=-1) + 1)]
+        for idx, g in enumerate(group):
+            self.cage_counts[cage[idx]][g] += 1
+        self.cage_scale = 1.0 / len(group) if group else 0.0
+
+    @staticmethod
+    def _standardize(values: np.ndarray) -> Tuple[List[float], float]:
+        """Center on the cohort mean (missing -> 0) and return ``1 / variance`` (0 when constant)."""
+
+        present = values[~np.isnan(values)]
+        if len(present) < 2 or float(np.var(present)) == 0.0:
+            return [0.0] * len(values), 0.0
+        centered = np.where(np.isnan(values), 0.0, values - present.mean())
+        return centered.tolist(), 1.0 / float(np.var(present))
+
+    def terms(self) -> Dict[str, float]:
+        groups = range(len(self.n))
+        pairs = sum(c * (c - 1) // 2 for per_cage in self.cage_counts for c in per_cage)
+        return {
+            "weight_smd": sum(self.weight_dev[g] ** 2 * self.weight_scale[g] for g in groups),
+            "age_smd": sum(self.age_dev[g] ** 2 * self.age_scale[g] for g in groups),
+            "sex_imbalance": sum(e * e / self.n[g] for g in groups if self.n[g] for e in self.sex_dev[g]),
+            "cage_clustering": pairs * self.cage_scale,
+        }
+
+
+def _objective(terms: Dict[str, float], opt: OptimizerConfig) -> float:
+    return (
+        opt.weight_smd * terms["weight_smd"]
+        + opt.age_smd * terms["age_smd"]
+        + opt.sex_imbalance * terms["sex_imbalance"]
+        + opt.cage_clustering * terms["cage_clustering"]
+    )
+
+
+def _anneal(state: _SwapState, opt: OptimizerConfig, rng: random.Random, cap: int | None = None) -> int:
+    """Run ``opt.moves`` swap proposals with a geometric cooling schedule; returns accepted swaps.
+
+    With ``cap`` (``max_animals_per_cage_per_group``) a swap that would put more than
+    ``cap`` animals of one cage into a group is never made.
+    """
+
+    group, weight, age, sex, cage = state.group, state.weight, state.age, state.sex, state.cage
+    n, wdev, adev, wscale, ascale = state.n, state.weight_dev, state.age_dev, state.weight_scale, state.age_scale
+    sdev, cage_counts = state.sex_dev, state.cage_counts
+    kw, ka, ks = opt.weight_smd, opt.age_smd, opt.sex_imbalance
+    kc = opt.cage_clustering * state.cage_scale
+    size = len(group)
+    if size < 2 or opt.moves <= 0:
+        return 0
+    temperature = opt.start_temperature
+    cooling = (opt.end_temperature / opt.start_temperature) ** (1.0 / opt.moves)
+    draw, uniform, exp = rng.randrange, rng.random, math.exp
+    limit = cap if cap is not None and cap > 0 else size
+    accepted = 0
+
+    for _ in range(opt.moves):
+        temperature *= cooling
+        i = draw(size)
+        j = draw(size)
+        g = group[i]
+        h = group[j]
+        if g == h:
+            continue
+        dw = weight[j] - weight[i]
+        da = age[j] - age[i]
+        # (x + d)**2 - x**2 == d * (2x + d)
+        delta = kw * dw * ((2.0 * wdev[g] + dw) * wscale[g] - (2.0 * wdev[h] - dw) * wscale[h])
+        delta += ka * da * ((2.0 * adev[g] + da) * ascale[g] - (2.0 * adev[h] - da) * ascale[h])
+        si = sex[i]
+        sj = sex[j]
+        if si != sj:
+            sg, sh = sdev[g], sdev[h]
+            delta += ks * ((2.0 - 2.0 * sg[si] + 2.0 * sg[sj]) / n[g] + (2.0 - 2.0 * sh[sj] + 2.0 * sh[si]) / n[h])
+        ci = cage[i]
+        cj = cage[j]
+        if ci != cj:
+            pi, pj = cage_counts[ci], cage_counts[cj]
+            if pi[h] >= limit or pj[g] >= limit:
+                continue
+            delta += kc * (pi[h] - pi[g] + 1 + pj[g] - pj[h] + 1)
+
+        if delta > 0 and uniform() >= exp(-delta / temperature):
+            continue
+        accepted += 1
+        group[i] = h
+        group[j] = g
+        wdev[g] += dw
+        wdev[h] -= dw
+        adev[g] += da
+        adev[h] -= da
+        if si != sj:
+            sdev[g][si] -= 1.0
+            sdev[g][sj] += 1.0
+            sdev[h][sj] -= 1.0
+            sdev[h][si] += 1.0
+        if ci != cj:
+            cage_counts[ci][g] -= 1
+            cage_counts[ci][h] += 1
+            cage_counts[cj][h] -= 1
+            cage_counts[cj][g] += 1
+    return accepted
+
+
+def _columns(animals: AnimalCollection) -> Tuple[List[str], np.ndarray, np.ndarray, List[int], List[int]]:
+    table = AnimalTable.coerce(animals)
+    sex_lookup = table.sex.labels(_normalize_sex)[table.sex.codes]
+    sex_codes = {label: code for code, label in enumerate(dict.fromkeys(sex_lookup.tolist()))}
+    cage_labels = table.cage.labels(lambda c: str(c or "NA"))[table.cage.codes].tolist()
+    cage_codes = {label: code for code, label in enumerate(dict.fromkeys(cage_labels))}
+    return (
+        table.animal_id,
+        table.weight,
+        table.age,
+        [sex_codes[s] for s in sex_lookup.tolist()],
+        [cage_codes[c] for c in cage_labels],
+    )
+
+
+def objective_terms(
+    animals: AnimalCollection, assignments: Sequence[AssignmentRecord], group_names: List[str]
+) -> Dict[str, float]:
+    """Recompute every objective term from scratch (for reporting and checking the incremental path)."""
+
+    ids, weight, age, sex, cage = _columns(animals)
+    position = {name: pos for pos, name in enumerate(group_names)}
+    group_of = {a.animal_id: position[a.group] for a in assignments}
+    return _SwapState([group_of[i] for i in ids], len(group_names), weight, age, sex, cage).terms()
+
+
+def optimize_allocation(
+    animals: AnimalCollection, cfg: RandomizationConfig, opt: OptimizerConfig
+) -> OptimizationResult:
+    """Improve a seeded allocation by simulated annealing over pairwise swaps.
+
+    The starting allocation is ``randomize(animals, cfg)`` with the ``balanced``
+    method; other methods are rejected, since free swaps would undo their blocks,
+    strata, matched sets or cage units. Swaps keep every group's size and never
+    exceed ``max_animals_per_cage_per_group``. Each proposal is scored in O(1) from
+    per-group running sums, so the run costs O(n + moves). The swap sequence comes from
+    ``stream_seed(seed, "optimizer")``, so the seed and ``opt`` fully determine the result.
+    """
+
+    if cfg.method.lower() != "balanced":
+        raise ValueError(f"The optimizer starts from a balanced allocation, not {cfg.method}")
+    start, seed = randomize(animals, cfg)
+    ids, weight, age, sex, cage = _columns(animals)
+    position = {name: pos for pos, name in enumerate(cfg.group_names)}
+    group_of = {a.animal_id: position[a.group] for a in start}
+    state = _SwapState([group_of[i] for i in ids], len(cfg.group_names), weight, age, sex, cage)
+
+    initial = _objective(state.terms(), opt)
+    optimizer_seed = stream_seed(seed, "optimizer")
+    accepted = _anneal(state, opt, random.Random(optimizer_seed), cfg.constraints.max_animals_per_cage_per_group)
+    terms = state.terms()
+
+    final_group = dict(zip(ids, state.group))
+    assignments = [
+        AssignmentRecord(animal_id=a.animal_id, group=cfg.group_names[final_group[a.animal_id]]) for a in start
+    ]
+    return OptimizationResult(
+        assignments=assignments,
+        seed=seed,
+        optimizer_seed=optimizer_seed,
+        moves=opt.moves,
+        accepted=accepted,
+        initial_objective=initial,
+        objective=_objective(terms, opt),
+        terms=terms,
+    )
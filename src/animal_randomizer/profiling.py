@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List
+
+
+@dataclass(slots=True)
+class StageTiming:
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_memory_bytes: int | None = None
+
+
+class StageProfiler:
+    """Collects wall time, CPU time and (optionally) peak traced memory per named stage.
+
+    Memory is the peak of Python allocations made while the stage runs, measured with
+    ``tracemalloc``; tracing is started for the stage and stopped afterwards unless it
+    was already on, so stages should not nest. Tracing slows allocation-heavy code,
+    and ``memory=False`` gives cleaner timings.
+    """
+
+    def __init__(self, memory: bool = True) -> None:
+        self.memory = memory
+        self.timings: List[StageTiming] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started_tracing = False
+        baseline = 0
+        if self.memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            else:
+                tracemalloc.start()
+                started_tracing = True
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            timing = StageTiming(name, time.perf_counter() - wall, time.process_time() - cpu)
+            if self.memory:
+                timing.peak_memory_bytes = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.timings.append(timing)
+
+    def to_dicts(self, start: int = 0) -> List[Dict[str, Any]]:
+        return [asdict(t) for t in self.timings[start:]]
+
+    def format(self) -> str:
+        width = max([len(t.stage) for t in self.timings] + [5])
+        lines = [f"{'Stage':<{width}}  {'Wall s':>8}  {'CPU s':>8}  {'Peak MiB':>9}"]
+        for t in self.timings:
+            peak = "" if t.peak_memory_bytes is None else f"{t.peak_memory_bytes / 2**20:.1f}"
+            lines.append(f"{t.stage:<{width}}  {t.wall_seconds:8.3f}  {t.cpu_seconds:8.3f}  {peak:>9}")
+        lines.append(f"{'total':<{width}}  {sum(t.wall_seconds for t in self.timings):8.3f}")
+        return "\n".join(lines)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
+from dataclasses import asdict, replace
 from pathlib import Path
 from typing import Any, Dict
 
+from .hashing import MerkleTree, RecordDiff, diff_records
 from .models import (
     AnimalRecord,
     AssignmentRecord,
@@ -14,10 +15,14 @@ from .models import (
     RandomizationConfig,
     StudyMetadata,
 )
+from .table import AnimalTable
 
 
 def save_project(project: ProjectModel, path: str | Path) -> None:
-    payload = asdict(project)
+    payload = asdict(replace(project, animals=[]))
+    # Columnar cohorts are stored record by record, exactly like a list of AnimalRecords.
+    animals = project.animals.to_records() if isinstance(project.animals, AnimalTable) else project.animals
+    payload["animals"] = [asdict(a) for a in animals]
     path = Path(path)
     if path.suffix.lower() != ".nprj":
         path = path.with_suffix(".nprj")
@@ -52,7 +57,26 @@ def load_project(path: str | Path) -> ProjectModel:
         stats=payload.get("stats", {}),
         warnings=list(payload.get("warnings", [])),
         hashes=payload.get("hashes", {}),
+        allocation_state=payload.get("allocation_state", {}),
+        merkle_leaves=list(payload.get("merkle_leaves", [])),
         software_version=payload.get("software_version", "0.3.0"),
         build_date=payload.get("build_date", ""),
     )
     return model
+
+
+def diff_projects(old_path: str | Path, new_path: str | Path) -> Dict[str, RecordDiff]:
+    """Animals and assignments added, removed or changed between two ``.nprj`` files, by Animal ID."""
+
+    old, new = load_project(old_path), load_project(new_path)
+    return {
+        "animals": diff_records(old.animals, new.animals, old_tree=_stored_tree(old), new_tree=_stored_tree(new)),
+        "assignments": diff_records(old.assignments, new.assignments),
+    }
+
+
+def _stored_tree(project: ProjectModel) -> MerkleTree | None:
+    # Projects saved before the leaves were stored, or whose cohort size no longer matches them, are rehashed.
+    if len(project.merkle_leaves) != len(project.animals):
+        return None
+    return MerkleTree.from_hex(project.merkle_leaves)
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
 import random
 import secrets
+from bisect import bisect_left, insort
 from collections import defaultdict
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+import numpy as np
 
 from .models import AnimalRecord, AssignmentRecord, ConstraintConfig, RandomizationConfig
+from .table import AnimalCollection, AnimalTable
 
 
 def _normalize_sex(sex: str | None) -> str:
@@ -22,120 +30,1234 @@ def _weight_bin(value: float | None) -> str:
     return str(int(float(value) // 5))
 
 
+def _age_level(age: Any) -> str:
+    # Ages are compared as floats, as the columnar table stores them, so 10 and 10.0 share a level.
+    if age is None:
+        return "NA"
+    try:
+        value = float(age)
+    except (TypeError, ValueError):
+        return str(age)
+    return "NA" if value != value else str(value)
+
+
+def _factor_level(animal: AnimalRecord, key: str, legacy_age: bool = False) -> str | None:
+    if key == "sex":
+        return _normalize_sex(animal.sex)
+    if key == "cage":
+        return str(animal.cage or "NA")
+    if key == "age":
+        # 1.0.0 record keys format the age as given ("9", "9.5"), which fixes their sort order; keep it.
+        if legacy_age:
+            return str(animal.age if animal.age is not None else "NA")
+        return _age_level(animal.age)
+    if key == "weight":
+        return _weight_bin(animal.weight)
+    return None
+
+
 def _stratum_key(animal: AnimalRecord, stratify_by: List[str], weight_balance: bool) -> str:
     parts: List[str] = []
+    for key in stratify_by:
+        level = _factor_level(animal, key, legacy_age=True)
+        if level is not None:
+            parts.append(level)
+    if weight_balance and "weight" not in stratify_by:
+        parts.append(f"w{_weight_bin(animal.weight)}")
+    return "|".join(parts) if parts else "ALL"
+
+
+def _table_factor_columns(
+    table: AnimalTable, stratify_by: List[str], weight_balance: bool
+) -> List[tuple[str, List[str]]]:
+    def weight_bins() -> np.ndarray:
+        bins = np.full(len(table), "NA", dtype=object)
+        present = ~np.isnan(table.weight)
+        bins[present] = [str(int(b)) for b in np.floor_divide(table.weight[present], 5).tolist()]
+        return bins
+
+    columns: List[tuple[str, List[str]]] = []
     for key in stratify_by:
         if key == "sex":
-            parts.append(_normalize_sex(animal.sex))
+            columns.append((key, table.sex.labels(_normalize_sex)[table.sex.codes].tolist()))
         elif key == "cage":
-            parts.append(str(animal.cage or "NA"))
+            columns.append((key, table.cage.labels(lambda c: str(c or "NA"))[table.cage.codes].tolist()))
         elif key == "age":
-            parts.append(str(animal.age if animal.age is not None else "NA"))
+            columns.append((key, [_age_level(v) for v in table.age.tolist()]))
         elif key == "weight":
-            parts.append(_weight_bin(animal.weight))
+            columns.append((key, weight_bins().tolist()))
     if weight_balance and "weight" not in stratify_by:
-        parts.append(f"w{_weight_bin(animal.weight)}")
-    return "|".join(parts) if parts else "ALL"
+        columns.append(("weight", [f"w{b}" for b in weight_bins().tolist()]))
+    return columns
+
+
+def _factor_columns(
+    animals: AnimalCollection, factors: List[str], weight_balance: bool
+) -> List[tuple[str, List[str]]]:
+    """One ``(factor, levels per row)`` column per known factor, plus the weight bin when balancing weight."""
+
+    if isinstance(animals, AnimalTable):
+        return _table_factor_columns(animals, factors, weight_balance)
+    known = [key for key in factors if key in {"sex", "cage", "age", "weight"}]
+    columns = [(key, [_factor_level(a, key) for a in animals]) for key in known]
+    if weight_balance and "weight" not in factors:
+        columns.append(("weight", [f"w{_weight_bin(a.weight)}" for a in animals]))
+    return columns
+
+
+def _table_stratum_keys(table: AnimalTable, stratify_by: List[str], weight_balance: bool) -> List[str]:
+    columns = [levels for _, levels in _table_factor_columns(table, stratify_by, weight_balance)]
+    if not columns:
+        return ["ALL"] * len(table)
+    if len(columns) == 1:
+        return columns[0]
+    return ["|".join(parts) for parts in zip(*columns)]
+
+
+def _stratum_keys(animals: AnimalCollection, stratify_by: List[str], weight_balance: bool) -> List[str]:
+    if isinstance(animals, AnimalTable):
+        return _table_stratum_keys(animals, stratify_by, weight_balance)
+    return [_stratum_key(a, stratify_by, weight_balance) for a in animals]
+
+
+METHODS = ("simple", "balanced", "stratified", "block", "minimization", "cluster", "matched")
+ALGORITHM_VERSIONS = ("1.0.0", "1.1.0", "1.2.0", "1.3.0")
+
+# Mixed-radix keys are re-densified before the radix product could overflow int64.
+_MAX_RADIX = 2**62
+
+
+@dataclass(slots=True)
+class StratumCodes:
+    """Integer stratum of every row plus the label of each stratum.
+
+    Codes are dense and ordered like the strata themselves: each field's levels are
+    ranked by their label text and strata compare field by field, so ``labels[code]``
+    (``"F|w40"``-style, as in version 1.0.0 keys) reads back a stratum for reports.
+    """
+
+    codes: np.ndarray
+    labels: List[str]
+
+    def strata(self) -> List[tuple[str, List[int]]]:
+        """``(label, rows)`` per stratum in stratum order, rows ascending."""
+
+        order = np.argsort(self.codes, kind="stable")
+        bounds = np.cumsum(np.bincount(self.codes, minlength=len(self.labels)))[:-1]
+        return [(label, rows.tolist()) for label, rows in zip(self.labels, np.split(order, bounds))]
+
+
+def _field_codes(lookup: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Rank the distinct labels of ``lookup`` and index them with ``codes`` (``-1`` hits the last slot)."""
+
+    levels, inverse = np.unique(lookup.astype(str), return_inverse=True)
+    return inverse.reshape(-1)[codes], levels
+
+
+def _numeric_codes(values: np.ndarray, label: Callable[[float], str]) -> tuple[np.ndarray, np.ndarray]:
+    """Lookup of ``label(value)`` per distinct value (``"NA"`` last, for ``NaN``) and each row's index into it."""
+
+    missing = np.isnan(values)
+    distinct, codes = np.unique(np.where(missing, 0.0, values), return_inverse=True)
+    lookup = np.array([label(v) for v in distinct.tolist()] + ["NA"], dtype=object)
+    return lookup, np.where(missing, len(distinct), codes.reshape(-1))
+
+
+def stratum_codes(animals: AnimalCollection, stratify_by: List[str], weight_balance: bool) -> StratumCodes:
+    """Mixed-radix stratum keys computed from per-field code arrays (algorithm version 1.1.0)."""
+
+    table = AnimalTable.coerce(animals)
+    bin_labels, bin_codes = _numeric_codes(np.floor_divide(table.weight, 5), lambda b: str(int(b)))
+
+    fields: List[tuple[np.ndarray, np.ndarray]] = []
+    for key in stratify_by:
+        if key == "sex":
+            fields.append(_field_codes(table.sex.labels(_normalize_sex), table.sex.codes))
+        elif key == "cage":
+            fields.append(_field_codes(table.cage.labels(lambda c: str(c or "NA")), table.cage.codes))
+        elif key == "age":
+            fields.append(_field_codes(*_numeric_codes(table.age, str)))
+        elif key == "weight":
+            fields.append(_field_codes(bin_labels, bin_codes))
+    if weight_balance and "weight" not in stratify_by:
+        fields.append(_field_codes(np.array([f"w{b}" for b in bin_labels.tolist()], dtype=object), bin_codes))
+
+    keys = np.zeros(len(table), dtype=np.int64)
+    radix = 1
+    for codes, levels in fields:
+        if radix * len(levels) > _MAX_RADIX:
+            _, keys = np.unique(keys, return_inverse=True)
+            keys = keys.reshape(-1).astype(np.int64)
+            radix = int(keys.max()) + 1
+        keys = keys * len(levels) + codes
+        radix *= len(levels)
+    _, first, dense = np.unique(keys, return_index=True, return_inverse=True)
+    labels = [
+        "|".join(str(levels[codes[row]]) for codes, levels in fields) if fields else "ALL" for row in first.tolist()
+    ]
+    return StratumCodes(codes=dense.reshape(-1), labels=labels)
+
+
+def _engine_columns(animals: AnimalCollection) -> tuple[List[str], List[str]]:
+    """Animal IDs and cage keys in row order; the engine itself works on row indices."""
+
+    if isinstance(animals, AnimalTable):
+        return animals.animal_id, animals.cage.labels(lambda c: str(c or "NA"))[animals.cage.codes].tolist()
+    return [a.animal_id for a in animals], [str(a.cage or "NA") for a in animals]
+
+
+class _CandidateView(Sequence[str]):
+    """Bucket of candidate positions minus a few excluded ones, indexable without copying."""
+
+    __slots__ = ("_names", "_bucket", "_skipped")
+
+    def __init__(self, names: List[str], bucket: List[int], excluded: List[int]) -> None:
+        self._names = names
+        self._bucket = bucket
+        self._skipped = sorted(bisect_left(bucket, p) for p in excluded)
+
+    def __len__(self) -> int:
+        return len(self._bucket) - len(self._skipped)
+
+    def __getitem__(self, idx: int) -> str:
+        for skipped in self._skipped:
+            if skipped > idx:
+                break
+            idx += 1
+        return self._names[self._bucket[idx]]
+
+
+class _GroupSelector:
+    """Balanced group chooser: group positions bucketed by current size plus sparse per-cage counters.
 
+    ``choose`` draws from exactly the candidate list the original linear scan built
+    (minimum-size groups in ``group_names`` order, filtered by the cage cap and cage
+    clustering rules) and consumes the RNG identically, so seeded runs are unchanged.
+    Work per animal is bounded by the number of groups already holding that cage
+    rather than by the number of groups. Designs with only a handful of groups use
+    the plain scan over the same counters, which is cheaper at that size.
+    """
 
-def _choose_group(
-    animal: AnimalRecord,
+    SCAN_MAX_GROUPS = 8
+
+    __slots__ = ("group_names", "constraints", "counts", "cage_counts", "_scan", "_positions", "_buckets", "_min")
+
+    def __init__(self, group_names: List[str], constraints: ConstraintConfig) -> None:
+        self.group_names = group_names
+        self.constraints = constraints
+        self.counts: Dict[str, int] = {g: 0 for g in group_names}
+        self.cage_counts: Dict[str, Dict[str, int]] = {}
+        self._scan = len(group_names) <= self.SCAN_MAX_GROUPS
+        self._positions: Dict[str, List[int]] = defaultdict(list)
+        for pos, name in enumerate(group_names):
+            self._positions[name].append(pos)
+        self._buckets: Dict[int, List[int]] = {0: list(range(len(group_names)))}
+        self._min = 0
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"counts": dict(self.counts), "cage_counts": {c: dict(g) for c, g in self.cage_counts.items()}}
+
+    @classmethod
+    def from_state(
+        cls, group_names: List[str], constraints: ConstraintConfig, state: Dict[str, Any]
+    ) -> "_GroupSelector":
+        """Rebuild a selector from saved counters; buckets are a pure function of the counts."""
+
+        selector = cls(group_names, constraints)
+        selector.counts.update({g: int(n) for g, n in state.get("counts", {}).items()})
+        selector.cage_counts = {
+            cage: {g: int(n) for g, n in per_cage.items()} for cage, per_cage in state.get("cage_counts", {}).items()
+        }
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for pos, name in enumerate(group_names):
+            buckets[selector.counts[name]].append(pos)
+        selector._buckets = dict(buckets)
+        selector._min = min(buckets)
+        return selector
+
+    def _choose_by_scan(self, cage: str, rng: random.Random) -> str:
+        counts = self.counts
+        per_cage = self.cage_counts.get(cage) or {}
+        min_size = min(counts.values())
+        candidates = [g for g in self.group_names if counts[g] == min_size]
+
+        cap = self.constraints.max_animals_per_cage_per_group
+        if cap is not None:
+            limited = [g for g in candidates if per_cage.get(g, 0) < cap]
+            if limited:
+                candidates = limited
+
+        if self.constraints.minimize_cage_clustering and per_cage:
+            min_cage = min(per_cage.get(g, 0) for g in candidates)
+            candidates = [g for g in candidates if per_cage.get(g, 0) == min_cage]
+
+        return rng.choice(candidates)
+
+    def choose(self, cage: str, rng: random.Random) -> str:
+        if self._scan:
+            return self._choose_by_scan(cage, rng)
+        bucket = self._buckets[self._min]
+        per_cage = self.cage_counts.get(cage)
+        occupied = (
+            [
+                (pos, count)
+                for name, count in per_cage.items()
+                if self.counts[name] == self._min
+                for pos in self._positions[name]
+            ]
+            if per_cage
+            else []
+        )
+        excluded: List[int] = []
+
+        cap = self.constraints.max_animals_per_cage_per_group
+        if cap is not None and cap > 0:
+            over = [pos for pos, count in occupied if count >= cap]
+            if len(over) < len(bucket):
+                excluded = over
+                occupied = [(pos, count) for pos, count in occupied if count < cap]
+
+        if self.constraints.minimize_cage_clustering and occupied:
+            if len(occupied) < len(bucket) - len(excluded):
+                excluded = excluded + [pos for pos, _ in occupied]
+            else:
+                least = min(count for _, count in occupied)
+                return rng.choice([self.group_names[p] for p in sorted(p for p, c in occupied if c == least)])
+
+        if len(bucket) <= 32:
+            names = self.group_names
+            if excluded:
+                return rng.choice([names[p] for p in bucket if p not in excluded])
+            return rng.choice([names[p] for p in bucket])
+        return rng.choice(_CandidateView(self.group_names, bucket, excluded))
+
+    def add(self, group: str, cage: str) -> None:
+        per_cage = self.cage_counts.setdefault(cage, {})
+        per_cage[group] = per_cage.get(group, 0) + 1
+        size = self.counts[group]
+        self.counts[group] = size + 1
+        if self._scan:
+            return
+        bucket = self._buckets[size]
+        target = self._buckets.setdefault(size + 1, [])
+        for pos in self._positions[group]:
+            del bucket[bisect_left(bucket, pos)]
+            insort(target, pos)
+        if not bucket:
+            del self._buckets[size]
+            if size == self._min:
+                self._min = min(self._buckets)
+
+
+MINIMIZATION_PROBABILITY = 0.8
+
+
+class _Minimizer:
+    """Pocock-Simon minimization over marginal counts per factor level and group.
+
+    An animal's imbalance score for group ``g`` is the number of animals already in
+    ``g`` that share each of its factor levels, plus the size of ``g`` (and its
+    count in the animal's cage when cage clustering is minimized). With equal
+    factor weights this ranks groups exactly as the variance criterion does. The
+    lowest-scoring group is taken with probability ``probability`` (ties broken at
+    random), otherwise one of the others, so each animal costs O(factors * groups)
+    regardless of how many factor combinations exist.
+    """
+
+    __slots__ = ("group_names", "constraints", "probability", "totals", "margins", "cage_counts")
+
+    def __init__(
+        self, group_names: List[str], constraints: ConstraintConfig, probability: float = MINIMIZATION_PROBABILITY
+    ) -> None:
+        self.group_names = group_names
+        self.constraints = constraints
+        self.probability = probability
+        self.totals: List[int] = [0] * len(group_names)
+        self.margins: Dict[str, Dict[str, List[int]]] = {}
+        self.cage_counts: Dict[str, List[int]] = {}
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "probability": self.probability,
+            "totals": list(self.totals),
+            "margins": {f: {level: list(c) for level, c in levels.items()} for f, levels in self.margins.items()},
+            "cage_counts": {cage: list(c) for cage, c in self.cage_counts.items()},
+        }
+
+    @classmethod
+    def from_state(cls, group_names: List[str], constraints: ConstraintConfig, state: Dict[str, Any]) -> "_Minimizer":
+        minimizer = cls(group_names, constraints, float(state.get("probability", MINIMIZATION_PROBABILITY)))
+        minimizer.totals = [int(n) for n in state["totals"]]
+        minimizer.margins = {
+            f: {level: [int(n) for n in c] for level, c in levels.items()} for f, levels in state["margins"].items()
+        }
+        minimizer.cage_counts = {cage: [int(n) for n in c] for cage, c in state["cage_counts"].items()}
+        return minimizer
+
+    def choose(self, levels: List[tuple[str, str]], cage: str, rng: random.Random) -> int:
+        scores = list(self.totals)
+        for factor, level in levels:
+            counts = self.margins.get(factor, {}).get(level)
+            if counts:
+                scores = [s + c for s, c in zip(scores, counts)]
+        per_cage = self.cage_counts.get(cage)
+        if per_cage and self.constraints.minimize_cage_clustering:
+            scores = [s + c for s, c in zip(scores, per_cage)]
+
+        positions = range(len(scores))
+        cap = self.constraints.max_animals_per_cage_per_group
+        if cap is not None and per_cage:
+            allowed = [p for p in positions if per_cage[p] < cap]
+            if allowed:
+                positions = allowed
+
+        best = min(scores[p] for p in positions)
+        preferred = [p for p in positions if scores[p] == best]
+        others = [p for p in positions if scores[p] != best]
+        if others and rng.random() >= self.probability:
+            return rng.choice(others)
+        return rng.choice(preferred)
+
+    def add(self, pos: int, levels: List[tuple[str, str]], cage: str) -> None:
+        size = len(self.group_names)
+        self.totals[pos] += 1
+        for factor, level in levels:
+            self.margins.setdefault(factor, {}).setdefault(level, [0] * size)[pos] += 1
+        self.cage_counts.setdefault(cage, [0] * size)[pos] += 1
+
+
+def _assign_minimization(
+    animals: AnimalCollection,
+    ids: Sequence[str],
+    cages: Sequence[str],
+    cfg: RandomizationConfig,
+    rng: random.Random,
+    minimizer: _Minimizer,
+) -> List[AssignmentRecord]:
+    columns = _factor_columns(animals, cfg.stratify_by or ["sex"], cfg.constraints.weight_balance)
+    order = list(range(len(ids)))
+    rng.shuffle(order)
+    assignments: List[AssignmentRecord] = []
+    for row in order:
+        levels = [(factor, values[row]) for factor, values in columns]
+        pos = minimizer.choose(levels, cages[row], rng)
+        minimizer.add(pos, levels, cages[row])
+        assignments.append(AssignmentRecord(animal_id=ids[row], group=cfg.group_names[pos]))
+    return assignments
+
+
+class _ClusterPacker:
+    """Whole-cage allocation: each new cage goes to the group with the fewest animals, then the lowest weight total.
+
+    Groups sit in a heap keyed by ``(animals, weight total, random tie-break)``, so
+    placing a cage costs O(log groups). Cages already placed keep their group,
+    which lets late animals join their cage mates.
+    """
+
+    __slots__ = ("group_names", "counts", "weights", "cage_groups", "_heap")
+
+    def __init__(self, group_names: List[str]) -> None:
+        self.group_names = group_names
+        self.counts: List[int] = [0] * len(group_names)
+        self.weights: List[float] = [0.0] * len(group_names)
+        self.cage_groups: Dict[str, int] = {}
+        self._heap: List[tuple[int, float, float, int]] = []
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"counts": list(self.counts), "weights": list(self.weights), "cage_groups": dict(self.cage_groups)}
+
+    @classmethod
+    def from_state(cls, group_names: List[str], state: Dict[str, Any]) -> "_ClusterPacker":
+        packer = cls(group_names)
+        packer.counts = [int(n) for n in state["counts"]]
+        packer.weights = [float(w) for w in state["weights"]]
+        packer.cage_groups = {cage: int(pos) for cage, pos in state["cage_groups"].items()}
+        return packer
+
+    def place(self, size: int, weight: float, rng: random.Random) -> int:
+        if not self._heap:
+            self._heap = [(self.counts[p], self.weights[p], rng.random(), p) for p in range(len(self.group_names))]
+            heapq.heapify(self._heap)
+        _, _, _, pos = self._heap[0]
+        self.counts[pos] += size
+        self.weights[pos] += weight
+        heapq.heapreplace(self._heap, (self.counts[pos], self.weights[pos], rng.random(), pos))
+        return pos
+
+    def join(self, pos: int, size: int, weight: float) -> None:
+        """Add animals to a group outside the packing order (late cage mates)."""
+
+        self.counts[pos] += size
+        self.weights[pos] += weight
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the heap after counts or weights changed outside :meth:`place`; it is rebuilt on demand."""
+
+        self._heap = []
+
+
+def _cluster_units(animals: AnimalCollection) -> List[tuple[str | None, List[int]]]:
+    """Rows per cage in first-seen order; animals without a cage form units of their own (key ``None``)."""
+
+    if isinstance(animals, AnimalTable):
+        keys = animals.cage.labels(lambda c: str(c) if c else None)[animals.cage.codes].tolist()
+    else:
+        keys = [str(a.cage) if a.cage else None for a in animals]
+    units: Dict[str, List[int]] = {}
+    loose: List[tuple[str | None, List[int]]] = []
+    for row, key in enumerate(keys):
+        if key is None:
+            loose.append((None, [row]))
+        else:
+            units.setdefault(key, []).append(row)
+    return list(units.items()) + loose
+
+
+def _swap_cluster_weights(placed: List[List[Any]], packer: _ClusterPacker, rounds: int) -> None:
+    """Narrow weight imbalance by swapping equal-size cages between the heaviest and lightest group.
+
+    ``placed`` holds ``[cage, rows, group position, weight total]`` for cages placed in
+    this call (earlier cages never move). Swaps keep every group's animal count, so
+    the count balance from packing is untouched; each round takes the swap whose
+    weight difference is closest to half the gap and stops when none narrows it.
+    """
+
+    size = len(packer.group_names)
+    total = sum(packer.counts)
+    if size < 2 or not total:
+        return
+    mean_weight = sum(packer.weights) / total
+    pools: Dict[tuple[int, int], List[tuple[float, int]]] = defaultdict(list)
+    for idx, (_, rows, pos, weight) in enumerate(placed):
+        pools[(pos, len(rows))].append((weight, idx))
+    for pool in pools.values():
+        pool.sort()
+
+    for _ in range(rounds):
+        excess = [packer.weights[g] - packer.counts[g] * mean_weight for g in range(size)]
+        heavy = max(range(size), key=excess.__getitem__)
+        light = min(range(size), key=excess.__getitem__)
+        gap = excess[heavy] - excess[light]
+        best: tuple[float, int, tuple[float, int], tuple[float, int]] | None = None
+        for (pos, units), heavy_pool in pools.items():
+            light_pool = pools.get((light, units)) if pos == heavy else None
+            if not light_pool:
+                continue
+            for heavy_item in heavy_pool:
+                k = bisect_left(light_pool, (heavy_item[0] - gap / 2, -1))
+                for light_item in light_pool[max(k - 1, 0) : k + 1]:
+                    diff = heavy_item[0] - light_item[0]
+                    if 0 < diff < gap and (best is None or abs(gap / 2 - diff) < best[0]):
+                        best = (abs(gap / 2 - diff), units, heavy_item, light_item)
+        if best is None:
+            return
+        _, units, heavy_item, light_item = best
+        pools[(heavy, units)].remove(heavy_item)
+        pools[(light, units)].remove(light_item)
+        insort(pools[(light, units)], heavy_item)
+        insort(pools[(heavy, units)], light_item)
+        placed[heavy_item[1]][2] = light
+        placed[light_item[1]][2] = heavy
+        diff = heavy_item[0] - light_item[0]
+        packer.weights[heavy] -= diff
+        packer.weights[light] += diff
+
+
+def _assign_cluster(
+    animals: AnimalCollection, ids: Sequence[str], cfg: RandomizationConfig, rng: random.Random, packer: _ClusterPacker
+) -> List[AssignmentRecord]:
+    if isinstance(animals, AnimalTable):
+        weights = animals.weight
+    else:
+        weights = np.array([np.nan if a.weight is None else float(a.weight) for a in animals], dtype=np.float64)
+    units = _cluster_units(animals)
+    rng.shuffle(units)
+    # Largest cages first (LPT); the shuffle randomizes the order among equal sizes.
+    units.sort(key=lambda unit: len(unit[1]), reverse=True)
+    placed: List[List[Any]] = []
+    for cage, rows in units:
+        weight = float(np.nansum(weights[rows]))
+        pos = packer.cage_groups.get(cage) if cage is not None else None
+        if pos is None:
+            placed.append([cage, rows, packer.place(len(rows), weight, rng), weight])
+        else:
+            packer.join(pos, len(rows), weight)
+            placed.append([cage, rows, pos, None])
+    fresh = [unit for unit in placed if unit[3] is not None]
+    _swap_cluster_weights(fresh, packer, rounds=4 * len(cfg.group_names))
+    packer.reset()
+
+    assignments: List[AssignmentRecord] = []
+    for cage, rows, pos, _ in placed:
+        if cage is not None:
+            packer.cage_groups[cage] = pos
+        group = cfg.group_names[pos]
+        assignments.extend(AssignmentRecord(animal_id=ids[row], group=group) for row in rows)
+    return assignments
+
+
+def cage_cap_shortfall(cage_sizes: Sequence[int], targets: Sequence[int], cap: int) -> tuple[int, int, int] | None:
+    """First violated cut of the cage -> group flow network, or ``None`` when the cap is satisfiable.
+
+    Cages supply their animals, every cage-group edge carries at most ``cap`` and
+    group ``g`` must receive ``targets[g]``. By max-flow/min-cut this is feasible
+    iff, for every ``m``, the ``m`` largest targets fit in ``sum(min(size, cap * m))``.
+    Returns ``(m, demand, capacity)`` for the smallest failing ``m``.
+    """
+
+    sizes = np.sort(np.asarray(cage_sizes, dtype=np.int64))
+    prefix = np.concatenate(([0], np.cumsum(sizes)))
+    demand = 0
+    for m, target in enumerate(sorted(targets, reverse=True), start=1):
+        demand += target
+        limit = cap * m
+        small = int(np.searchsorted(sizes, limit, side="right"))
+        capacity = int(prefix[small]) + limit * (len(sizes) - small)
+        if demand > capacity:
+            return m, demand, capacity
+    return None
+
+
+def _assign_capped(
+    rows: List[int],
+    ids: Sequence[str],
+    cages: Sequence[str],
     group_names: List[str],
-    group_counts: Dict[str, int],
-    cage_counts: Dict[str, Dict[str, int]],
-    constraints: ConstraintConfig,
+    cap: int,
     rng: random.Random,
-) -> str:
-    min_size = min(group_counts.values())
-    candidates = [g for g in group_names if group_counts[g] == min_size]
-
-    cage = str(animal.cage or "NA")
-    if constraints.max_animals_per_cage_per_group is not None:
-        limited = [
-            g
-            for g in candidates
-            if cage_counts[g][cage] < constraints.max_animals_per_cage_per_group
-        ]
-        if limited:
-            candidates = limited
+    selector: _GroupSelector,
+    used: Dict[str, Dict[str, int]] | None = None,
+) -> List[AssignmentRecord]:
+    """Equal group sizes with at most ``cap`` animals per cage per group, or ``ValueError`` if impossible.
+
+    Which groups take the ``n % groups`` extra animals is drawn at random and the
+    instance is checked with :func:`cage_cap_shortfall`. Cages (in shuffled order)
+    then hand out their animals one at a time to the group with the largest
+    remaining demand that is still below the cap for that cage, ties broken at
+    random; this greedy never gets stuck on a feasible instance. O(n log groups).
+
+    ``used`` holds the per-cage group counts of earlier strata or blocks of the same
+    cohort and is updated in place, so the cap holds for the whole cohort. A cage
+    then only has ``cap`` minus its count left in each group, which makes the groups
+    unequal: every group first receives ``n // groups`` animals, and the extras go
+    wherever the cages still have room. Animals the greedy cannot place are routed
+    along augmenting paths of the cage -> group flow network, so ``ValueError`` is
+    raised only when no such allocation exists.
+    """
 
-    if constraints.minimize_cage_clustering:
-        min_cage = min(cage_counts[g][cage] for g in candidates)
-        candidates = [g for g in candidates if cage_counts[g][cage] == min_cage]
+    rng.shuffle(rows)
+    members: Dict[str, List[int]] = {}
+    for row in rows:
+        members.setdefault(cages[row], []).append(row)
+    size = len(group_names)
+    base, extras = divmod(len(rows), size)
+    if used is None:
+        extra = set(rng.sample(range(size), extras))
+        remaining = [base + (pos in extra) for pos in range(size)]
+    else:
+        remaining = [base] * size
+    targets = [base + 1] * extras + [base] * (size - extras)
+    shortfall = cage_cap_shortfall([len(m) for m in members.values()], targets, cap)
+    if shortfall is not None:
+        m, demand, capacity = shortfall
+        raise ValueError(
+            f"No equal-size allocation keeps at most {cap} animals per cage per group: "
+            f"the {m} largest groups need {demand} animals but the cages can supply at most {capacity}"
+        )
 
-    return rng.choice(candidates)
+    prior = used if used is not None else {}
+
+    def limit(cage: str, pos: int) -> int:
+        return cap - prior.get(cage, {}).get(group_names[pos], 0)
+
+    placed: Dict[str, Dict[int, List[int]]] = {cage: defaultdict(list) for cage in members}
+    stuck: List[tuple[str, int]] = []
+    if used is not None:
+        # Spread each cage over the groups it has used least, keeping room for later strata/blocks.
+        for cage, cage_rows in members.items():
+            taken = placed[cage]
+            for row in cage_rows:
+                room = [(limit(cage, pos) - len(taken[pos]), remaining[pos], rng.random(), pos) for pos in range(size)]
+                best = max((r for r in room if r[0] > 0 and r[1] > 0), default=None)
+                if best is None:
+                    stuck.append((cage, row))
+                    continue
+                remaining[best[3]] -= 1
+                taken[best[3]].append(row)
+    else:
+        heap = [(-n, rng.random(), pos) for pos, n in enumerate(remaining) if n]
+        heapq.heapify(heap)
+        for cage, cage_rows in members.items():
+            taken = placed[cage]
+            held: List[int] = []
+            for row in cage_rows:
+                while heap:
+                    _, _, pos = heapq.heappop(heap)
+                    if len(taken[pos]) < limit(cage, pos):
+                        break
+                    held.append(pos)
+                else:
+                    stuck.append((cage, row))
+                    continue
+                remaining[pos] -= 1
+                taken[pos].append(row)
+                if remaining[pos]:
+                    if len(taken[pos]) < limit(cage, pos):
+                        heapq.heappush(heap, (-remaining[pos], rng.random(), pos))
+                    else:
+                        held.append(pos)
+            for pos in held:
+                heapq.heappush(heap, (-remaining[pos], rng.random(), pos))
+
+    order = list(range(size))
+
+    def route(cage: str, row: int) -> bool:
+        # With earlier strata/blocks, try the groups where the cage has the most room left first.
+        ranked = order if used is None else sorted(order, key=lambda pos: len(placed[cage][pos]) - limit(cage, pos))
+        return _augment(cage, row, placed, remaining, limit, ranked)
+
+    stuck = [(cage, row) for cage, row in stuck if not route(cage, row)]
+    if stuck and not any(remaining):
+        # Every group has its share; the extras may go to any group with room, one each.
+        remaining = [1] * size
+        rng.shuffle(order)
+        stuck = [(cage, row) for cage, row in stuck if not route(cage, row)]
+    if stuck:
+        raise ValueError(
+            f"No equal-size allocation keeps at most {cap} animals per cage per group across the cohort: "
+            f"an animal of cage {stuck[0][0]} cannot be placed given the earlier strata or blocks"
+        )
+
+    group_of = {row: pos for taken in placed.values() for pos, group_rows in taken.items() for row in group_rows}
+    assignments: List[AssignmentRecord] = []
+    for cage, cage_rows in members.items():
+        for row in cage_rows:
+            group = group_names[group_of[row]]
+            selector.add(group, cage)
+            if used is not None:
+                per_cage = used.setdefault(cage, {})
+                per_cage[group] = per_cage.get(group, 0) + 1
+            assignments.append(AssignmentRecord(animal_id=ids[row], group=group))
+    return assignments
+
+
+def _augment(
+    cage: str,
+    row: int,
+    placed: Dict[str, Dict[int, List[int]]],
+    remaining: List[int],
+    limit: Callable[[str, int], int],
+    order: List[int],
+) -> bool:
+    """Place ``row`` by shifting animals of other cages between groups along one breadth-first augmenting path.
+
+    Groups are tried in ``order``. Returns ``False``, changing nothing, when no group
+    with remaining demand can be reached; that cage then stays unreachable for the
+    rest of the solve, so each unplaced animal needs only one attempt.
+    """
+
+    parent: Dict[int, str] = {}
+    came_from: Dict[str, int] = {}
+    frontier = [cage]
+    seen = {cage}
+    while frontier:
+        following: List[str] = []
+        for current in frontier:
+            for pos in order:
+                if pos in parent or len(placed[current][pos]) >= limit(current, pos):
+                    continue
+                parent[pos] = current
+                if remaining[pos]:
+                    remaining[pos] -= 1
+                    while True:
+                        source = parent[pos]
+                        if source == cage:
+                            placed[source][pos].append(row)
+                            return True
+                        back = came_from[source]
+                        placed[source][pos].append(placed[source][back].pop())
+                        pos = back
+                for other, taken in placed.items():
+                    if other not in seen and taken[pos]:
+                        seen.add(other)
+                        came_from[other] = pos
+                        following.append(other)
+        frontier = following
+    return False
 
 
 def _assign_balanced(
-    animals: List[AnimalRecord],
+    rows: List[int],
+    ids: Sequence[str],
+    cages: Sequence[str],
     group_names: List[str],
     constraints: ConstraintConfig,
     rng: random.Random,
+    selector: _GroupSelector | None = None,
+    exact_cap: bool = False,
+    used: Dict[str, Dict[str, int]] | None = None,
+) -> List[AssignmentRecord]:
+    if selector is None:
+        selector = _GroupSelector(group_names, constraints)
+    cap = constraints.max_animals_per_cage_per_group
+    # The exact solver starts from empty groups; resumed selectors keep the greedy rule.
+    if exact_cap and cap is not None and cap > 0 and not any(selector.counts.values()):
+        return _assign_capped(rows, ids, cages, group_names, cap, rng, selector, used)
+
+    rng.shuffle(rows)
+    assignments = _assign_in_order(rows, ids, cages, rng, selector)
+    if used is not None:
+        for row, assignment in zip(rows, assignments):
+            per_cage = used.setdefault(cages[row], {})
+            per_cage[assignment.group] = per_cage.get(assignment.group, 0) + 1
+    return assignments
+
+
+def _assign_in_order(
+    rows: Sequence[int], ids: Sequence[str], cages: Sequence[str], rng: random.Random, selector: _GroupSelector
 ) -> List[AssignmentRecord]:
     assignments: List[AssignmentRecord] = []
-    group_counts = {g: 0 for g in group_names}
-    cage_counts: Dict[str, Dict[str, int]] = {g: defaultdict(int) for g in group_names}
-
-    rng.shuffle(animals)
-    for animal in animals:
-        chosen = _choose_group(animal, group_names, group_counts, cage_counts, constraints, rng)
-        group_counts[chosen] += 1
-        cage_counts[chosen][str(animal.cage or "NA")] += 1
-        assignments.append(AssignmentRecord(animal_id=animal.animal_id, group=chosen))
+    for row in rows:
+        cage = cages[row]
+        chosen = selector.choose(cage, rng)
+        selector.add(chosen, cage)
+        assignments.append(AssignmentRecord(animal_id=ids[row], group=chosen))
     return assignments
 
 
-def _build_blocks(
-    animals: List[AnimalRecord],
-    cfg: RandomizationConfig,
-    rng: random.Random,
-) -> List[List[AnimalRecord]]:
-    blocks: List[List[AnimalRecord]] = []
-    idx = 0
-    while idx < len(animals):
+def _matched_order(animals: AnimalCollection, cfg: RandomizationConfig, rng: random.Random) -> List[int]:
+    """Rows sorted by weight, then age when ``age`` is in ``stratify_by``.
+
+    Ties keep a random order and missing values sort last.
+    """
+
+    if isinstance(animals, AnimalTable):
+        weights, ages = animals.weight, animals.age
+    else:
+        weights = np.array([np.nan if a.weight is None else float(a.weight) for a in animals], dtype=np.float64)
+        ages = np.array([np.nan if a.age is None else float(a.age) for a in animals], dtype=np.float64)
+    rows = list(range(len(weights)))
+    rng.shuffle(rows)
+    perm = np.asarray(rows, dtype=np.intp)
+    keys = [weights[perm]] if "age" not in cfg.stratify_by else [ages[perm], weights[perm]]
+    # lexsort is stable (last key is primary) and puts NaN last.
+    return perm[np.lexsort(keys)].tolist()
+
+
+def _block_sizes(count: int, cfg: RandomizationConfig, rng: random.Random) -> List[int]:
+    sizes: List[int] = []
+    covered = 0
+    while covered < count:
         if cfg.random_block_sizes:
             size = rng.choice(cfg.random_block_sizes)
         else:
             size = cfg.block_size or len(cfg.group_names)
-        block = animals[idx : idx + size]
-        blocks.append(block)
+        sizes.append(size)
+        covered += size
+    return sizes
+
+
+def _build_blocks(
+    rows: List[int],
+    cfg: RandomizationConfig,
+    rng: random.Random,
+) -> List[List[int]]:
+    blocks: List[List[int]] = []
+    idx = 0
+    for size in _block_sizes(len(rows), cfg, rng):
+        blocks.append(rows[idx : idx + size])
         idx += size
     return blocks
 
 
-def randomize(animals: List[AnimalRecord], cfg: RandomizationConfig) -> tuple[List[AssignmentRecord], int]:
-    seed = cfg.seed if cfg.seed is not None else secrets.randbelow(2**31 - 1)
-    rng = random.Random(seed)
+def stream_seed(master_seed: int, label: str) -> int:
+    """Seed of the independent stream for one stratum or block (algorithm version 1.2.0)."""
+
+    digest = hashlib.sha256(f"stream:{master_seed}:{label}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % (2**31 - 1)
+
+
+def _at_least(cfg: RandomizationConfig, version: str) -> bool:
+    return ALGORITHM_VERSIONS.index(cfg.algorithm_version) >= ALGORITHM_VERSIONS.index(version)
+
+
+def _uses_streams(cfg: RandomizationConfig) -> bool:
+    return _at_least(cfg, "1.2.0")
+
+
+def _uses_cage_solver(cfg: RandomizationConfig) -> bool:
+    return _at_least(cfg, "1.3.0")
+
+
+def _rng_to_json(rng: random.Random) -> List[Any]:
+    version, internal, gauss = rng.getstate()
+    return [version, list(internal), gauss]
+
 
+def _rng_from_json(data: List[Any]) -> random.Random:
+    version, internal, gauss = data
+    rng = random.Random()
+    rng.setstate((version, tuple(internal), gauss))
+    return rng
+
+
+@dataclass(slots=True)
+class _AllocationState:
+    """Everything the engine carries between animals: RNGs, selectors per stratum, animals placed so far."""
+
+    rng: random.Random
+    seed: int
+    selectors: Dict[str, _GroupSelector] = field(default_factory=dict)
+    streams: Dict[str, random.Random] = field(default_factory=dict)
+    minimizer: _Minimizer | None = None
+    packer: _ClusterPacker | None = None
+    assigned: int = 0
+    blocks: int = 0
+    # Cohort-wide per-cage group counts for the exact cage cap across strata/blocks (1.3.0).
+    cage_counts: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def selector(self, key: str, cfg: RandomizationConfig) -> _GroupSelector:
+        selector = self.selectors.get(key)
+        if selector is None:
+            selector = self.selectors[key] = _GroupSelector(cfg.group_names, cfg.constraints)
+        return selector
+
+    def stream(self, label: str) -> random.Random:
+        rng = self.streams.get(label)
+        return rng if rng is not None else random.Random(stream_seed(self.seed, label))
+
+    def to_dict(self, cfg: RandomizationConfig) -> Dict[str, Any]:
+        return {
+            "method": cfg.method.lower(),
+            "algorithm_version": cfg.algorithm_version,
+            "group_names": list(cfg.group_names),
+            "seed": self.seed,
+            "assigned": self.assigned,
+            "blocks": self.blocks,
+            "rng_state": _rng_to_json(self.rng),
+            "streams": {label: _rng_to_json(rng) for label, rng in self.streams.items()},
+            "selectors": {key: selector.to_state() for key, selector in self.selectors.items()},
+            "minimizer": self.minimizer.to_state() if self.minimizer is not None else None,
+            "packer": self.packer.to_state() if self.packer is not None else None,
+            "cage_counts": {cage: dict(groups) for cage, groups in self.cage_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], cfg: RandomizationConfig) -> "_AllocationState":
+        if data.get("method") != cfg.method.lower() or data.get("group_names") != list(cfg.group_names):
+            raise ValueError("Allocation state does not match the project configuration")
+        if data.get("algorithm_version", "1.0.0") != cfg.algorithm_version:
+            raise ValueError(
+                f"Allocation state was written by algorithm version {data.get('algorithm_version', '1.0.0')}, "
+                f"not {cfg.algorithm_version}"
+            )
+        selectors = {
+            key: _GroupSelector.from_state(cfg.group_names, cfg.constraints, state)
+            for key, state in data.get("selectors", {}).items()
+        }
+        minimizer = data.get("minimizer")
+        packer = data.get("packer")
+        return cls(
+            rng=_rng_from_json(data["rng_state"]),
+            seed=int(data.get("seed", cfg.seed or 0)),
+            selectors=selectors,
+            streams={label: _rng_from_json(rng) for label, rng in data.get("streams", {}).items()},
+            minimizer=_Minimizer.from_state(cfg.group_names, cfg.constraints, minimizer) if minimizer else None,
+            packer=_ClusterPacker.from_state(cfg.group_names, packer) if packer else None,
+            assigned=int(data.get("assigned", 0)),
+            blocks=int(data.get("blocks", 0)),
+            cage_counts={
+                cage: {g: int(n) for g, n in groups.items()} for cage, groups in data.get("cage_counts", {}).items()
+            },
+        )
+
+
+# (animal IDs, cage keys, group names, constraints, stream, selector, exact cage cap, cohort cage counts)
+# for one stratum or block
+StreamTask = tuple[
+    List[str],
+    List[str],
+    List[str],
+    ConstraintConfig,
+    random.Random,
+    _GroupSelector,
+    bool,
+    Dict[str, Dict[str, int]] | None,
+]
+
+
+def _allocate_stream(task: StreamTask) -> tuple[List[AssignmentRecord], random.Random, _GroupSelector]:
+    ids, cages, group_names, constraints, rng, selector, exact_cap, used = task
+    rows = list(range(len(ids)))
+    assignments = _assign_balanced(rows, ids, cages, group_names, constraints, rng, selector, exact_cap, used)
+    return assignments, rng, selector
+
+
+def _run_streams(
+    tasks: List[StreamTask], workers: int
+) -> List[tuple[List[AssignmentRecord], random.Random, _GroupSelector]]:
+    """Allocate independent streams, in worker processes when ``workers > 1``; results keep task order."""
+
+    if workers <= 1 or len(tasks) <= 1:
+        return [_allocate_stream(task) for task in tasks]
+    workers = min(workers, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_allocate_stream, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def _cohort_cage_counts(cfg: RandomizationConfig) -> bool:
+    """Whether strata/blocks share cage counts so the exact cage cap holds for the whole cohort (1.3.0)."""
+
+    cap = cfg.constraints.max_animals_per_cage_per_group
+    return _uses_cage_solver(cfg) and cap is not None and cap > 0
+
+
+def _ordered_strata(animals: AnimalCollection, cfg: RandomizationConfig) -> List[tuple[str, List[int]]]:
+    if cfg.algorithm_version == "1.0.0":
+        strata: Dict[str, List[int]] = defaultdict(list)
+        keys = _stratum_keys(animals, cfg.stratify_by, cfg.constraints.weight_balance)
+        for row, key in enumerate(keys):
+            strata[key].append(row)
+        return sorted(strata.items(), key=lambda x: x[0])
+    return stratum_codes(animals, cfg.stratify_by, cfg.constraints.weight_balance).strata()
+
+
+def _allocate(
+    animals: AnimalCollection, cfg: RandomizationConfig, state: _AllocationState, workers: int = 1
+) -> List[AssignmentRecord]:
+    if cfg.algorithm_version not in ALGORITHM_VERSIONS:
+        raise ValueError(f"Unknown algorithm version: {cfg.algorithm_version}")
+    rng = state.rng
+    ids, cages = _engine_columns(animals)
     method = cfg.method.lower()
+    exact_cap = _uses_cage_solver(cfg)
+    # Strata/blocks then depend on each other's cage counts and are allocated in order.
+    used = state.cage_counts if _cohort_cage_counts(cfg) else None
+    if used is not None:
+        workers = 1
+    offset = state.assigned
+    state.assigned += len(ids)
+
     if method == "simple":
-        shuffled = list(animals)
+        shuffled = list(range(len(ids)))
         rng.shuffle(shuffled)
-        assignments = [
-            AssignmentRecord(animal_id=a.animal_id, group=cfg.group_names[idx % len(cfg.group_names)])
-            for idx, a in enumerate(shuffled)
+        return [
+            AssignmentRecord(animal_id=ids[row], group=cfg.group_names[(offset + idx) % len(cfg.group_names)])
+            for idx, row in enumerate(shuffled)
         ]
-        return assignments, seed
 
     if method == "balanced":
-        return _assign_balanced(list(animals), cfg.group_names, cfg.constraints, rng), seed
+        rows = list(range(len(ids)))
+        selector = state.selector("ALL", cfg)
+        return _assign_balanced(rows, ids, cages, cfg.group_names, cfg.constraints, rng, selector, exact_cap)
 
     if method == "stratified":
-        strata: Dict[str, List[AnimalRecord]] = defaultdict(list)
-        for animal in animals:
-            strata[_stratum_key(animal, cfg.stratify_by, cfg.constraints.weight_balance)].append(animal)
+        ordered = _ordered_strata(animals, cfg)
         combined: List[AssignmentRecord] = []
-        for _, rows in sorted(strata.items(), key=lambda x: x[0]):
-            combined.extend(_assign_balanced(rows, cfg.group_names, cfg.constraints, rng))
-        return combined, seed
+        if not _uses_streams(cfg):
+            for key, rows in ordered:
+                combined.extend(
+                    _assign_balanced(rows, ids, cages, cfg.group_names, cfg.constraints, rng, state.selector(key, cfg))
+                )
+            return combined
+        tasks: List[StreamTask] = [
+            (
+                [ids[r] for r in rows],
+                [cages[r] for r in rows],
+                cfg.group_names,
+                cfg.constraints,
+                state.stream(f"stratum:{key}"),
+                state.selector(key, cfg),
+                exact_cap,
+                used,
+            )
+            for key, rows in ordered
+        ]
+        for (key, _), (assignments, stream, selector) in zip(ordered, _run_streams(tasks, workers)):
+            state.streams[f"stratum:{key}"] = stream
+            state.selectors[key] = selector
+            combined.extend(assignments)
+        return combined
+
+    if method == "minimization":
+        if state.minimizer is None:
+            state.minimizer = _Minimizer(cfg.group_names, cfg.constraints)
+        return _assign_minimization(animals, ids, cages, cfg, rng, state.minimizer)
+
+    if method == "matched":
+        # After each full set every group has the same size, so the selector's
+        # smallest-group rule deals the next set out as a random permutation.
+        order = _matched_order(animals, cfg, rng)
+        return _assign_in_order(order, ids, cages, rng, state.selector("ALL", cfg))
+
+    if method == "cluster":
+        if state.packer is None:
+            state.packer = _ClusterPacker(cfg.group_names)
+        return _assign_cluster(animals, ids, cfg, rng, state.packer)
 
     if method == "block":
-        staged = list(animals)
+        staged = list(range(len(ids)))
         rng.shuffle(staged)
         blocks = _build_blocks(staged, cfg, rng)
         combined: List[AssignmentRecord] = []
-        for block in blocks:
-            combined.extend(_assign_balanced(block, cfg.group_names, cfg.constraints, rng))
-        return combined, seed
+        if not _uses_streams(cfg):
+            for block in blocks:
+                combined.extend(_assign_balanced(block, ids, cages, cfg.group_names, cfg.constraints, rng))
+            return combined
+        # Blocks never resume, so their streams are derived from the running block index and not stored.
+        first = state.blocks
+        state.blocks += len(blocks)
+        tasks = [
+            (
+                [ids[r] for r in block],
+                [cages[r] for r in block],
+                cfg.group_names,
+                cfg.constraints,
+                state.stream(f"block:{first + idx}"),
+                _GroupSelector(cfg.group_names, cfg.constraints),
+                exact_cap,
+                used,
+            )
+            for idx, block in enumerate(blocks)
+        ]
+        for assignments, _, _ in _run_streams(tasks, workers):
+            combined.extend(assignments)
+        return combined
 
     raise ValueError(f"Unknown randomization method: {cfg.method}")
+
+
+def randomize_with_state(
+    animals: AnimalCollection, cfg: RandomizationConfig, workers: int = 1
+) -> tuple[List[AssignmentRecord], int, Dict[str, Any]]:
+    """Like :func:`randomize`, also returning the JSON-ready engine state for :func:`extend_assignments`."""
+
+    seed = cfg.seed if cfg.seed is not None else secrets.randbelow(2**31 - 1)
+    state = _AllocationState(rng=random.Random(seed), seed=seed)
+    assignments = _allocate(animals, cfg, state, workers)
+    return assignments, seed, state.to_dict(cfg)
+
+
+def randomize(
+    animals: AnimalCollection, cfg: RandomizationConfig, workers: int = 1
+) -> tuple[List[AssignmentRecord], int]:
+    """Allocate ``animals`` to ``cfg.group_names``; returns the assignments and the seed used.
+
+    ``workers > 1`` allocates strata or blocks in worker processes under algorithm
+    version 1.2.0, where each has its own RNG stream; the result does not depend on
+    ``workers``. Earlier versions share one RNG and always run serially, as do
+    1.3.0 runs with a cage cap, whose strata or blocks share the cohort's cage counts.
+    """
+
+    assignments, seed, _ = randomize_with_state(animals, cfg, workers)
+    return assignments, seed
+
+
+def _iter_allocation(
+    ids: Sequence[Any], cages: Sequence[str], cfg: RandomizationConfig, seed: int
+) -> Iterator[AssignmentRecord]:
+    rng = random.Random(seed)
+    order = list(range(len(ids)))
+    rng.shuffle(order)
+    names = cfg.group_names
+    if cfg.method.lower() == "simple":
+        for idx, row in enumerate(order):
+            yield AssignmentRecord(animal_id=ids[row], group=names[idx % len(names)])
+        return
+
+    streams = _uses_streams(cfg)
+    exact_cap = _uses_cage_solver(cfg)
+    used: Dict[str, Dict[str, int]] | None = {} if _cohort_cage_counts(cfg) else None
+    start = 0
+    for index, size in enumerate(_block_sizes(len(order), cfg, rng)):
+        block = order[start : start + size]
+        start += size
+        if streams:
+            stream = random.Random(stream_seed(seed, f"block:{index}"))
+            yield from _assign_balanced(block, ids, cages, names, cfg.constraints, stream, None, exact_cap, used)
+        else:
+            yield from _assign_balanced(block, ids, cages, names, cfg.constraints, rng)
+
+
+def iter_randomize(
+    animals: AnimalCollection, cfg: RandomizationConfig
+) -> tuple[Iterator[AssignmentRecord], int]:
+    """Lazy :func:`randomize` for the ``simple`` and ``block`` methods.
+
+    Yields the same assignments in the same order as :func:`randomize`, but builds
+    records one block (or one animal, for ``simple``) at a time; only the row
+    permutation and the block sizes are held for the whole cohort. Arguments are
+    checked before the iterator is returned.
+    """
+
+    if cfg.algorithm_version not in ALGORITHM_VERSIONS:
+        raise ValueError(f"Unknown algorithm version: {cfg.algorithm_version}")
+    if cfg.method.lower() not in ("simple", "block"):
+        raise ValueError(f"Streaming allocation supports the simple and block methods, not {cfg.method}")
+    seed = cfg.seed if cfg.seed is not None else secrets.randbelow(2**31 - 1)
+    ids, cages = _engine_columns(animals)
+    return _iter_allocation(ids, cages, cfg, seed), seed
+
+
+def rederive_stream(animals: AnimalCollection, cfg: RandomizationConfig, label: str) -> List[AssignmentRecord]:
+    """Recompute one stratum (``"stratum:<label>"``) or block (``"block:<index>"``) of a 1.2.0 run.
+
+    Only the requested stream is allocated; the other strata or blocks are not
+    replayed. Block boundaries still come from the master shuffle, which is drawn
+    but not allocated. Under 1.3.0 with a cage cap the streams share cage counts,
+    so the streams before the requested one are replayed as well.
+    """
+
+    if not _uses_streams(cfg) or cfg.seed is None:
+        raise ValueError("Re-deriving a single stream requires algorithm version 1.2.0 and a fixed seed")
+    kind, _, key = label.partition(":")
+    ids, cages = _engine_columns(animals)
+    method = cfg.method.lower()
+    if kind == "stratum" and method == "stratified":
+        rows = dict(_ordered_strata(animals, cfg)).get(key)
+    elif kind == "block" and method == "block" and key.isdigit():
+        rng = random.Random(cfg.seed)
+        staged = list(range(len(ids)))
+        rng.shuffle(staged)
+        blocks = _build_blocks(staged, cfg, rng)
+        rows = blocks[int(key)] if int(key) < len(blocks) else None
+    else:
+        raise ValueError(f"Stream {label!r} does not apply to method {cfg.method}")
+    if rows is None:
+        raise ValueError(f"Unknown stream: {label}")
+    if _cohort_cage_counts(cfg):
+        wanted = {ids[r] for r in rows}
+        return [a for a in randomize(animals, cfg)[0] if a.animal_id in wanted]
+    assignments, _, _ = _allocate_stream(
+        (
+            [ids[r] for r in rows],
+            [cages[r] for r in rows],
+            cfg.group_names,
+            cfg.constraints,
+            random.Random(stream_seed(cfg.seed, label)),
+            _GroupSelector(cfg.group_names, cfg.constraints),
+            _uses_cage_solver(cfg),
+            None,
+        )
+    )
+    return assignments
+
+
+def extend_assignments(
+    new_animals: AnimalCollection, cfg: RandomizationConfig, state: Dict[str, Any]
+) -> tuple[List[AssignmentRecord], Dict[str, Any]]:
+    """Allocate late-arriving animals by resuming a saved engine state.
+
+    Balanced and stratified designs continue from the stored group and per-cage
+    counts (per stratum, and per-stratum streams under 1.2.0), minimization from
+    its marginal factor-level counts, matched designs form new sets from the batch
+    on top of the stored group counts, cluster designs send late animals to their
+    cage's group (new cages are packed as usual), simple designs continue the
+    round-robin and block designs open new blocks. Work is proportional to ``new_animals`` only;
+    the given ``state`` is not modified.
+    """
+
+    resumed = _AllocationState.from_dict(state, cfg)
+    assignments = _allocate(new_animals, cfg, resumed)
+    return assignments, resumed.to_dict(cfg)
@@ -20,10 +20,12 @@ def generate_html_report(project: ProjectModel, output_path: str | Path) -> Path
 
     group_cards = []
     for group, values in project.stats.get("groups", {}).items():
+        cages = f"<p>Cages={values['n_cages']}</p>" if "n_cages" in values else ""
         group_cards.append(
             "<div class='card'>"
             f"<h3>{group}</h3>"
             f"<p>N={values.get('n')}</p>"
+            f"{cages}"
             f"<p>Weight mean={values.get('weight_mean')}</p>"
             f"<p>Weight SD={values.get('weight_sd')}</p>"
             f"<p>Sex={values.get('sex_distribution')}</p>"
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import AssignmentRecord, RandomizationConfig, RerandomizationConfig
+from .randomization import randomize, randomize_with_state
+from .stats import compute_statistics
+from .table import AnimalCollection
+
+# (candidate index, candidate seed, max |Cohen's d| on weight, group size spread)
+Evaluation = Tuple[int, int, float, int]
+
+_BATCH_PER_WORKER = 8
+_worker_state: Dict[str, Any] = {}
+
+
+@dataclass(slots=True)
+class RerandomizationResult:
+    assignments: List[AssignmentRecord]
+    seed: int
+    master_seed: int
+    candidate_index: int
+    candidates_evaluated: int
+    max_abs_weight_d: float
+    group_size_spread: int
+    accepted: bool
+    allocation_state: Dict[str, Any] = field(default_factory=dict)
+
+
+def candidate_seed(master_seed: int, index: int) -> int:
+    """Seed of candidate ``index``; a pure function of the master seed so any candidate can be re-derived."""
+
+    digest = hashlib.sha256(f"rerandomization:{master_seed}:{index}".encode("ascii")).digest()
+    return int.from_bytes(digest[:8], "big") % (2**31 - 1)
+
+
+def balance_metrics(stats: Dict[str, Any]) -> Tuple[float, int]:
+    """Largest absolute pairwise weight Cohen's d and max-min group size from ``compute_statistics`` output."""
+
+    d_values = [abs(v["cohens_d_weight"]) for v in stats["effect_sizes"].values()]
+    sizes = [g["n"] for g in stats["groups"].values()]
+    return max(d_values, default=0.0), (max(sizes) - min(sizes)) if sizes else 0
+
+
+def _evaluate(animals: AnimalCollection, cfg: RandomizationConfig, master_seed: int, index: int) -> Evaluation:
+    seed = candidate_seed(master_seed, index)
+    assignments, _ = randomize(animals, replace(cfg, seed=seed))
+    stats, _ = compute_statistics(animals, assignments)
+    max_d, spread = balance_metrics(stats)
+    return index, seed, max_d, spread
+
+
+def _init_worker(animals: AnimalCollection, cfg: RandomizationConfig, master_seed: int) -> None:
+    _worker_state.update(animals=animals, cfg=cfg, master_seed=master_seed)
+
+
+def _evaluate_range(bounds: Tuple[int, int]) -> List[Evaluation]:
+    s = _worker_state
+    return [_evaluate(s["animals"], s["cfg"], s["master_seed"], idx) for idx in range(*bounds)]
+
+
+def _meets(evaluation: Evaluation, criterion: RerandomizationConfig) -> bool:
+    _, _, max_d, spread = evaluation
+    if spread > criterion.max_group_size_spread:
+        return False
+    return criterion.max_abs_weight_d is None or max_d <= criterion.max_abs_weight_d
+
+
+def _rank(evaluation: Evaluation, criterion: RerandomizationConfig) -> Tuple[bool, float, int]:
+    index, _, max_d, spread = evaluation
+    return spread > criterion.max_group_size_spread, max_d, index
+
+
+def rerandomize(
+    animals: AnimalCollection,
+    cfg: RandomizationConfig,
+    criterion: RerandomizationConfig,
+    workers: int = 1,
+) -> RerandomizationResult:
+    """Draw up to ``criterion.candidates`` allocations and keep one by weight balance.
+
+    With ``max_abs_weight_d`` set, the lowest-index candidate meeting the threshold
+    is accepted and evaluation stops early; otherwise all candidates are scored and
+    the best one (lowest max |d|, ties to the lower index) is kept. Candidate seeds
+    come from :func:`candidate_seed`, so the result does not depend on ``workers``.
+    """
+
+    if criterion.candidates < 1:
+        raise ValueError("Rerandomization requires at least one candidate")
+    master_seed = cfg.seed if cfg.seed is not None else secrets.randbelow(2**31 - 1)
+    early_stop = criterion.max_abs_weight_d is not None
+
+    best: Optional[Evaluation] = None
+    evaluated = 0
+
+    def consider(batch: List[Evaluation]) -> Optional[Evaluation]:
+        nonlocal best, evaluated
+        for evaluation in batch:
+            evaluated += 1
+            if best is None or _rank(evaluation, criterion) < _rank(best, criterion):
+                best = evaluation
+            if early_stop and _meets(evaluation, criterion):
+                return evaluation
+        return None
+
+    accepted: Optional[Evaluation] = None
+    if workers <= 1:
+        for idx in range(criterion.candidates):
+            accepted = consider([_evaluate(animals, cfg, master_seed, idx)])
+            if accepted is not None:
+                break
+    else:
+        step = _BATCH_PER_WORKER
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(animals, cfg, master_seed)
+        ) as pool:
+            for start in range(0, criterion.candidates, step * workers):
+                stop = min(start + step * workers, criterion.candidates)
+                ranges = [(lo, min(lo + step, stop)) for lo in range(start, stop, step)]
+                # map() yields in submission order, so batches are scanned in candidate-index order.
+                for batch in pool.map(_evaluate_range, ranges):
+                    accepted = consider(batch)
+                    if accepted is not None:
+                        break
+                if accepted is not None:
+                    break
+
+    chosen = accepted if accepted is not None else best
+    assert chosen is not None
+    index, seed, max_d, spread = chosen
+    assignments, _, state = randomize_with_state(animals, replace(cfg, seed=seed))
+    return RerandomizationResult(
+        assignments=assignments,
+        seed=seed,
+        master_seed=master_seed,
+        candidate_index=index,
+        candidates_evaluated=evaluated,
+        max_abs_weight_d=max_d,
+        group_size_spread=spread,
+        accepted=_meets(chosen, criterion),
+        allocation_state=state,
+    )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import mmap
+import secrets
+import struct
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from .hashing import sha256_of
+from .models import RandomizationConfig
+from .randomization import ALGORITHM_VERSIONS, _iter_allocation
+
+MAGIC = b"NPRSEQ\x00\x00"
+FORMAT_VERSION = 1
+# magic, format version, code width (bytes), seed, count, config SHA256 digest, algorithm version, group name bytes
+_HEADER = struct.Struct("<8sHB5xQQ32s16sI")
+_ALIGN = 8
+
+
+@dataclass(slots=True)
+class SequenceHeader:
+    seed: int
+    count: int
+    config_hash: str
+    algorithm_version: str
+    group_names: List[str]
+    code_width: int
+
+
+def _data_offset(names: bytes) -> int:
+    end = _HEADER.size + len(names)
+    return end + (-end % _ALIGN)
+
+
+def write_sequence(
+    path: str | Path, count: int, cfg: RandomizationConfig, chunk_size: int = 1 << 16
+) -> SequenceHeader:
+    """Pre-generate ``count`` block-method assignments as a binary sequence table.
+
+    Entry ``k`` is the group of the ``k``-th assignment that :func:`iter_randomize`
+    yields for ``count`` enrollees, stored as a fixed-width group code (1 byte, or 2
+    for more than 255 groups) after a header with the seed, the config hash and the
+    algorithm version. Enrollees have no cages, so a per-cage cap is rejected.
+    """
+
+    if cfg.method.lower() != "block":
+        raise ValueError("Sequence tables are generated with the block method")
+    if cfg.algorithm_version not in ALGORITHM_VERSIONS:
+        raise ValueError(f"Unknown algorithm version: {cfg.algorithm_version}")
+    if cfg.constraints.max_animals_per_cage_per_group is not None:
+        raise ValueError("Sequence tables have no cages; remove max_animals_per_cage_per_group")
+    if count < 0 or not cfg.group_names or len(cfg.group_names) > 0xFFFF:
+        raise ValueError("Sequence tables need a non-negative count and 1-65535 groups")
+    if cfg.seed is None:
+        cfg = replace(cfg, seed=secrets.randbelow(2**31 - 1))
+
+    header = SequenceHeader(
+        seed=cfg.seed,
+        count=count,
+        config_hash=sha256_of(asdict(cfg)),
+        algorithm_version=cfg.algorithm_version,
+        group_names=list(cfg.group_names),
+        code_width=1 if len(cfg.group_names) <= 0xFF else 2,
+    )
+    names = json.dumps(header.group_names, ensure_ascii=False).encode("utf-8")
+    dtype = np.uint8 if header.code_width == 1 else np.dtype("<u2")
+    position = {name: code for code, name in enumerate(header.group_names)}
+
+    with Path(path).open("wb") as handle:
+        handle.write(
+            _HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                header.code_width,
+                header.seed,
+                count,
+                bytes.fromhex(header.config_hash),
+                header.algorithm_version.encode("ascii"),
+                len(names),
+            )
+        )
+        handle.write(names)
+        handle.write(b"\x00" * (_data_offset(names) - _HEADER.size - len(names)))
+        chunk: List[int] = []
+        # Enrollees are placeholders numbered 0..count-1; only their groups are stored.
+        for assignment in _iter_allocation(range(count), ["NA"] * count, cfg, cfg.seed):
+            chunk.append(position[assignment.group])
+            if len(chunk) == chunk_size:
+                handle.write(np.asarray(chunk, dtype=dtype).tobytes())
+                chunk = []
+        handle.write(np.asarray(chunk, dtype=dtype).tobytes())
+    return header
+
+
+class SequenceTable:
+    """Read-only, memory-mapped view of a sequence table with O(1) lookup by enrollment index."""
+
+    def __init__(self, path: str | Path) -> None:
+        with Path(path).open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.header, self._offset = self._read_header()
+        except Exception:
+            self._map.close()
+            raise
+
+    def _read_header(self) -> tuple[SequenceHeader, int]:
+        if len(self._map) < _HEADER.size:
+            raise ValueError("Not a sequence table: file is too short")
+        magic, version, width, seed, count, digest, algorithm, name_bytes = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError("Not a sequence table: bad magic bytes")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported sequence table format version: {version}")
+        names = bytes(self._map[_HEADER.size : _HEADER.size + name_bytes])
+        offset = _data_offset(names)
+        if len(self._map) < offset + count * width:
+            raise ValueError("Sequence table is truncated")
+        header = SequenceHeader(
+            seed=seed,
+            count=count,
+            config_hash=digest.hex(),
+            algorithm_version=algorithm.rstrip(b"\x00").decode("ascii"),
+            group_names=json.loads(names.decode("utf-8")),
+            code_width=width,
+        )
+        return header, offset
+
+    def __len__(self) -> int:
+        return self.header.count
+
+    def code(self, index: int) -> int:
+        if not 0 <= index < self.header.count:
+            raise IndexError(f"Enrollment index {index} is outside 0..{self.header.count - 1}")
+        start = self._offset + index * self.header.code_width
+        return int.from_bytes(self._map[start : start + self.header.code_width], "little")
+
+    def __getitem__(self, index: int) -> str:
+        return self.header.group_names[self.code(index)]
+
+    def matches(self, cfg: RandomizationConfig) -> bool:
+        """True when ``cfg`` (with the table's seed) is the configuration the table was generated from."""
+
+        return sha256_of(asdict(replace(cfg, seed=self.header.seed))) == self.header.config_hash
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "SequenceTable":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -1,41 +1,185 @@
 from __future__ import annotations
 
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import asdict
 from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Sequence
 
 from .audit import AuditLogger
-from .hashing import sha256_of
-from .models import ProjectModel, RandomizationArtifacts
-from .randomization import randomize
-from .stats import compute_statistics
+from .cache import ResultCache
+from .hashing import MerkleTree, sha256_of, stream_sha256, to_canonical_json
+from .models import (
+    AnimalRecord,
+    AssignmentRecord,
+    OptimizerConfig,
+    ProjectModel,
+    RandomizationArtifacts,
+    RerandomizationConfig,
+)
+from .optimizer import optimize_allocation
+from .profiling import StageProfiler
+from .randomization import extend_assignments, randomize_with_state
+from .rerandomization import rerandomize
+from .stats import cage_cap_warnings, compute_statistics
+from .table import AnimalTable
 from .validation import validate_animals
 
 
 class RandomizerService:
-    def __init__(self) -> None:
+    def __init__(self, profiler: StageProfiler | None = None, cache: ResultCache | None = None) -> None:
         self.audit = AuditLogger()
+        self.profiler = profiler
+        self.cache = cache
 
-    def run(self, project: ProjectModel) -> RandomizationArtifacts:
-        validate_animals(project.animals)
+    def _stage(self, name: str) -> AbstractContextManager[None]:
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _record_profile(self, start: int) -> List[Dict[str, Any]]:
+        if self.profiler is None:
+            return []
+        stages = self.profiler.to_dicts(start)
+        self.audit.record("profile", {"stages": stages})
+        return stages
+
+    def _restore_cached(
+        self, project: ProjectModel, entry: Dict[str, Any], key: str, profiled: int
+    ) -> RandomizationArtifacts:
+        project.assignments = [AssignmentRecord(**a) for a in entry["assignments"]]
+        project.stats = entry["stats"]
+        project.warnings = list(entry["warnings"])
+        project.hashes = dict(entry["hashes"])
+        project.allocation_state = entry["allocation_state"]
+        project.merkle_leaves = list(entry.get("merkle_leaves", []))
+        self.audit.record("randomization", {"method": project.config.method, "seed": entry["seed"]})
+        self.audit.record("cache", {"key": key, "hit": True})
+        profile = self._record_profile(profiled)
+        project.audit_log.extend(self.audit.events())
+        return RandomizationArtifacts(
+            assignments=project.assignments,
+            stats=project.stats,
+            warnings=project.warnings,
+            seed=entry["seed"],
+            hashes=project.hashes,
+            generated_at=datetime.now(timezone.utc).isoformat(),
+            profile=profile,
+        )
+
+    def run(
+        self,
+        project: ProjectModel,
+        rerandomization: RerandomizationConfig | None = None,
+        workers: int = 1,
+        optimizer: OptimizerConfig | None = None,
+    ) -> RandomizationArtifacts:
+        if rerandomization is not None and optimizer is not None:
+            raise ValueError("Choose either rerandomization or the optimizer, not both")
+        profiled = len(self.profiler.timings) if self.profiler is not None else 0
+
+        with self._stage("validation"):
+            validate_animals(project.animals)
         self.audit.record("validation", {"animals": len(project.animals)})
 
-        assignments, seed = randomize(project.animals, project.config)
+        # Only plain runs with a fixed seed are a pure function of the hashed (validated, normalized) inputs.
+        cache_key = cached = None
+        if self.cache is not None and project.config.seed is not None and rerandomization is optimizer is None:
+            with self._stage("cache"):
+                cache_key = ResultCache.key(
+                    stream_sha256(project.animals), stream_sha256(project.config), project.config.algorithm_version
+                )
+                cached = self.cache.get(cache_key)
+            if cached is not None and not self.cache.verify:
+                return self._restore_cached(project, cached, cache_key, profiled)
+
+        rerandomized = None
+        optimized = None
+        with self._stage("randomization"):
+            if optimizer is not None:
+                optimized = optimize_allocation(project.animals, project.config, optimizer)
+                # Swaps invalidate the engine's per-cage counters, so optimized projects cannot be extended.
+                assignments, seed, state = optimized.assignments, optimized.seed, {}
+            elif rerandomization is None:
+                assignments, seed, state = randomize_with_state(project.animals, project.config, workers)
+            else:
+                rerandomized = rerandomize(project.animals, project.config, rerandomization, workers=workers)
+                assignments, seed = rerandomized.assignments, rerandomized.seed
+                state = rerandomized.allocation_state
         project.config.seed = seed
         self.audit.record("randomization", {"method": project.config.method, "seed": seed})
+        if rerandomized is not None:
+            # config.seed now holds the accepted candidate's seed; the master seed and
+            # candidate index let anyone re-derive it via rerandomization.candidate_seed.
+            self.audit.record(
+                "rerandomization",
+                {
+                    "master_seed": rerandomized.master_seed,
+                    "candidate_index": rerandomized.candidate_index,
+                    "candidate_seed": rerandomized.seed,
+                    "candidates_evaluated": rerandomized.candidates_evaluated,
+                    "criterion": asdict(rerandomization),
+                    "max_abs_weight_d": rerandomized.max_abs_weight_d,
+                    "group_size_spread": rerandomized.group_size_spread,
+                    "accepted": rerandomized.accepted,
+                },
+            )
+        if optimized is not None:
+            self.audit.record(
+                "optimization",
+                {
+                    "optimizer": asdict(optimizer),
+                    "optimizer_seed": optimized.optimizer_seed,
+                    "accepted_swaps": optimized.accepted,
+                    "initial_objective": optimized.initial_objective,
+                    "objective": optimized.objective,
+                    "terms": optimized.terms,
+                },
+            )
 
-        stats, warnings = compute_statistics(project.animals, assignments)
-        input_hash = sha256_of([asdict(a) for a in project.animals])
-        config_hash = sha256_of(asdict(project.config))
-        output_hash = sha256_of([asdict(a) for a in assignments])
+        with self._stage("statistics"):
+            stats, warnings = _statistics(project, assignments)
+        if rerandomized is not None and not rerandomized.accepted:
+            warnings.append(
+                f"Rerandomization criterion not met in {rerandomized.candidates_evaluated} candidates; "
+                f"kept the best-balanced candidate (#{rerandomized.candidate_index})."
+            )
+        with self._stage("hashing"):
+            tree = MerkleTree.from_records(project.animals)
+            hashes = {
+                "input_hash": stream_sha256(project.animals),
+                "config_hash": stream_sha256(project.config),
+                "output_hash": stream_sha256(assignments),
+                "input_merkle_root": tree.root,
+            }
+        if cache_key is not None:
+            entry = {
+                "seed": seed,
+                "assignments": [asdict(a) for a in assignments],
+                "stats": stats,
+                "warnings": list(warnings),
+                "hashes": hashes,
+                "allocation_state": state,
+                "merkle_leaves": tree.leaves,
+            }
+            stale = cached is not None and to_canonical_json(entry) != to_canonical_json(
+                {k: v for k, v in cached.items() if k != "key"}
+            )
+            if cached is None or stale:
+                self.cache.put(cache_key, entry)
+            if stale:
+                warnings.append("Cached result differed from a fresh run; the cache entry was replaced.")
+            details: Dict[str, Any] = {"key": cache_key, "hit": cached is not None}
+            if cached is not None:
+                details["verified"] = not stale
+            self.audit.record("cache", details)
 
         project.assignments = assignments
         project.stats = stats
         project.warnings = warnings
-        project.hashes = {
-            "input_hash": input_hash,
-            "config_hash": config_hash,
-            "output_hash": output_hash,
-        }
+        project.hashes = hashes
+        project.allocation_state = state
+        project.merkle_leaves = tree.leaves
+        profile = self._record_profile(profiled)
         project.audit_log.extend(self.audit.events())
 
         return RandomizationArtifacts(
@@ -45,4 +189,162 @@ class RandomizerService:
             seed=seed,
             hashes=project.hashes,
             generated_at=datetime.now(timezone.utc).isoformat(),
+            profile=profile,
+        )
+
+    def extend_allocation(self, project: ProjectModel, new_animals: Sequence[AnimalRecord]) -> RandomizationArtifacts:
+        """Allocate late-arriving animals without changing any existing assignment.
+
+        The engine resumes from ``project.allocation_state`` (RNG state plus group and
+        per-cage counters), so allocation work is proportional to the new batch. The
+        batch's IDs are recorded in an ``extension`` audit event, which is what
+        :func:`replay_allocation` uses to reproduce the full allocation. Returned
+        artifacts carry the new batch's assignments and the updated cohort statistics.
+        """
+
+        if not project.allocation_state:
+            raise ValueError("Project has no allocation state to extend; run the randomization first")
+        batch = list(new_animals)
+        profiled = len(self.profiler.timings) if self.profiler is not None else 0
+        with self._stage("validation"):
+            validate_animals(batch)
+            cohort = project.animals
+            existing = set(cohort.animal_id if isinstance(cohort, AnimalTable) else (a.animal_id for a in cohort))
+            for animal in batch:
+                if animal.animal_id in existing:
+                    raise ValueError(f"Duplicate Animal ID detected: {animal.animal_id}")
+
+        start = len(self.audit.events())
+        with self._stage("randomization"):
+            assignments, state = extend_assignments(batch, project.config, project.allocation_state)
+        self.audit.record(
+            "extension",
+            {
+                "batch": len(_extension_batches(project)) + 1,
+                "animal_ids": [a.animal_id for a in batch],
+                "resumed_state_hash": sha256_of(project.allocation_state),
+            },
+        )
+
+        # The stored leaves cover the cohort as last hashed, so only the batch is hashed into the tree.
+        if len(project.merkle_leaves) == len(project.animals):
+            tree = MerkleTree.from_hex(project.merkle_leaves)
+        else:
+            tree = MerkleTree.from_records(project.animals)
+        if isinstance(project.animals, AnimalTable):
+            project.animals = project.animals.concat(AnimalTable.from_records(batch))
+        else:
+            project.animals = list(project.animals) + batch
+        project.assignments = project.assignments + assignments
+        project.allocation_state = state
+        with self._stage("statistics"):
+            stats, warnings = _statistics(project, project.assignments)
+        project.stats = stats
+        project.warnings = warnings
+        with self._stage("hashing"):
+            for animal in batch:
+                tree.append(animal)
+            project.merkle_leaves = tree.leaves
+            project.hashes = {
+                "input_hash": stream_sha256(project.animals),
+                "config_hash": stream_sha256(project.config),
+                "output_hash": stream_sha256(project.assignments),
+                "input_merkle_root": tree.root,
+            }
+        profile = self._record_profile(profiled)
+        project.audit_log.extend(self.audit.events()[start:])
+
+        return RandomizationArtifacts(
+            assignments=assignments,
+            stats=stats,
+            warnings=warnings,
+            seed=project.config.seed,
+            hashes=project.hashes,
+            generated_at=datetime.now(timezone.utc).isoformat(),
+            profile=profile,
         )
+
+    def run_many(self, projects: Iterable[ProjectModel], workers: int = 1) -> List[RandomizationArtifacts]:
+        """Run several projects, in worker processes when ``workers > 1``.
+
+        Each project runs through its own service exactly as :meth:`run` would, so
+        seeds and hashes match the sequential path. Unset seeds are drawn here,
+        before dispatch, and the finished state is copied back onto the given projects.
+        Artifacts are returned in input order.
+        """
+
+        batch = list(projects)
+        for project in batch:
+            if project.config.seed is None:
+                project.config.seed = secrets.randbelow(2**31 - 1)
+
+        if workers <= 1 or len(batch) <= 1:
+            results = [_run_isolated(project) for project in batch]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(batch))) as pool:
+                results = list(pool.map(_run_isolated, batch))
+
+        artifacts: List[RandomizationArtifacts] = []
+        for project, (finished, result) in zip(batch, results):
+            if finished is not project:
+                project.config.seed = finished.config.seed
+                project.animals = finished.animals
+                project.assignments = finished.assignments
+                project.stats = finished.stats
+                project.warnings = finished.warnings
+                project.hashes = finished.hashes
+                project.allocation_state = finished.allocation_state
+                project.merkle_leaves = finished.merkle_leaves
+                project.audit_log = finished.audit_log
+            artifacts.append(result)
+        self.audit.record("batch", {"projects": len(batch), "workers": workers})
+        return artifacts
+
+
+def _run_isolated(project: ProjectModel) -> tuple[ProjectModel, RandomizationArtifacts]:
+    return project, RandomizerService().run(project)
+
+
+def _statistics(project: ProjectModel, assignments: List[AssignmentRecord]) -> tuple[Dict[str, Any], List[str]]:
+    clusters = project.config.method.lower() == "cluster"
+    stats, warnings = compute_statistics(project.animals, assignments, clusters=clusters)
+    if not clusters:
+        warnings.extend(cage_cap_warnings(stats, project.config.constraints.max_animals_per_cage_per_group))
+    return stats, warnings
+
+
+def _extension_batches(project: ProjectModel) -> List[List[str]]:
+    batches: List[List[str]] = []
+    for event in project.audit_log:
+        if event.action == "randomization":
+            batches = []
+        elif event.action == "extension":
+            batches.append(list(event.details["animal_ids"]))
+    return batches
+
+
+def _last_optimizer(project: ProjectModel) -> OptimizerConfig | None:
+    optimizer = None
+    for event in project.audit_log:
+        if event.action == "randomization":
+            optimizer = None
+        elif event.action == "optimization":
+            optimizer = OptimizerConfig(**event.details["optimizer"])
+    return optimizer
+
+
+def replay_allocation(project: ProjectModel) -> List[AssignmentRecord]:
+    """Recompute the full allocation from the seed and the audit log's optimization and extension events."""
+
+    optimizer = _last_optimizer(project)
+    if optimizer is not None:
+        return optimize_allocation(project.animals, project.config, optimizer).assignments
+    batches = _extension_batches(project)
+    late = {animal_id for ids in batches for animal_id in ids}
+    by_id = {a.animal_id: a for a in project.animals}
+    initial = [a for a in project.animals if a.animal_id not in late]
+    assignments, _, state = randomize_with_state(initial, project.config)
+    for ids in batches:
+        added, state = extend_assignments([by_id[i] for i in ids], project.config, state)
+        assignments.extend(added)
+    return assignments
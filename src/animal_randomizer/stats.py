@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from itertools import combinations
 from math import sqrt
 from statistics import mean, pstdev
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
 
 from .models import AnimalRecord, AssignmentRecord
+from .table import AnimalCollection, AnimalTable
 
 
 def _cohens_d(values_a: List[float], values_b: List[float]) -> float:
@@ -22,38 +25,152 @@ def _cohens_d(values_a: List[float], values_b: List[float]) -> float:
     return (mean_a - mean_b) / pooled
 
 
+def _label_codes(animals: AnimalCollection) -> Tuple[np.ndarray, List[str], np.ndarray, List[str]]:
+    """Row codes for the ``str(value or "NA")`` sex and cage labels used in the distributions."""
+
+    def label(value: Any) -> str:
+        return str(value or "NA")
+
+    if isinstance(animals, AnimalTable):
+        out: List[Any] = []
+        for column in (animals.sex, animals.cage):
+            lookup_codes, labels = pd.factorize(column.labels(label))
+            out.extend([lookup_codes[column.codes], list(labels)])
+        return out[0], out[1], out[2], out[3]
+    sex_codes, sex_labels = pd.factorize(np.array([label(a.sex) for a in animals], dtype=object))
+    cage_codes, cage_labels = pd.factorize(np.array([label(a.cage) for a in animals], dtype=object))
+    return sex_codes, list(sex_labels), cage_codes, list(cage_labels)
+
+
+def _weights(animals: AnimalCollection) -> np.ndarray:
+    if isinstance(animals, AnimalTable):
+        return animals.weight
+    return np.array([np.nan if a.weight is None else float(a.weight) for a in animals], dtype=np.float64)
+
+
+def _ids(animals: AnimalCollection) -> List[str]:
+    return animals.animal_id if isinstance(animals, AnimalTable) else [a.animal_id for a in animals]
+
+
+def _ordered_histograms(group_codes: np.ndarray, label_codes: np.ndarray, labels: List[str], n_groups: int):
+    """Per-group ``{label: count}`` dicts, keys in first-seen order within each group."""
+
+    width = max(len(labels), 1)
+    keys = group_codes.astype(np.int64) * width + label_codes
+    unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+    groups, label_idx = np.divmod(unique[order], width)
+    histograms: List[Dict[str, int]] = [{} for _ in range(n_groups)]
+    for group, label, count in zip(groups.tolist(), label_idx.tolist(), counts[order].tolist()):
+        histograms[group][labels[label]] = count
+    return histograms
+
+
+def _near_rounding_tie(values: np.ndarray, digits: int = 4) -> np.ndarray:
+    """Values whose ``round(x, digits)`` could flip under a few ulps of floating-point error."""
+
+    scaled = np.abs(values) * 10.0**digits
+    return np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+
+def cohens_d_matrix(means: np.ndarray, sds: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Pairwise Cohen's d on population SDs; ``0.0`` where either group has fewer than 2 values or pooled SD is 0."""
+
+    pooled = np.sqrt((sds[:, None] ** 2 + sds[None, :] ** 2) / 2.0)
+    valid = (counts[:, None] >= 2) & (counts[None, :] >= 2) & (pooled != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = (means[:, None] - means[None, :]) / pooled
+    return np.where(valid, d, 0.0)
+
+
 def compute_statistics(
-    animals: List[AnimalRecord],
+    animals: AnimalCollection,
     assignments: List[AssignmentRecord],
     weight_d_warning: float = 0.8,
+    clusters: bool = False,
 ) -> tuple[Dict[str, Any], List[str]]:
-    animal_map = {a.animal_id: a for a in animals}
-    by_group: Dict[str, List[AnimalRecord]] = defaultdict(list)
-    for row in assignments:
-        by_group[row.group].append(animal_map[row.animal_id])
+    """Group summaries and pairwise weight effect sizes in a single vectorized pass.
+
+    Per-group sufficient statistics (size, weight count, mean, sum of squared
+    deviations, sex and cage histograms) are computed once with ``bincount`` and
+    the full Cohen's d matrix is derived from them. Output keys, ordering and
+    4-decimal rounding match the original per-pair implementation; the rare value
+    sitting on a rounding tie is recomputed exactly with :mod:`statistics`.
+
+    With ``clusters=True`` (cage-level allocation) each group also reports
+    ``n_cages`` and a warning lists cages whose animals ended up in several groups.
+    """
 
     stats: Dict[str, Any] = {"groups": {}, "effect_sizes": {}}
     warnings: List[str] = []
+    if not assignments:
+        return stats, warnings
+
+    row_of = {animal_id: idx for idx, animal_id in enumerate(_ids(animals))}
+    rows = np.fromiter((row_of[a.animal_id] for a in assignments), dtype=np.intp, count=len(assignments))
+    group_codes, group_names = pd.factorize(np.array([a.group for a in assignments], dtype=object))
+    group_names = list(group_names)
+    n_groups = len(group_names)
+
+    sizes = np.bincount(group_codes, minlength=n_groups)
+    weights = _weights(animals)[rows]
+    present = ~np.isnan(weights)
+    w = weights[present]
+    wg = group_codes[present]
+    counts = np.bincount(wg, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.bincount(wg, weights=w, minlength=n_groups) / counts
+    ssd = np.bincount(wg, weights=(w - means[wg]) ** 2, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sds = np.sqrt(ssd / counts)
+
+    # Constant groups: the exact mean is the value itself and the SD is exactly 0.
+    lo = np.full(n_groups, np.inf)
+    hi = np.full(n_groups, -np.inf)
+    np.minimum.at(lo, wg, w)
+    np.maximum.at(hi, wg, w)
+    constant = (counts > 0) & (lo == hi)
+    means[constant] = lo[constant]
+    sds[constant] = 0.0
 
-    for group, rows in by_group.items():
-        weights = [float(a.weight) for a in rows if a.weight is not None]
-        sex_counts: Dict[str, int] = defaultdict(int)
-        cage_counts: Dict[str, int] = defaultdict(int)
-        for animal in rows:
-            sex_counts[str(animal.sex or "NA")] += 1
-            cage_counts[str(animal.cage or "NA")] += 1
+    def exact_weights(group: int) -> List[float]:
+        return w[wg == group].tolist()
+
+    sex_codes, sex_labels, cage_codes, cage_labels = _label_codes(animals)
+    sex_hist = _ordered_histograms(group_codes, sex_codes[rows], sex_labels, n_groups)
+    cage_hist = _ordered_histograms(group_codes, cage_codes[rows], cage_labels, n_groups)
+
+    mean_ties = _near_rounding_tie(means)
+    sd_ties = _near_rounding_tie(sds)
+    for g, group in enumerate(group_names):
+        k = int(counts[g])
+        weight_mean = None
+        if k:
+            weight_mean = round(mean(exact_weights(g)) if mean_ties[g] else float(means[g]), 4)
+        weight_sd = 0.0
+        if k > 1:
+            weight_sd = round(pstdev(exact_weights(g)) if sd_ties[g] else float(sds[g]), 4)
         stats["groups"][group] = {
-            "n": len(rows),
-            "weight_mean": round(mean(weights), 4) if weights else None,
-            "weight_sd": round(pstdev(weights), 4) if len(weights) > 1 else 0.0,
-            "sex_distribution": dict(sex_counts),
-            "cage_distribution": dict(cage_counts),
+            "n": int(sizes[g]),
+            "weight_mean": weight_mean,
+            "weight_sd": weight_sd,
+            "sex_distribution": sex_hist[g],
+            "cage_distribution": cage_hist[g],
         }
+        if clusters:
+            stats["groups"][group]["n_cages"] = sum(1 for cage in cage_hist[g] if cage != "NA")
 
-    for ga, gb in combinations(sorted(by_group.keys()), 2):
-        wa = [float(a.weight) for a in by_group[ga] if a.weight is not None]
-        wb = [float(a.weight) for a in by_group[gb] if a.weight is not None]
-        d = round(_cohens_d(wa, wb), 4)
+    d_matrix = cohens_d_matrix(means, sds, counts)
+    # Differences that round to zero are rechecked too, so the sign of 0.0 matches.
+    defined = (counts[:, None] >= 2) & (counts[None, :] >= 2) & ((sds[:, None] != 0) | (sds[None, :] != 0))
+    d_ties = _near_rounding_tie(d_matrix) | (defined & (np.abs(d_matrix) * 1e4 < 0.5 + 1e-6))
+    code_of = {name: g for g, name in enumerate(group_names)}
+    for ga, gb in combinations(sorted(group_names), 2):
+        a, b = code_of[ga], code_of[gb]
+        if d_ties[a, b]:
+            d = round(_cohens_d(exact_weights(a), exact_weights(b)), 4)
+        else:
+            d = round(float(d_matrix[a, b]), 4)
         label = f"{ga} vs {gb}"
         stats["effect_sizes"][label] = {"cohens_d_weight": d}
         if abs(d) >= weight_d_warning:
@@ -63,4 +180,160 @@ def compute_statistics(
     if group_sizes and max(group_sizes) - min(group_sizes) > 1:
         warnings.append("Group size imbalance exceeds 1 animal.")
 
+    if clusters:
+        seen: Dict[str, int] = {}
+        for summary in stats["groups"].values():
+            for cage in summary["cage_distribution"]:
+                seen[cage] = seen.get(cage, 0) + 1
+        split = sorted(cage for cage, n in seen.items() if n > 1 and cage != "NA")
+        if split:
+            warnings.append(f"Cluster warning: cages split across groups: {', '.join(split)}")
+
     return stats, warnings
+
+
+def cage_cap_warnings(stats: Dict[str, Any], cap: int | None) -> List[str]:
+    """Warn when any group holds more than ``cap`` animals from one cage (from ``compute_statistics`` output)."""
+
+    if cap is None or cap <= 0:
+        return []
+    over = [
+        (count, cage, group)
+        for group, summary in stats.get("groups", {}).items()
+        for cage, count in summary["cage_distribution"].items()
+        if count > cap
+    ]
+    if not over:
+        return []
+    count, cage, group = max(over, key=lambda x: x[0])
+    return [
+        f"Cage constraint violated: {len(over)} cage/group pairs exceed {cap} animals per cage per group "
+        f"(largest: {count} from cage {cage} in {group})."
+    ]
+
+
+class _GroupAccumulator:
+    __slots__ = ("n", "k", "mean", "m2", "sex", "cage")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.k = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sex: Dict[str, int] = {}
+        self.cage: Dict[str, int] = {}
+
+    @property
+    def sd(self) -> float:
+        return sqrt(max(self.m2, 0.0) / self.k) if self.k else 0.0
+
+
+def _bump(counter: Dict[str, int], key: str, delta: int) -> None:
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+class StatsAccumulator:
+    """Running version of :func:`compute_statistics` for animals enrolled in waves.
+
+    Each group keeps Welford running mean/variance of weight plus sex and cage
+    counts; the pairwise Cohen's d values touching a group are refreshed on every
+    change, so :meth:`add` and :meth:`remove` cost O(groups). :meth:`result` emits
+    the same ``stats``/``warnings`` structure as ``compute_statistics`` (equal up to
+    floating-point rounding). Groups and labels are listed in first-seen order and
+    disappear when their count drops to zero.
+    """
+
+    def __init__(self, weight_d_warning: float = 0.8) -> None:
+        self.weight_d_warning = weight_d_warning
+        self._groups: Dict[str, _GroupAccumulator] = {}
+        self._pair_d: Dict[Tuple[str, str], float] = {}
+
+    @classmethod
+    def from_assignments(
+        cls,
+        animals: AnimalCollection,
+        assignments: List[AssignmentRecord],
+        weight_d_warning: float = 0.8,
+    ) -> "StatsAccumulator":
+        acc = cls(weight_d_warning=weight_d_warning)
+        animal_map = {a.animal_id: a for a in animals}
+        for row in assignments:
+            acc.add(animal_map[row.animal_id], row.group)
+        return acc
+
+    def add(self, animal: AnimalRecord, group: str) -> None:
+        state = self._groups.get(group)
+        if state is None:
+            state = self._groups[group] = _GroupAccumulator()
+        state.n += 1
+        if animal.weight is not None:
+            x = float(animal.weight)
+            state.k += 1
+            delta = x - state.mean
+            state.mean += delta / state.k
+            state.m2 += delta * (x - state.mean)
+        _bump(state.sex, str(animal.sex or "NA"), 1)
+        _bump(state.cage, str(animal.cage or "NA"), 1)
+        self._refresh(group)
+
+    def remove(self, animal: AnimalRecord, group: str) -> None:
+        state = self._groups.get(group)
+        if state is None or state.n == 0:
+            raise ValueError(f"Group {group} has no animals to remove")
+        state.n -= 1
+        if animal.weight is not None:
+            x = float(animal.weight)
+            if state.k <= 1:
+                state.k, state.mean, state.m2 = 0, 0.0, 0.0
+            else:
+                previous = state.mean
+                state.k -= 1
+                state.mean = (previous * (state.k + 1) - x) / state.k
+                state.m2 -= (x - state.mean) * (x - previous)
+        _bump(state.sex, str(animal.sex or "NA"), -1)
+        _bump(state.cage, str(animal.cage or "NA"), -1)
+        if state.n == 0:
+            del self._groups[group]
+            self._pair_d = {pair: d for pair, d in self._pair_d.items() if group not in pair}
+            return
+        self._refresh(group)
+
+    def _refresh(self, group: str) -> None:
+        state = self._groups[group]
+        for other, other_state in self._groups.items():
+            if other == group:
+                continue
+            a, b = (state, other_state) if group < other else (other_state, state)
+            d = 0.0
+            if a.k >= 2 and b.k >= 2:
+                pooled = sqrt((a.sd**2 + b.sd**2) / 2.0)
+                if pooled != 0:
+                    d = (a.mean - b.mean) / pooled
+            self._pair_d[(group, other) if group < other else (other, group)] = d
+
+    def result(self) -> tuple[Dict[str, Any], List[str]]:
+        stats: Dict[str, Any] = {"groups": {}, "effect_sizes": {}}
+        warnings: List[str] = []
+        for group, state in self._groups.items():
+            stats["groups"][group] = {
+                "n": state.n,
+                "weight_mean": round(state.mean, 4) if state.k else None,
+                "weight_sd": round(state.sd, 4) if state.k > 1 else 0.0,
+                "sex_distribution": dict(state.sex),
+                "cage_distribution": dict(state.cage),
+            }
+        for ga, gb in combinations(sorted(self._groups), 2):
+            d = round(self._pair_d[(ga, gb)], 4)
+            label = f"{ga} vs {gb}"
+            stats["effect_sizes"][label] = {"cohens_d_weight": d}
+            if abs(d) >= self.weight_d_warning:
+                warnings.append(f"Weight imbalance warning ({label}): Cohen's d={d}")
+
+        group_sizes = [state.n for state in self._groups.values()]
+        if group_sizes and max(group_sizes) - min(group_sizes) > 1:
+            warnings.append("Group size imbalance exceeds 1 animal.")
+        return stats, warnings
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .models import AnimalRecord
+
+
+@dataclass(slots=True)
+class Categorical:
+    """Interned string column: ``codes`` index into ``categories``, ``-1`` marks a missing value."""
+
+    codes: np.ndarray
+    categories: List[Any]
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> "Categorical":
+        codes, uniques = pd.factorize(pd.Series(list(values), dtype=object), use_na_sentinel=True)
+        return cls(codes=codes.astype(np.int32, copy=False), categories=list(uniques))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def value(self, idx: int) -> Any:
+        code = int(self.codes[idx])
+        return None if code < 0 else self.categories[code]
+
+    def labels(self, fn: Callable[[Any], Any]) -> np.ndarray:
+        """Per-code lookup array of ``fn(category)``; the last slot holds ``fn(None)`` for missing rows."""
+
+        return np.array([fn(c) for c in self.categories] + [fn(None)], dtype=object)
+
+    def to_list(self) -> List[Any]:
+        return self.labels(lambda c: c)[self.codes].tolist()
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "Categorical":
+        return Categorical(codes=self.codes[np.asarray(indices, dtype=np.intp)], categories=self.categories)
+
+    def concat(self, other: "Categorical") -> "Categorical":
+        """Rows of ``self`` followed by rows of ``other``; new categories are appended in first-seen order."""
+
+        position = {c: i for i, c in enumerate(self.categories)}
+        categories = list(self.categories)
+        for c in other.categories:
+            if c not in position:
+                position[c] = len(categories)
+                categories.append(c)
+        lookup = np.array([position[c] for c in other.categories] + [-1], dtype=np.int32)
+        return Categorical(codes=np.concatenate([self.codes, lookup[other.codes]]), categories=categories)
+
+    def map(self, fn: Callable[[Any], Any]) -> "Categorical":
+        """Apply ``fn`` once per category and re-intern the results (``None`` becomes missing)."""
+
+        mapped = [fn(c) for c in self.categories]
+        remapped = Categorical.from_values(mapped)
+        lookup = np.append(remapped.codes, np.int32(-1))
+        return Categorical(codes=lookup[self.codes].astype(np.int32, copy=False), categories=remapped.categories)
+
+    def to_pandas(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.codes, categories=self.categories)
+
+
+def _float_column(values: Iterable[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _optional_float(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+@dataclass(slots=True)
+class AnimalTable:
+    """Struct-of-arrays animal cohort.
+
+    Weight and age are ``float64`` arrays with ``NaN`` for missing values (the same
+    float coercion the importers apply), sex/cage/strain/species are interned
+    categoricals, and free-text fields stay plain lists.
+    """
+
+    animal_id: List[str]
+    sex: Categorical
+    weight: np.ndarray
+    age: np.ndarray
+    cage: Categorical
+    strain: Categorical
+    species: Categorical
+    notes: List[Optional[str]]
+    source: List[Optional[str]]
+    date_of_arrival: List[Optional[str]]
+
+    @classmethod
+    def from_records(cls, records: Iterable[AnimalRecord]) -> "AnimalTable":
+        rows = list(records)
+        return cls(
+            animal_id=[a.animal_id for a in rows],
+            sex=Categorical.from_values(a.sex for a in rows),
+            weight=_float_column(a.weight for a in rows),
+            age=_float_column(a.age for a in rows),
+            cage=Categorical.from_values(a.cage for a in rows),
+            strain=Categorical.from_values(a.strain for a in rows),
+            species=Categorical.from_values(a.species for a in rows),
+            notes=[a.notes for a in rows],
+            source=[a.source for a in rows],
+            date_of_arrival=[a.date_of_arrival for a in rows],
+        )
+
+    @classmethod
+    def coerce(cls, animals: "AnimalCollection") -> "AnimalTable":
+        return animals if isinstance(animals, AnimalTable) else cls.from_records(animals)
+
+    def __len__(self) -> int:
+        return len(self.animal_id)
+
+    def __iter__(self) -> Iterator[AnimalRecord]:
+        for idx in range(len(self)):
+            yield self.record(idx)
+
+    def record(self, idx: int) -> AnimalRecord:
+        return AnimalRecord(
+            animal_id=self.animal_id[idx],
+            sex=self.sex.value(idx),
+            weight=_optional_float(self.weight[idx]),
+            age=_optional_float(self.age[idx]),
+            cage=self.cage.value(idx),
+            strain=self.strain.value(idx),
+            species=self.species.value(idx),
+            notes=self.notes[idx],
+            source=self.source[idx],
+            date_of_arrival=self.date_of_arrival[idx],
+        )
+
+    def to_records(self) -> List[AnimalRecord]:
+        weights = [None if w != w else w for w in self.weight.tolist()]
+        ages = [None if a != a else a for a in self.age.tolist()]
+        return [
+            AnimalRecord(*row)
+            for row in zip(
+                self.animal_id,
+                self.sex.to_list(),
+                weights,
+                ages,
+                self.cage.to_list(),
+                self.strain.to_list(),
+                self.species.to_list(),
+                self.notes,
+                self.source,
+                self.date_of_arrival,
+            )
+        ]
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "AnimalTable":
+        idx = np.asarray(indices, dtype=np.intp)
+        rows = idx.tolist()
+        return AnimalTable(
+            animal_id=[self.animal_id[i] for i in rows],
+            sex=self.sex.take(idx),
+            weight=self.weight[idx],
+            age=self.age[idx],
+            cage=self.cage.take(idx),
+            strain=self.strain.take(idx),
+            species=self.species.take(idx),
+            notes=[self.notes[i] for i in rows],
+            source=[self.source[i] for i in rows],
+            date_of_arrival=[self.date_of_arrival[i] for i in rows],
+        )
+
+    def concat(self, other: "AnimalTable") -> "AnimalTable":
+        return AnimalTable(
+            animal_id=self.animal_id + other.animal_id,
+            sex=self.sex.concat(other.sex),
+            weight=np.concatenate([self.weight, other.weight]),
+            age=np.concatenate([self.age, other.age]),
+            cage=self.cage.concat(other.cage),
+            strain=self.strain.concat(other.strain),
+            species=self.species.concat(other.species),
+            notes=self.notes + other.notes,
+            source=self.source + other.source,
+            date_of_arrival=self.date_of_arrival + other.date_of_arrival,
+        )
+
+    def row_index(self) -> Dict[str, int]:
+        """Map Animal ID to row; later duplicates win, like a dict built from records."""
+
+        return {animal_id: idx for idx, animal_id in enumerate(self.animal_id)}
+
+
+AnimalCollection = Union[Sequence[AnimalRecord], AnimalTable]
@@ -35,6 +35,7 @@ from PyQt6.QtWidgets import (
 from ..io_handlers import export_assignments, export_interop_bundle, import_animals
 from ..models import AnimalRecord, ConstraintConfig, ProjectModel, RandomizationConfig, StudyMetadata
 from ..project_io import save_project
+from ..randomization import METHODS
 from ..report import generate_html_report
 from ..service import RandomizerService
 from ..validation import normalize_sex_value
@@ -117,6 +118,21 @@ class ExportSummaryDialog(QDialog):
                 "Animals were allocated using block randomization with configured block size rules "
                 "to maintain temporal/allocation balance."
             )
+        if m == "minimization":
+            return (
+                "Animals were allocated using Pocock-Simon minimization over the selected factors "
+                "(marginal balance with a biased-coin probability of 0.8) to limit covariate imbalance."
+            )
+        if m == "matched":
+            return (
+                "Animals were ranked by body weight, divided into consecutive matched sets of one animal "
+                "per group, and randomized within each set."
+            )
+        if m == "cluster":
+            return (
+                "Whole cages were allocated as units (cluster randomization), balancing the number of "
+                "animals and total body weight per group; analyses should account for cage clustering."
+            )
         return (
             "Animals were allocated using a reproducible randomization workflow with documented "
             "configuration, seed, and integrity checks."
@@ -431,7 +447,7 @@ class MainWindow(QMainWindow):
         self.groups.setPlaceholderText("Example: Control,DrugA,DrugB")
         self.groups.setToolTip("Comma-separated group names used for allocation.")
         self.method = QComboBox()
-        self.method.addItems(["simple", "balanced", "stratified", "block"])
+        self.method.addItems(list(METHODS))
         self.method.setToolTip("balanced is usually the safest default.")
         self.seed = QLineEdit("")
         self.seed.setPlaceholderText("Optional integer seed, e.g. 20260218")
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from typing import Iterable
 
+import numpy as np
+
 from .models import AnimalRecord
+from .table import AnimalTable
 
 
 def normalize_sex_value(value: str | None) -> str | None:
@@ -23,17 +26,70 @@ def normalize_sex_value(value: str | None) -> str | None:
     raise ValueError(f"invalid sex value: {value}")
 
 
-def validate_animals(animals: Iterable[AnimalRecord]) -> None:
+def _validate_table(table: AnimalTable) -> None:
+    # Each check finds its first failing row; the earliest row is reported, as in the record path.
+    failures: list[tuple[int, int, str]] = []
     seen: set[str] = set()
-    for idx, animal in enumerate(animals, start=1):
-        if not animal.animal_id:
-            raise ValueError(f"Animal at row {idx} has empty Animal ID")
-        if animal.animal_id in seen:
-            raise ValueError(f"Duplicate Animal ID detected: {animal.animal_id}")
-        seen.add(animal.animal_id)
-        if animal.weight is not None and animal.weight <= 0:
-            raise ValueError(f"Animal {animal.animal_id} has non-positive weight")
+    for idx, animal_id in enumerate(table.animal_id):
+        if not animal_id:
+            failures.append((idx, 0, f"Animal at row {idx + 1} has empty Animal ID"))
+            break
+        if animal_id in seen:
+            failures.append((idx, 0, f"Duplicate Animal ID detected: {animal_id}"))
+            break
+        seen.add(animal_id)
+
+    non_positive = np.flatnonzero(table.weight <= 0)
+    if non_positive.size:
+        idx = int(non_positive[0])
+        failures.append((idx, 1, f"Animal {table.animal_id[idx]} has non-positive weight"))
+
+    normalized: list[str | None] = []
+    invalid: list[int] = []
+    for code, value in enumerate(table.sex.categories):
         try:
-            animal.sex = normalize_sex_value(animal.sex)
+            normalized.append(normalize_sex_value(value))
         except ValueError:
-            raise ValueError(f"Animal {animal.animal_id} has invalid sex value: {animal.sex}") from None
+            normalized.append(None)
+            invalid.append(code)
+    if invalid:
+        idx = int(np.flatnonzero(np.isin(table.sex.codes, invalid))[0])
+        failures.append((idx, 2, f"Animal {table.animal_id[idx]} has invalid sex value: {table.sex.value(idx)}"))
+
+    if failures:
+        raise ValueError(min(failures)[2])
+    table.sex = table.sex.map(normalize_sex_value)
+
+
+class AnimalValidator:
+    """Incremental form of :func:`validate_animals` for chunked imports.
+
+    Seen IDs are kept across batches so duplicates spanning chunks are caught; row
+    numbers in error messages count from the start of the stream.
+    """
+
+    def __init__(self) -> None:
+        self._seen: set[str] = set()
+        self._rows = 0
+
+    def validate(self, animals: Iterable[AnimalRecord]) -> None:
+        for animal in animals:
+            self._rows += 1
+            if not animal.animal_id:
+                raise ValueError(f"Animal at row {self._rows} has empty Animal ID")
+            if animal.animal_id in self._seen:
+                raise ValueError(f"Duplicate Animal ID detected: {animal.animal_id}")
+            self._seen.add(animal.animal_id)
+            if animal.weight is not None and animal.weight <= 0:
+                raise ValueError(f"Animal {animal.animal_id} has non-positive weight")
+            try:
+                animal.sex = normalize_sex_value(animal.sex)
+            except ValueError:
+                raise ValueError(f"Animal {animal.animal_id} has invalid sex value: {animal.sex}") from None
+
+
+def validate_animals(animals: Iterable[AnimalRecord] | AnimalTable) -> None:
+    if isinstance(animals, AnimalTable):
+        _validate_table(animals)
+        return
+    AnimalValidator().validate(animals)
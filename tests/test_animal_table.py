@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+
+from animal_randomizer.io_handlers import build_allocation_dataframe
+from animal_randomizer.models import AnimalRecord, ProjectModel, RandomizationConfig, StudyMetadata
+from animal_randomizer.project_io import load_project, save_project
+from animal_randomizer.randomization import _stratum_keys, randomize
+from animal_randomizer.stats import compute_statistics
+from animal_randomizer.table import AnimalTable
+from animal_randomizer.validation import validate_animals
+
+
+def sample_animals(n: int = 30):
+    return [
+        AnimalRecord(
+            animal_id=f"RAT_{i:03d}",
+            sex=["M", "F", None][i % 3],
+            weight=None if i % 11 == 0 else 200.0 + (i * 7) % 40,
+            age=float(8 + i % 3),
+            cage=f"C{i // 4}",
+            strain="Wistar",
+        )
+        for i in range(n)
+    ]
+
+
+def test_table_round_trips_records():
+    animals = sample_animals()
+    table = AnimalTable.from_records(animals)
+    assert len(table) == len(animals)
+    assert table.to_records() == animals
+    assert table.take([3, 1]).to_records() == [animals[3], animals[1]]
+
+
+@pytest.mark.parametrize("method", ["simple", "balanced", "stratified", "block"])
+def test_randomize_and_stats_match_record_path(method):
+    animals = sample_animals()
+    cfg = RandomizationConfig(
+        method=method, group_names=["A", "B", "C"], seed=5, stratify_by=["sex", "cage"], block_size=6
+    )
+    from_records, _ = randomize(animals, cfg)
+    from_table, _ = randomize(AnimalTable.from_records(animals), cfg)
+    assert from_table == from_records
+    assert compute_statistics(AnimalTable.from_records(animals), from_table) == compute_statistics(
+        animals, from_records
+    )
+
+
+def test_validate_table_normalizes_sex_and_reports_first_error():
+    table = AnimalTable.from_records([AnimalRecord("A1", sex="male"), AnimalRecord("A2", sex=" f ")])
+    validate_animals(table)
+    assert table.sex.to_list() == ["M", "F"]
+
+    bad = AnimalTable.from_records(
+        [AnimalRecord("A1", sex="x"), AnimalRecord("A1", weight=-1.0), AnimalRecord("A3", weight=0.0)]
+    )
+    with pytest.raises(ValueError, match="invalid sex value: x"):
+        validate_animals(bad)
+
+
+def test_allocation_dataframe_from_table_matches_records():
+    animals = sample_animals(12)
+    assignments, _ = randomize(animals, RandomizationConfig(method="balanced", group_names=["A", "B"], seed=1))
+    expected = build_allocation_dataframe(assignments, animals)
+    actual = build_allocation_dataframe(assignments, AnimalTable.from_records(animals))
+    assert actual.astype(object).where(actual.notna(), None).equals(
+        expected.astype(object).where(expected.notna(), None)
+    )
+
+
+def test_int_ages_stratify_the_same_for_records_and_tables():
+    animals = [
+        AnimalRecord(animal_id=f"R{i:02d}", sex="MF"[i % 2], weight=200.0 + i, age=8 + i % 3, cage=f"C{i // 4}")
+        for i in range(36)
+    ]
+    table = AnimalTable.from_records(animals)
+    cfg = RandomizationConfig(
+        method="stratified", group_names=["A", "B"], seed=5, stratify_by=["age", "sex"], algorithm_version="1.1.0"
+    )
+    assert randomize(table, cfg) == randomize(animals, cfg)
+
+
+def test_int_ages_keep_their_1_0_0_record_keys():
+    animals = [AnimalRecord(animal_id=f"R{i}", age=age) for i, age in enumerate([9, 9.5, 10, None])]
+    assert _stratum_keys(animals, ["age"], False) == ["9", "9.5", "10", "NA"]
+    assert _stratum_keys(AnimalTable.from_records(animals), ["age"], False) == ["9.0", "9.5", "10.0", "NA"]
+
+
+def test_table_backed_project_saves_as_records(tmp_path):
+    animals = sample_animals(6)
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=1)
+    project = ProjectModel(
+        metadata=StudyMetadata("S1", "T", "R", "I"),
+        animals=AnimalTable.from_records(animals),
+        config=cfg,
+        groups=cfg.group_names,
+    )
+    save_project(project, tmp_path / "table.nprj")
+    assert load_project(tmp_path / "table.nprj").animals == animals
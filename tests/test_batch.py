@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from animal_randomizer.batch import load_manifest, run_batch
+from animal_randomizer.cli import main
+from animal_randomizer.project_io import load_project
+
+
+def write_cohort(path, n=12):
+    rows = ["Animal ID,Sex,Weight,Cage"] + [f"R{i},{'MF'[i % 2]},{200 + i},C{i // 3}" for i in range(n)]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+
+def test_manifest_formats_resolve_relative_paths(tmp_path):
+    (tmp_path / "m.jsonl").write_text(
+        json.dumps({"input": "a.csv", "groups": ["A", "B"], "output": "out/a", "seed": 1}) + "\n\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "m.csv").write_text("input,groups,output,seed\na.csv,\"A,B\",out/a,1\n", encoding="utf-8")
+    jobs = load_manifest(tmp_path / "m.jsonl")
+    assert jobs == load_manifest(tmp_path / "m.csv")
+    assert jobs[0].input == str(tmp_path / "a.csv")
+    assert jobs[0].groups == ["A", "B"]
+
+    (tmp_path / "bad.jsonl").write_text(json.dumps({"input": "a.csv"}) + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="missing: groups, output"):
+        load_manifest(tmp_path / "bad.jsonl")
+
+
+def test_batch_cli_runs_studies_concurrently(tmp_path, capsys):
+    write_cohort(tmp_path / "a.csv")
+    write_cohort(tmp_path / "b.csv", n=9)
+    manifest = tmp_path / "studies.jsonl"
+    manifest.write_text(
+        "\n".join(
+            json.dumps(row)
+            for row in [
+                {"input": "a.csv", "groups": "A,B", "output": "out/a", "seed": 5, "study_id": 7},
+                {"input": "b.csv", "groups": "A,B,C", "output": "out/b", "method": "stratified", "seed": 6},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    main(["batch", str(manifest), "--jobs", "2"])
+
+    assert "2/2 studies completed" in capsys.readouterr().out
+    assert load_project(tmp_path / "out" / "b.nprj").config.seed == 6
+    assert load_project(tmp_path / "out" / "a.nprj").metadata.study_id == "7"
+    assert (tmp_path / "out" / "a.csv").exists()
+    assert (tmp_path / "out" / "a_report.html").exists()
+
+    sequential = run_batch(load_manifest(manifest), workers=1)
+    assert [r.seed for r in sequential] == [5, 6]
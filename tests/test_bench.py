@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from animal_randomizer.bench import compare_results, load_results, run_benchmarks, synthetic_cohort, write_results
+
+
+def test_benchmark_suite_runs_and_round_trips(tmp_path):
+    assert synthetic_cohort(30) == synthetic_cohort(30)
+    results = run_benchmarks([40], [2, 3], methods=["simple", "cluster"], repeats=1)
+    names = {(r.name, r.groups) for r in results}
+    assert {("randomize:cluster", 3), ("statistics", 2), ("import:csv", 2), ("project:load", 2)} <= names
+    assert all(r.seconds >= 0 and r.animals == 40 for r in results)
+
+    path = tmp_path / "bench.json"
+    write_results(results, path)
+    assert load_results(path) == results
+
+
+def test_compare_flags_only_slowdowns_beyond_tolerance():
+    baseline = run_benchmarks([10], [2], methods=["simple"], repeats=1)
+    slower = [replace(r, seconds=r.seconds * 2 + 1e-3) if r.name == "statistics" else r for r in baseline]
+    regressions = compare_results(slower, baseline, tolerance=0.5)
+    assert len(regressions) == 1 and regressions[0].startswith("statistics (animals=10, groups=2)")
+    assert compare_results(baseline, baseline) == []
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import replace
+
+import pytest
+from animal_randomizer.cache import ResultCache
+from animal_randomizer.models import AnimalRecord, ProjectModel, RandomizationConfig, StudyMetadata
+from animal_randomizer.service import RandomizerService, replay_allocation
+
+
+def project(seed: int | None = 6) -> ProjectModel:
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B", "C"], seed=seed)
+    animals = [
+        AnimalRecord(animal_id=f"A{i:02d}", sex="M" if i % 2 else "F", weight=20.0 + i % 7, cage=f"C{i // 3}")
+        for i in range(24)
+    ]
+    meta = StudyMetadata("S1", "T", "R", "I")
+    return ProjectModel(metadata=meta, animals=animals, config=cfg, groups=cfg.group_names)
+
+
+def cache_events(p: ProjectModel):
+    return [e.details for e in p.audit_log if e.action == "cache"]
+
+
+def test_cache_hit_returns_the_same_result(tmp_path):
+    cache = ResultCache(tmp_path)
+    first, second = project(), project()
+    fresh = RandomizerService(cache=cache).run(first)
+    cached = RandomizerService(cache=cache).run(second)
+
+    assert cached.assignments == fresh.assignments and cached.hashes == fresh.hashes
+    assert second.stats == json.loads(json.dumps(first.stats)) and second.allocation_state == first.allocation_state
+    assert [e["hit"] for e in cache_events(first) + cache_events(second)] == [False, True]
+    assert replay_allocation(second) == second.assignments
+
+    unseeded = project(seed=None)
+    RandomizerService(cache=cache).run(unseeded)
+    assert cache_events(unseeded) == [] and len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_cache_hit_validates_like_a_fresh_run(tmp_path):
+    def raw_project() -> ProjectModel:
+        p = project()
+        p.animals = [replace(a, sex="male" if a.sex == "M" else "female") for a in p.animals]
+        return p
+
+    fresh, hit = raw_project(), raw_project()
+    RandomizerService(cache=ResultCache(tmp_path)).run(fresh)
+    RandomizerService(cache=ResultCache(tmp_path)).run(hit)
+    assert cache_events(hit)[0]["hit"] and hit.animals == fresh.animals == project().animals
+    assert hit.hashes == fresh.hashes
+    assert [e.action for e in hit.audit_log] == [e.action for e in fresh.audit_log]
+
+    invalid = raw_project()
+    invalid.animals[1] = replace(invalid.animals[1], animal_id=invalid.animals[0].animal_id)
+    with pytest.raises(ValueError, match="Duplicate Animal ID"):
+        RandomizerService(cache=ResultCache(tmp_path)).run(invalid)
+
+
+def test_verify_replaces_stale_entries(tmp_path):
+    RandomizerService(cache=ResultCache(tmp_path)).run(project())
+    path = next(tmp_path.glob("*.json"))
+    entry = json.loads(path.read_text())
+    entry["assignments"][0]["group"] = "tampered"
+    path.write_text(json.dumps(entry))
+
+    p = project()
+    artifacts = RandomizerService(cache=ResultCache(tmp_path, verify=True)).run(p)
+    assert all(a.group != "tampered" for a in artifacts.assignments)
+    assert any("cache entry was replaced" in w for w in artifacts.warnings)
+    assert cache_events(p) == [{"key": path.stem, "hit": True, "verified": False}]
+    assert json.loads(path.read_text())["assignments"][0]["group"] != "tampered"
+
+
+def test_eviction_by_age_and_size(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=450, max_age_seconds=60)
+    old, a, b, c = (ResultCache.key(name, "cfg", "1.0.0") for name in ("old", "a", "b", "c"))
+    cache.put(old, {"payload": "x" * 100})
+    past = time.time() - 120
+    os.utime(tmp_path / f"{old}.json", (past, past))
+    assert cache.get(old) is None and not (tmp_path / f"{old}.json").exists()
+
+    cache.put(a, {"payload": "x" * 100})
+    os.utime(tmp_path / f"{a}.json", (past + 100, past + 100))
+    cache.put(b, {"payload": "x" * 100})
+    cache.put(c, {"payload": "x" * 100})
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == sorted([b, c])
+
+
+def test_eviction_and_clear_leave_foreign_files_alone(tmp_path):
+    foreign = tmp_path / "settings.json"
+    foreign.write_text("x" * 1000)
+    os.utime(foreign, (0, 0))
+    cache = ResultCache(tmp_path, max_bytes=300, max_age_seconds=60)
+    key = ResultCache.key("in", "cfg", "1.0.0")
+    cache.put(key, {"payload": "x"})
+    cache.evict()
+    assert foreign.exists() and cache.get(key) is not None
+
+    cache.clear()
+    assert foreign.exists() and not list(tmp_path.glob(f"{key}.json"))
+    with pytest.raises(ValueError, match="Not a cache key"):
+        cache.put("../settings", {})
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+import pytest
+
+from animal_randomizer.models import AnimalRecord, ConstraintConfig, ProjectModel, RandomizationConfig, StudyMetadata
+from animal_randomizer.project_io import load_project, save_project
+from animal_randomizer.randomization import _allocate, _AllocationState, extend_assignments, randomize_with_state
+from animal_randomizer.service import RandomizerService, replay_allocation
+from animal_randomizer.table import AnimalTable
+
+
+def cohort(start: int, n: int):
+    return [
+        AnimalRecord(
+            animal_id=f"RAT_{i:03d}",
+            sex="M" if i % 2 else "F",
+            weight=230.0 + (i * 7) % 30,
+            cage=f"C{i // 3}",
+        )
+        for i in range(start, start + n)
+    ]
+
+
+@pytest.mark.parametrize(
+    "method,version",
+    [(m, "1.0.0") for m in ("simple", "balanced", "stratified", "block", "minimization", "cluster", "matched")]
+    + [("stratified", "1.2.0"), ("block", "1.2.0")],
+)
+def test_extension_keeps_prior_assignments_and_replays(tmp_path, method, version):
+    cfg = RandomizationConfig(
+        method=method,
+        algorithm_version=version,
+        group_names=["A", "B", "C"],
+        seed=11,
+        stratify_by=["sex"],
+        block_size=6,
+        constraints=ConstraintConfig(max_animals_per_cage_per_group=1),
+    )
+    project = ProjectModel(
+        metadata=StudyMetadata("S1", "T", "R", "I"), animals=cohort(0, 18), config=cfg, groups=cfg.group_names
+    )
+    RandomizerService().run(project)
+    initial = list(project.assignments)
+
+    path = tmp_path / "study.nprj"
+    save_project(project, path)
+    project = load_project(path)
+    service = RandomizerService()
+    artifacts = service.extend_allocation(project, cohort(18, 7))
+    service.extend_allocation(project, cohort(25, 5))
+
+    assert project.assignments[: len(initial)] == initial
+    assert len(artifacts.assignments) == 7
+    assert len(project.assignments) == 30 and project.stats["groups"]
+    assert [e.details["batch"] for e in project.audit_log if e.action == "extension"] == [1, 2]
+    assert replay_allocation(project) == project.assignments
+    if method == "balanced":
+        sizes = Counter(a.group for a in project.assignments).values()
+        assert max(sizes) - min(sizes) <= 1
+
+
+def test_saved_state_resumes_like_in_memory_engine():
+    names = [f"G{i}" for i in range(12)]
+    cfg = RandomizationConfig(method="balanced", group_names=names, seed=3)
+    first, later = cohort(0, 50), cohort(50, 40)
+
+    state = _AllocationState(rng=random.Random(3), seed=3)
+    continuous = _allocate(first, cfg, state) + _allocate(later, cfg, state)
+
+    head, _, saved = randomize_with_state(first, cfg)
+    tail, resumed = extend_assignments(later, cfg, saved)
+    assert head + tail == continuous
+    assert resumed == state.to_dict(cfg)
+
+
+def test_extension_rejects_duplicate_ids_and_missing_state():
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=1)
+    project = ProjectModel(
+        metadata=StudyMetadata("S1", "T", "R", "I"), animals=cohort(0, 6), config=cfg, groups=cfg.group_names
+    )
+    with pytest.raises(ValueError, match="no allocation state"):
+        RandomizerService().extend_allocation(project, cohort(6, 2))
+    RandomizerService().run(project)
+    with pytest.raises(ValueError, match="Duplicate Animal ID"):
+        RandomizerService().extend_allocation(project, cohort(5, 2))
+
+
+def test_extension_of_table_backed_project_matches_records():
+    cfg = RandomizationConfig(method="stratified", group_names=["A", "B"], seed=5, stratify_by=["sex"])
+    projects = [
+        ProjectModel(metadata=StudyMetadata("S1", "T", "R", "I"), animals=animals, config=cfg, groups=cfg.group_names)
+        for animals in (cohort(0, 12), AnimalTable.from_records(cohort(0, 12)))
+    ]
+    for project in projects:
+        RandomizerService().run(project)
+        with pytest.raises(ValueError, match="Duplicate Animal ID"):
+            RandomizerService().extend_allocation(project, cohort(11, 2))
+        RandomizerService().extend_allocation(project, cohort(12, 5))
+    records, table = projects
+    assert isinstance(table.animals, AnimalTable) and table.animals.to_records() == records.animals
+    assert table.assignments == records.assignments and table.hashes == records.hashes
+
+
+def test_extension_rejects_state_from_another_algorithm_version():
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=1, algorithm_version="1.2.0")
+    _, _, state = randomize_with_state(cohort(0, 6), cfg)
+    cfg.algorithm_version = "1.3.0"
+    with pytest.raises(ValueError, match="algorithm version 1.2.0, not 1.3.0"):
+        extend_assignments(cohort(6, 2), cfg, state)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, replace
+
+from animal_randomizer import hashing
+from animal_randomizer.cli import main
+from animal_randomizer.hashing import (
+    MerkleTree,
+    diff_records,
+    iter_canonical_json,
+    sha256_of,
+    stream_sha256,
+    to_canonical_json,
+)
+from animal_randomizer.models import AnimalRecord, ProjectModel, RandomizationConfig, StudyMetadata
+from animal_randomizer.project_io import diff_projects, load_project, save_project
+from animal_randomizer.service import RandomizerService
+from animal_randomizer.table import AnimalTable
+
+
+def animals(n: int):
+    return [AnimalRecord(animal_id=f"A{i:03d}", sex="M" if i % 2 else "F", weight=200.0 + i) for i in range(n)]
+
+
+def test_incremental_merkle_updates_match_rebuild():
+    records = animals(13)
+    tree = MerkleTree()
+    for record in records:
+        tree.append(record)
+    assert tree.root == MerkleTree.from_records(records).root
+
+    before = MerkleTree.from_records(records)
+    records[4] = replace(records[4], weight=1.0)
+    records[11] = replace(records[11], sex="F")
+    tree.update(4, records[4])
+    tree.update(11, records[11])
+    assert tree.root == MerkleTree.from_records(records).root != before.root
+    assert before.changed_leaves(tree) == [4, 11]
+
+
+def test_diff_records_by_position_and_by_key():
+    old = animals(8)
+    edited = list(old)
+    edited[2] = replace(edited[2], weight=0.0)
+    assert diff_records(old, edited).changed == ["A002"]
+
+    reordered = edited[::-1][:-1] + animals(10)[8:]
+    diff = diff_records(old, reordered)
+    assert (diff.added, diff.removed, diff.changed) == (["A008", "A009"], ["A000"], ["A002"])
+
+
+def test_service_stores_root_and_projects_diff(tmp_path, capsys):
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=4)
+    project = ProjectModel(
+        metadata=StudyMetadata("S1", "T", "R", "I"), animals=animals(10), config=cfg, groups=cfg.group_names
+    )
+    RandomizerService().run(project)
+    assert project.hashes["input_merkle_root"] == MerkleTree.from_records(project.animals).root
+    save_project(project, tmp_path / "old.nprj")
+
+    project.animals[3] = replace(project.animals[3], weight=999.0)
+    RandomizerService().run(project)
+    save_project(project, tmp_path / "new.nprj")
+    assert diff_projects(tmp_path / "old.nprj", tmp_path / "new.nprj")["animals"].changed == ["A003"]
+
+    main(["diff", str(tmp_path / "old.nprj"), str(tmp_path / "new.nprj")])
+    assert "animals\tchanged\tA003" in capsys.readouterr().out.splitlines()
+
+
+def test_extension_hashes_only_the_batch_into_the_stored_leaves(tmp_path, monkeypatch):
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=4)
+    project = ProjectModel(
+        metadata=StudyMetadata("S1", "T", "R", "I"), animals=animals(10), config=cfg, groups=cfg.group_names
+    )
+    RandomizerService().run(project)
+    save_project(project, tmp_path / "run.nprj")
+    project = load_project(tmp_path / "run.nprj")
+    assert project.merkle_leaves == MerkleTree.from_records(project.animals).leaves
+
+    hashed = []
+    leaf_hash = hashing.leaf_hash
+    monkeypatch.setattr(hashing, "leaf_hash", lambda record: hashed.append(record) or leaf_hash(record))
+    batch = [replace(a, animal_id=f"B{i}") for i, a in enumerate(animals(3))]
+    RandomizerService().extend_allocation(project, batch)
+    assert hashed == batch
+    assert project.hashes["input_merkle_root"] == MerkleTree.from_records(project.animals).root
+    assert project.merkle_leaves == MerkleTree.from_records(project.animals).leaves
+
+
+def test_stream_hash_is_byte_identical_to_sha256_of():
+    records = animals(50) + [AnimalRecord(animal_id="Ü\"1", notes="a\nb", age=math.inf)]
+    cfg = RandomizationConfig(method="block", group_names=["A", "B"], random_block_sizes=[2, 4])
+    assert stream_sha256(records, buffer_size=64) == sha256_of([asdict(a) for a in records])
+    assert stream_sha256(cfg) == sha256_of(asdict(cfg))
+    nested = {"b": [1, 2.5, None, (True, "x")], "a": {2: "two", 1.5: {}}, "c": []}
+    assert "".join(iter_canonical_json(nested)) == to_canonical_json(nested)
+
+
+def test_animal_table_hashes_like_its_records():
+    records = animals(3000)
+    table = AnimalTable.from_records(records)
+    assert stream_sha256(table) == stream_sha256(records) == sha256_of(table)
+
+    records[1500] = replace(records[1500], weight=1.0)
+    assert stream_sha256(AnimalTable.from_records(records)) != stream_sha256(table)
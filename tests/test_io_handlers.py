@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from animal_randomizer.io_handlers import (
+    animals_from_dataframe,
+    export_assignment_stream,
+    export_assignments,
+    import_animal_table,
+    import_animals,
+    iter_animal_chunks,
+    stream_animals,
+    table_from_dataframe,
+)
+from animal_randomizer.models import AnimalRecord, AssignmentRecord
+from animal_randomizer.table import AnimalTable
+
+
+def registry_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Animal ID": [" R1 ", "R2", "R3"],
+            "Sex": ["male", "F", None],
+            "Weight": [250, None, 251.5],
+            "Age": ["10", None, 11],
+            "Cage": [1, 2, None],
+            "Condition/Notes": [None, "sick", None],
+        }
+    )
+
+
+def test_columnwise_conversion_matches_row_semantics():
+    animals = animals_from_dataframe(registry_frame())
+    assert animals == [
+        AnimalRecord("R1", sex="M", weight=250.0, age=10.0, cage="1.0"),
+        AnimalRecord("R2", sex="F", notes="sick", cage="2.0"),
+        AnimalRecord("R3", weight=251.5, age=11.0),
+    ]
+    assert table_from_dataframe(registry_frame()).to_records() == animals
+
+
+def test_conversion_rejects_invalid_values():
+    with pytest.raises(ValueError, match="invalid sex value"):
+        animals_from_dataframe(pd.DataFrame({"Animal_ID": ["A"], "Sex": ["x"]}))
+    with pytest.raises(ValueError):
+        animals_from_dataframe(pd.DataFrame({"Animal_ID": ["A"], "Weight": ["heavy"]}))
+    with pytest.raises(ValueError, match="Animal ID column"):
+        animals_from_dataframe(pd.DataFrame({"Name": ["A"]}))
+
+
+def test_import_animal_table_from_csv(tmp_path):
+    path = tmp_path / "animals.csv"
+    registry_frame().to_csv(path, index=False)
+    table = import_animal_table(path)
+    assert table.animal_id == ["R1", "R2", "R3"]
+    assert table.sex.to_list() == ["M", "F", None]
+
+
+def test_chunked_import_validates_across_chunks(tmp_path):
+    path = tmp_path / "registry.csv"
+    pd.DataFrame({"Animal ID": ["A1", "A2", "A3"], "Sex": ["m", "F", "f"], "Cage": ["1", None, "2"]}).to_csv(
+        path, index=False
+    )
+    chunks = list(iter_animal_chunks(path, chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert [a.sex for c in chunks for a in c] == ["M", "F", "F"]
+    assert [a.cage for c in chunks for a in c] == ["1", None, "2"]
+
+    pd.DataFrame({"Animal ID": ["A1", "A2", "A1"]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Duplicate Animal ID detected: A1"):
+        list(iter_animal_chunks(path, chunksize=2))
+
+
+def test_chunked_excel_import_matches_full_import(tmp_path):
+    path = tmp_path / "registry.xlsx"
+    frame = registry_frame().assign(Cage=["C1", "C2", None])
+    frame.to_excel(path, index=False)
+    assert stream_animals(path, chunksize=2) == import_animals(path)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_columnar_export_round_trips_animals(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    animals = animals_from_dataframe(registry_frame())
+    assignments = [AssignmentRecord(a.animal_id, "A" if i % 2 else "B") for i, a in enumerate(animals)]
+    path = tmp_path / f"allocation{suffix}"
+    export_assignments(assignments, path, animals=AnimalTable.from_records(animals))
+
+    assert import_animals(path) == animals
+    frame = pd.read_parquet(path) if suffix == ".parquet" else pd.read_feather(path)
+    assert frame["Group"].tolist() == ["B", "A", "B"]
+    assert frame["Weight"].dtype == "float64"
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".tsv"])
+def test_stream_export_matches_full_export(tmp_path, suffix):
+    animals = animals_from_dataframe(registry_frame())
+    assignments = [AssignmentRecord(a.animal_id, "A" if i % 2 else "B") for i, a in enumerate(animals)]
+    for collection in (animals, AnimalTable.from_records(animals)):
+        export_assignments(assignments, tmp_path / f"full{suffix}", animals=collection)
+        written = export_assignment_stream(iter(assignments), tmp_path / f"stream{suffix}", collection, chunk_size=2)
+        assert written == 3
+        assert (tmp_path / f"stream{suffix}").read_bytes() == (tmp_path / f"full{suffix}").read_bytes()
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+def test_stream_and_full_import_convert_types_alike(tmp_path, suffix):
+    path = tmp_path / f"registry{suffix}"
+    frame = pd.DataFrame({"Animal ID": [1, 2, 3], "Cage": [1, None, 2], "Notes": ["a", None, 7]})
+    if suffix == ".csv":
+        path.write_text("Animal ID,Cage,Notes\n1,1,a\n2,,\n3,2,7\n")
+    else:
+        frame.to_excel(path, index=False)
+    animals = import_animals(path)
+    assert list(stream_animals(path, chunksize=2)) == animals
+    assert [(a.animal_id, a.cage, a.notes) for a in animals] == [("1", "1", "a"), ("2", None, None), ("3", "2", "7")]
+
+
+def test_exported_notes_and_arrival_columns_are_imported(tmp_path):
+    path = tmp_path / "registry.csv"
+    path.write_text("Animal_ID,Notes,Date_of_arrival\nA1,sick,2026-02-18\n")
+    assert import_animals(path) == [AnimalRecord("A1", notes="sick", date_of_arrival="2026-02-18")]
+
+    path.write_text(
+        "Animal ID,Condition/Notes,Notes,Date of arrival,Date_of_arrival\nA1,kept,dropped,2026-01-01,2026-02-18\n"
+    )
+    assert import_animals(path) == [AnimalRecord("A1", notes="kept", date_of_arrival="2026-01-01")]
+
+
+def test_import_keeps_ids_and_cages_as_written(tmp_path):
+    path = tmp_path / "registry.csv"
+    path.write_text("Animal ID,Cage,Weight\n001,01,250\n002,,251.5\n")
+    animals = import_animals(path)
+    assert [(a.animal_id, a.cage, a.weight) for a in animals] == [("001", "01", 250.0), ("002", None, 251.5)]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+import pytest
+
+from animal_randomizer.models import (
+    AnimalRecord,
+    AssignmentRecord,
+    OptimizerConfig,
+    ProjectModel,
+    RandomizationConfig,
+    RerandomizationConfig,
+    StudyMetadata,
+)
+from animal_randomizer.optimizer import _anneal, _columns, _SwapState, objective_terms, optimize_allocation
+from animal_randomizer.randomization import randomize
+from animal_randomizer.service import RandomizerService, replay_allocation
+
+
+def cohort(n: int):
+    return [
+        AnimalRecord(
+            animal_id=f"M{i:03d}",
+            sex="M" if i % 3 else "F",
+            weight=20.0 + (i * 37) % 17 + (0.5 if i % 4 else 0.0),
+            age=8.0 + i % 5,
+            cage=f"C{i // 4}",
+        )
+        for i in range(n)
+    ]
+
+
+def test_optimizer_lowers_objective_and_keeps_group_sizes():
+    animals = cohort(60)
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B", "C"], seed=5)
+    result = optimize_allocation(animals, cfg, OptimizerConfig(moves=20_000))
+    start, _ = randomize(animals, cfg)
+
+    assert result.objective < result.initial_objective
+    assert Counter(a.group for a in result.assignments) == Counter(a.group for a in start)
+    assert [a.animal_id for a in result.assignments] == [a.animal_id for a in start]
+    assert optimize_allocation(animals, cfg, OptimizerConfig(moves=20_000)) == result
+
+
+def test_incremental_terms_match_full_recompute():
+    animals = cohort(45)
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B", "C", "D"], seed=9)
+    start, _ = randomize(animals, cfg)
+    ids, weight, age, sex, cage = _columns(animals)
+    position = {name: pos for pos, name in enumerate(cfg.group_names)}
+    group_of = {a.animal_id: position[a.group] for a in start}
+    state = _SwapState([group_of[i] for i in ids], 4, weight, age, sex, cage)
+
+    _anneal(state, OptimizerConfig(moves=5_000), random.Random(1))
+    final = {animal_id: cfg.group_names[g] for animal_id, g in zip(ids, state.group)}
+    full = objective_terms(animals, [AssignmentRecord(animal_id=i, group=final[i]) for i in ids], cfg.group_names)
+    assert full == pytest.approx(state.terms(), abs=1e-9)
+
+
+def test_service_records_optimization_and_replays():
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=3)
+    project = ProjectModel(
+        metadata=StudyMetadata("S1", "T", "R", "I"), animals=cohort(24), config=cfg, groups=cfg.group_names
+    )
+    RandomizerService().run(project, optimizer=OptimizerConfig(moves=2_000))
+
+    event = [e for e in project.audit_log if e.action == "optimization"][-1]
+    assert event.details["optimizer"]["moves"] == 2_000
+    assert event.details["objective"] <= event.details["initial_objective"]
+    assert project.allocation_state == {}
+    assert replay_allocation(project) == project.assignments
+    with pytest.raises(ValueError, match="not both"):
+        RandomizerService().run(project, rerandomization=RerandomizationConfig(), optimizer=OptimizerConfig())
+
+
+def test_optimizer_requires_balanced_start_and_keeps_cage_cap():
+    animals = cohort(40)
+    block = RandomizationConfig(method="block", group_names=["A", "B"], block_size=4)
+    with pytest.raises(ValueError, match="balanced allocation, not block"):
+        optimize_allocation(animals, block, OptimizerConfig())
+
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B", "C", "D"], seed=2)
+    cfg.constraints.max_animals_per_cage_per_group = 1
+    result = optimize_allocation(animals, cfg, OptimizerConfig(moves=20_000, cage_clustering=0.0))
+    cage_of = {a.animal_id: a.cage for a in animals}
+    assert result.accepted and max(Counter((a.group, cage_of[a.animal_id]) for a in result.assignments).values()) == 1
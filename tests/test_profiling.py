@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from animal_randomizer.models import AnimalRecord, ProjectModel, RandomizationConfig, StudyMetadata
+from animal_randomizer.profiling import StageProfiler
+from animal_randomizer.service import RandomizerService
+
+
+def project(n: int = 20) -> ProjectModel:
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=2)
+    animals = [AnimalRecord(animal_id=f"A{i}", sex="M" if i % 2 else "F", weight=20.0 + i) for i in range(n)]
+    return ProjectModel(metadata=StudyMetadata("S1", "T", "R", "I"), animals=animals, config=cfg, groups=["A", "B"])
+
+
+def test_profiler_records_stages_and_memory():
+    profiler = StageProfiler()
+    with profiler.stage("allocate"):
+        block = [0] * 500_000
+    del block
+    timing = profiler.timings[0]
+    assert timing.stage == "allocate" and timing.wall_seconds >= 0 and timing.cpu_seconds >= 0
+    assert timing.peak_memory_bytes >= 4_000_000
+    assert not tracemalloc.is_tracing()
+    assert "allocate" in profiler.format()
+
+
+def test_service_attaches_profile_to_artifacts_and_audit_log():
+    p = project()
+    profiler = StageProfiler(memory=False)
+    artifacts = RandomizerService(profiler=profiler).run(p)
+    stages = [s["stage"] for s in artifacts.profile]
+    assert stages == ["validation", "randomization", "statistics", "hashing"]
+    assert [e.details for e in p.audit_log if e.action == "profile"] == [{"stages": artifacts.profile}]
+
+    unprofiled = project()
+    baseline = RandomizerService().run(unprofiled)
+    assert baseline.profile == [] and baseline.assignments == artifacts.assignments
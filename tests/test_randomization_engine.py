@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import random
 from collections import Counter
 
+import pytest
+
 from animal_randomizer.models import AnimalRecord, ConstraintConfig, RandomizationConfig
-from animal_randomizer.randomization import randomize
+from animal_randomizer.randomization import (
+    _stratum_keys,
+    cage_cap_shortfall,
+    iter_randomize,
+    randomize,
+    rederive_stream,
+    stratum_codes,
+)
 from animal_randomizer.service import RandomizerService
+from animal_randomizer.stats import compute_statistics
 from animal_randomizer.models import ProjectModel, StudyMetadata
 from animal_randomizer.validation import validate_animals
 
@@ -82,3 +93,323 @@ def test_sex_normalization_accepts_common_values():
     assert animals[0].sex == "M"
     assert animals[1].sex == "F"
     assert animals[2].sex is None
+
+
+def _reference_choose_group(cage, group_names, group_counts, cage_counts, constraints, rng):
+    """The original linear-scan selection the indexed selector must reproduce."""
+    min_size = min(group_counts.values())
+    candidates = [g for g in group_names if group_counts[g] == min_size]
+    if constraints.max_animals_per_cage_per_group is not None:
+        limited = [g for g in candidates if cage_counts[g][cage] < constraints.max_animals_per_cage_per_group]
+        if limited:
+            candidates = limited
+    if constraints.minimize_cage_clustering:
+        min_cage = min(cage_counts[g][cage] for g in candidates)
+        candidates = [g for g in candidates if cage_counts[g][cage] == min_cage]
+    return rng.choice(candidates)
+
+
+def test_indexed_group_selector_matches_linear_scan():
+    from collections import defaultdict
+
+    from animal_randomizer.randomization import _GroupSelector
+
+    for trial in range(200):
+        setup = random.Random(trial)
+        group_names = [f"G{k}" for k in setup.sample(range(40), setup.randint(1, 12))]
+        if trial % 7 == 0:
+            group_names.append(group_names[0])
+        constraints = ConstraintConfig(
+            max_animals_per_cage_per_group=setup.choice([None, 0, 1, 2, 3]),
+            minimize_cage_clustering=setup.random() < 0.7,
+        )
+        cages = [f"C{setup.randrange(8)}" for _ in range(setup.randint(1, 80))]
+
+        rng_a, rng_b = random.Random(trial), random.Random(trial)
+        counts = {g: 0 for g in group_names}
+        cage_counts = {g: defaultdict(int) for g in group_names}
+        selector = _GroupSelector(group_names, constraints)
+        for cage in cages:
+            expected = _reference_choose_group(cage, group_names, counts, cage_counts, constraints, rng_a)
+            counts[expected] += 1
+            cage_counts[expected][cage] += 1
+            chosen = selector.choose(cage, rng_b)
+            selector.add(chosen, cage)
+            assert chosen == expected
+
+
+def test_run_many_matches_sequential_runs():
+    def make_projects():
+        meta = StudyMetadata(study_id="B", title="Batch", researcher_name="R", institution="I")
+        return [
+            ProjectModel(
+                metadata=meta,
+                animals=sample_animals(12 + k),
+                config=RandomizationConfig(method=method, group_names=["A", "B", "C"], seed=100 + k),
+                groups=["A", "B", "C"],
+            )
+            for k, method in enumerate(["simple", "balanced", "stratified", "block"])
+        ]
+
+    sequential = [RandomizerService().run(p) for p in make_projects()]
+    projects = make_projects()
+    batched = RandomizerService().run_many(projects, workers=2)
+
+    assert [a.seed for a in batched] == [a.seed for a in sequential]
+    assert [a.hashes for a in batched] == [a.hashes for a in sequential]
+    assert [p.assignments for p in projects] == [a.assignments for a in sequential]
+
+
+def test_minimization_balances_every_factor_margin():
+    animals = [
+        AnimalRecord(
+            animal_id=f"M{i:03d}",
+            sex="M" if i % 3 else "F",
+            weight=200.0 + (i * 13) % 60,
+            age=float(8 + i % 5),
+            cage=f"C{i // 4}",
+        )
+        for i in range(120)
+    ]
+    cfg = RandomizationConfig(
+        method="minimization", group_names=["A", "B", "C"], seed=9, stratify_by=["sex", "age", "cage"]
+    )
+    assignments, _ = randomize(animals, cfg)
+    assert assignments == randomize(animals, cfg)[0]
+    group_of = {a.animal_id: a.group for a in assignments}
+
+    sizes = Counter(group_of.values())
+    assert max(sizes.values()) - min(sizes.values()) <= 2
+    for field in ("sex", "age"):
+        for level in {getattr(a, field) for a in animals}:
+            per_group = Counter(group_of[a.animal_id] for a in animals if getattr(a, field) == level)
+            assert max(per_group[g] for g in cfg.group_names) - min(per_group[g] for g in cfg.group_names) <= 3
+
+
+def test_integer_stratum_codes_keep_labels_and_field_order():
+    animals = [
+        AnimalRecord(animal_id=f"R{i}", sex="MF"[i % 2], weight=230.0 + i, cage=["C1", "C10", "C2"][i % 3])
+        for i in range(30)
+    ]
+    codes = stratum_codes(animals, ["cage", "sex"], weight_balance=False)
+    assert codes.labels == ["C1|F", "C1|M", "C10|F", "C10|M", "C2|F", "C2|M"]
+    assert [codes.labels[c] for c in codes.codes.tolist()] == _stratum_keys(animals, ["cage", "sex"], False)
+
+    def run(version, stratify_by):
+        cfg = RandomizationConfig(
+            method="stratified", group_names=["A", "B"], seed=4, stratify_by=stratify_by, algorithm_version=version
+        )
+        return randomize(animals, cfg)[0]
+
+    assert run("1.1.0", ["sex", "weight"]) == run("1.0.0", ["sex", "weight"])
+    with pytest.raises(ValueError, match="Unknown algorithm version"):
+        run("9.9.9", ["sex"])
+
+
+@pytest.mark.parametrize("method", ["stratified", "block"])
+def test_stream_version_is_worker_independent_and_rederivable(method):
+    animals = sample_animals(60)
+    cfg = RandomizationConfig(
+        method=method,
+        group_names=["A", "B", "C"],
+        seed=21,
+        stratify_by=["sex", "age"],
+        block_size=6,
+        algorithm_version="1.2.0",
+    )
+    serial, _ = randomize(animals, cfg)
+    parallel, _ = randomize(animals, cfg, workers=2)
+    assert parallel == serial
+
+    if method == "stratified":
+        codes = stratum_codes(animals, cfg.stratify_by, True)
+        label = f"stratum:{codes.labels[2]}"
+        expected_ids = {a.animal_id for a, code in zip(animals, codes.codes.tolist()) if code == 2}
+    else:
+        label = "block:3"
+        expected_ids = {a.animal_id for a in serial[18:24]}
+    subset = rederive_stream(animals, cfg, label)
+    assert {a.animal_id for a in subset} == expected_ids
+    assert [a for a in serial if a.animal_id in expected_ids] == subset
+
+
+def test_stream_version_isolates_strata():
+    animals = sample_animals(40)
+    cfg = RandomizationConfig(
+        method="stratified", group_names=["A", "B"], seed=8, stratify_by=["sex"], algorithm_version="1.2.0"
+    )
+    before, _ = randomize(animals, cfg)
+    males_only_changed = animals + [AnimalRecord(animal_id="LATE", sex="M", weight=250, cage="C99", age=10)]
+    after, _ = randomize(males_only_changed, cfg)
+    females = {a.animal_id for a in animals if a.sex == "F"}
+    assert [a for a in before if a.animal_id in females] == [a for a in after if a.animal_id in females]
+
+
+def test_cage_cap_solver_meets_tight_cap_and_rejects_infeasible_designs():
+    animals = [AnimalRecord(animal_id=f"D{i:02d}", sex="M", weight=200.0 + i, cage=f"C{i % 5}") for i in range(40)]
+    constraints = ConstraintConfig(max_animals_per_cage_per_group=2)
+
+    def run(version, seed):
+        cfg = RandomizationConfig(
+            method="balanced", group_names=list("ABCD"), seed=seed, constraints=constraints, algorithm_version=version
+        )
+        return randomize(animals, cfg)[0]
+
+    cage_of = {a.animal_id: a.cage for a in animals}
+    for seed in range(5):
+        assignments = run("1.3.0", seed)
+        assert set(Counter(a.group for a in assignments).values()) == {10}
+        assert max(Counter((a.group, cage_of[a.animal_id]) for a in assignments).values()) == 2
+
+    project = ProjectModel(
+        metadata=StudyMetadata(study_id="S", title="T", researcher_name="R", institution="I"),
+        animals=animals,
+        config=RandomizationConfig(method="balanced", group_names=list("ABCD"), seed=2, constraints=constraints),
+        groups=list("ABCD"),
+    )
+    artifacts = RandomizerService().run(project)
+    assert any(w.startswith("Cage constraint violated") for w in artifacts.warnings)
+
+    assert cage_cap_shortfall([8, 8, 8, 8, 8], [10, 10, 10, 10], 2) is None
+    assert cage_cap_shortfall([12, 8, 8, 8, 4], [10, 10, 10, 10], 2) == (3, 30, 28)
+    dense = [AnimalRecord(animal_id=f"X{i}", cage="C1" if i < 9 else "C2") for i in range(12)]
+    cfg = RandomizationConfig(
+        method="balanced", group_names=list("ABC"), seed=1, constraints=constraints, algorithm_version="1.3.0"
+    )
+    with pytest.raises(ValueError, match="No equal-size allocation keeps at most 2 animals per cage"):
+        randomize(dense, cfg)
+
+
+@pytest.mark.parametrize("method", ["block", "stratified"])
+def test_cage_cap_holds_across_strata_and_blocks(method):
+    animals = [AnimalRecord(animal_id=f"M{i:02d}", sex="MF"[i % 2], cage=f"C{i // 4}") for i in range(16)]
+    cage_of = {a.animal_id: a.cage for a in animals}
+
+    def run(seed, version="1.3.0", cap=2, workers=1):
+        cfg = RandomizationConfig(
+            method=method,
+            group_names=["A", "B"],
+            seed=seed,
+            block_size=4,
+            stratify_by=["sex"],
+            algorithm_version=version,
+            constraints=ConstraintConfig(max_animals_per_cage_per_group=cap, weight_balance=False),
+        )
+        return randomize(animals, cfg, workers=workers)[0]
+
+    for seed in range(10):
+        assignments = run(seed)
+        assert set(Counter(a.group for a in assignments).values()) == {8}
+        assert max(Counter((a.group, cage_of[a.animal_id]) for a in assignments).values()) == 2
+    assert run(3, workers=2) == run(3)
+    assert any(max(Counter((a.group, cage_of[a.animal_id]) for a in run(s, "1.2.0")).values()) > 2 for s in range(10))
+    with pytest.raises(ValueError, match="across the cohort"):
+        run(0, cap=1)
+
+
+def test_cage_cap_places_small_strata_around_earlier_ones():
+    # Cage C1 must split 2/2 over the cohort, so the lone M|8 animal has to go where F|9 left room.
+    rows = [("F", 9, "C0"), ("F", 9, "C1"), ("F", 9, "C2"), ("M", 8, "C1"), ("M", 9, "C1"), ("M", 9, "C1")]
+    tiny = [AnimalRecord(animal_id=f"T{i}", sex=sex, age=age, cage=cage) for i, (sex, age, cage) in enumerate(rows)]
+    for seed in range(10):
+        cfg = RandomizationConfig(
+            method="stratified",
+            group_names=["A", "B"],
+            seed=seed,
+            stratify_by=["sex", "age"],
+            algorithm_version="1.3.0",
+            constraints=ConstraintConfig(max_animals_per_cage_per_group=2, weight_balance=False),
+        )
+        groups = Counter(a.group for a in randomize(tiny, cfg)[0] if a.animal_id in {"T1", "T3", "T4", "T5"})
+        assert groups == {"A": 2, "B": 2}
+
+    for seed in range(40):
+        rng = random.Random(seed)
+        animals = [
+            AnimalRecord(
+                f"A{i:02d}",
+                sex=rng.choice("MF"),
+                weight=rng.uniform(180, 320),
+                age=rng.choice([8, 9, 10]),
+                cage=f"C{i // 4}",
+            )
+            for i in range(24)
+        ]
+        cfg = RandomizationConfig(
+            method="stratified",
+            group_names=list("ABC"),
+            seed=seed,
+            stratify_by=["sex", "age"],
+            algorithm_version="1.3.0",
+            constraints=ConstraintConfig(max_animals_per_cage_per_group=2),
+        )
+        cage_of = {a.animal_id: a.cage for a in animals}
+        assert max(Counter((a.group, cage_of[a.animal_id]) for a in randomize(animals, cfg)[0]).values()) <= 2
+
+
+def test_cluster_keeps_cages_whole_and_balances_groups():
+    rng = random.Random(3)
+    animals = [
+        AnimalRecord(animal_id=f"K{c}_{j}", sex="F", weight=rng.uniform(180, 320), cage=f"C{c}")
+        for c in range(300)
+        for j in range(rng.randint(2, 5))
+    ]
+    animals.append(AnimalRecord(animal_id="LOOSE", sex="F", weight=250.0))
+    cfg = RandomizationConfig(method="cluster", group_names=["A", "B", "C", "D"], seed=12)
+    assignments, _ = randomize(animals, cfg)
+    group_of = {a.animal_id: a.group for a in assignments}
+    assert len(group_of) == len(animals)
+
+    by_cage = {}
+    for animal in animals:
+        by_cage.setdefault(animal.cage, set()).add(group_of[animal.animal_id])
+    assert all(len(groups) == 1 for groups in by_cage.values())
+
+    stats, warnings = compute_statistics(animals, assignments, clusters=True)
+    sizes = [g["n"] for g in stats["groups"].values()]
+    means = [g["weight_mean"] for g in stats["groups"].values()]
+    assert max(sizes) - min(sizes) <= 5
+    assert max(means) - min(means) < 1
+    assert sum(g["n_cages"] for g in stats["groups"].values()) == 300
+    assert not [w for w in warnings if w.startswith("Cluster warning")]
+
+
+def test_matched_sets_cover_every_group_and_beat_weight_bins():
+    rng = random.Random(5)
+    animals = [
+        AnimalRecord(animal_id=f"P{i:03d}", sex="M", weight=round(rng.uniform(200, 300), 1), cage=f"C{i // 6}")
+        for i in range(120)
+    ]
+    groups = ["A", "B", "C", "D"]
+    matched, _ = randomize(animals, RandomizationConfig(method="matched", group_names=groups, seed=1))
+    group_of = {a.animal_id: a.group for a in matched}
+
+    by_weight = sorted(animals, key=lambda a: a.weight)
+    for start in range(0, len(by_weight), len(groups)):
+        assert {group_of[a.animal_id] for a in by_weight[start : start + len(groups)]} == set(groups)
+
+    def spread(assignments):
+        means = [g["weight_mean"] for g in compute_statistics(animals, assignments)[0]["groups"].values()]
+        return max(means) - min(means)
+
+    stratified, _ = randomize(animals, RandomizationConfig(method="stratified", group_names=groups, seed=1))
+    assert spread(matched) < spread(stratified)
+
+
+@pytest.mark.parametrize("version", ["1.0.0", "1.2.0", "1.3.0"])
+@pytest.mark.parametrize("method,block_sizes", [("simple", []), ("block", []), ("block", [4, 6, 8])])
+def test_iter_randomize_matches_randomize(method, block_sizes, version):
+    cfg = RandomizationConfig(
+        method=method,
+        group_names=["A", "B"],
+        seed=9,
+        block_size=4,
+        random_block_sizes=block_sizes,
+        algorithm_version=version,
+        constraints=ConstraintConfig(max_animals_per_cage_per_group=2),
+    )
+    animals = sample_animals(50)
+    iterator, seed = iter_randomize(animals, cfg)
+    assert seed == 9 and list(iterator) == randomize(animals, cfg)[0]
+    with pytest.raises(ValueError, match="simple and block"):
+        iter_randomize(animals, RandomizationConfig(method="balanced", group_names=["A", "B"]))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from animal_randomizer.models import (
+    AnimalRecord,
+    ProjectModel,
+    RandomizationConfig,
+    RerandomizationConfig,
+    StudyMetadata,
+)
+from animal_randomizer.randomization import randomize
+from animal_randomizer.rerandomization import candidate_seed, rerandomize
+from animal_randomizer.service import RandomizerService
+
+
+def cohort(n: int = 40):
+    return [AnimalRecord(f"M{i:03d}", sex="MF"[i % 2], weight=20.0 + (i * 37) % 13, cage=f"C{i // 4}") for i in range(n)]
+
+
+def test_best_candidate_is_independent_of_worker_count():
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B", "C"], seed=99)
+    criterion = RerandomizationConfig(candidates=40)
+    serial = rerandomize(cohort(), cfg, criterion, workers=1)
+    parallel = rerandomize(cohort(), cfg, criterion, workers=2)
+    assert (serial.candidate_index, serial.seed, serial.assignments) == (
+        parallel.candidate_index,
+        parallel.seed,
+        parallel.assignments,
+    )
+    assert serial.candidates_evaluated == 40
+    assert serial.seed == candidate_seed(99, serial.candidate_index)
+    assert randomize(cohort(), replace(cfg, seed=serial.seed))[0] == serial.assignments
+
+
+def test_threshold_stops_at_first_accepted_candidate():
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=3)
+    best = rerandomize(cohort(), cfg, RerandomizationConfig(candidates=200))
+    criterion = RerandomizationConfig(candidates=200, max_abs_weight_d=best.max_abs_weight_d)
+    first = rerandomize(cohort(), cfg, criterion, workers=2)
+    assert first.accepted
+    assert first.candidate_index <= best.candidate_index
+    assert first.candidates_evaluated == first.candidate_index + 1
+
+
+def test_service_records_accepted_candidate_in_audit_log():
+    meta = StudyMetadata(study_id="R1", title="T", researcher_name="R", institution="I")
+    cfg = RandomizationConfig(method="balanced", group_names=["A", "B"], seed=11)
+    project = ProjectModel(metadata=meta, animals=cohort(), config=cfg, groups=cfg.group_names)
+
+    out = RandomizerService().run(project, rerandomization=RerandomizationConfig(candidates=25))
+
+    event = next(e for e in project.audit_log if e.action == "rerandomization")
+    assert event.details["master_seed"] == 11
+    assert candidate_seed(11, event.details["candidate_index"]) == out.seed == project.config.seed
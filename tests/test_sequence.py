@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from animal_randomizer.cli import main
+from animal_randomizer.models import AnimalRecord, ConstraintConfig, RandomizationConfig
+from animal_randomizer.randomization import iter_randomize
+from animal_randomizer.sequence import SequenceTable, write_sequence
+
+
+@pytest.mark.parametrize("version", ["1.0.0", "1.2.0"])
+def test_sequence_table_matches_block_allocation(tmp_path, version):
+    cfg = RandomizationConfig(
+        method="block", group_names=["A", "B", "C"], seed=8, random_block_sizes=[3, 6], algorithm_version=version
+    )
+    path = tmp_path / "plan.seq"
+    header = write_sequence(path, 500, cfg, chunk_size=64)
+
+    enrollees = [AnimalRecord(animal_id=str(k)) for k in range(500)]
+    expected = [a.group for a in iter_randomize(enrollees, cfg)[0]]
+    with SequenceTable(path) as table:
+        assert table.header == header and len(table) == 500
+        assert [table[k] for k in range(500)] == expected
+        assert table.matches(cfg) and not table.matches(RandomizationConfig(method="block", group_names=["A", "B"]))
+        with pytest.raises(IndexError):
+            table[500]
+
+
+def test_sequence_table_uses_two_byte_codes_for_many_groups(tmp_path):
+    names = [f"G{i}" for i in range(300)]
+    cfg = RandomizationConfig(method="block", group_names=names, seed=2)
+    write_sequence(tmp_path / "wide.seq", 900, cfg)
+    with SequenceTable(tmp_path / "wide.seq") as table:
+        assert table.header.code_width == 2
+        assert sorted(table[k] for k in range(300)) == sorted(names)
+
+
+def test_sequence_table_rejects_bad_input(tmp_path):
+    capped = RandomizationConfig(
+        method="block", group_names=["A", "B"], constraints=ConstraintConfig(max_animals_per_cage_per_group=1)
+    )
+    with pytest.raises(ValueError, match="no cages"):
+        write_sequence(tmp_path / "x.seq", 10, capped)
+    (tmp_path / "bad.seq").write_bytes(b"not a sequence table at all, clearly" * 4)
+    with pytest.raises(ValueError, match="magic"):
+        SequenceTable(tmp_path / "bad.seq")
+
+    write_sequence(tmp_path / "cut.seq", 100, RandomizationConfig(method="block", group_names=["A", "B"], seed=1))
+    data = (tmp_path / "cut.seq").read_bytes()
+    (tmp_path / "cut.seq").write_bytes(data[:-10])
+    with pytest.raises(ValueError, match="truncated"):
+        SequenceTable(tmp_path / "cut.seq")
+
+
+def test_sequence_cli_generates_and_queries(tmp_path, capsys):
+    path = str(tmp_path / "plan.seq")
+    main(["sequence", "generate", path, "--count", "12", "--groups", "A,B", "--block-size", "4", "--seed", "3"])
+    main(["sequence", "query", path, "0", "11"])
+    lines = capsys.readouterr().out.splitlines()
+    with SequenceTable(path) as table:
+        assert lines[-2:] == [f"0\t{table[0]}", f"11\t{table[11]}"]
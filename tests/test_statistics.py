@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+from itertools import combinations
+from statistics import mean, pstdev
+
+import numpy as np
+
+from animal_randomizer.models import AnimalRecord, AssignmentRecord
+from animal_randomizer.stats import _cohens_d, cohens_d_matrix, compute_statistics
+from animal_randomizer.table import AnimalTable
+
+
+def per_pair_reference(animals, assignments):
+    """The original per-pair implementation the vectorized version must reproduce."""
+    animal_map = {a.animal_id: a for a in animals}
+    by_group = defaultdict(list)
+    for row in assignments:
+        by_group[row.group].append(animal_map[row.animal_id])
+    stats = {"groups": {}, "effect_sizes": {}}
+    warnings = []
+    for group, rows in by_group.items():
+        weights = [float(a.weight) for a in rows if a.weight is not None]
+        sex_counts, cage_counts = defaultdict(int), defaultdict(int)
+        for a in rows:
+            sex_counts[str(a.sex or "NA")] += 1
+            cage_counts[str(a.cage or "NA")] += 1
+        stats["groups"][group] = {
+            "n": len(rows),
+            "weight_mean": round(mean(weights), 4) if weights else None,
+            "weight_sd": round(pstdev(weights), 4) if len(weights) > 1 else 0.0,
+            "sex_distribution": dict(sex_counts),
+            "cage_distribution": dict(cage_counts),
+        }
+    for ga, gb in combinations(sorted(by_group), 2):
+        wa = [float(a.weight) for a in by_group[ga] if a.weight is not None]
+        wb = [float(a.weight) for a in by_group[gb] if a.weight is not None]
+        d = round(_cohens_d(wa, wb), 4)
+        stats["effect_sizes"][f"{ga} vs {gb}"] = {"cohens_d_weight": d}
+        if abs(d) >= 0.8:
+            warnings.append(f"Weight imbalance warning ({ga} vs {gb}): Cohen's d={d}")
+    sizes = [v["n"] for v in stats["groups"].values()]
+    if sizes and max(sizes) - min(sizes) > 1:
+        warnings.append("Group size imbalance exceeds 1 animal.")
+    return stats, warnings
+
+
+def test_vectorized_statistics_match_per_pair_reference():
+    for trial in range(300):
+        rng = random.Random(trial)
+        decimals = rng.choice([0, 1, 4])
+        animals = [
+            AnimalRecord(
+                f"A{i}",
+                sex=rng.choice(["M", "F", None, ""]),
+                weight=None if rng.random() < 0.1 else round(rng.uniform(250, 250.002 if decimals == 4 else 300), decimals),
+                cage=rng.choice([None, "", "C1", "C2", "C3"]),
+            )
+            for i in range(rng.randint(0, 50))
+        ]
+        groups = [f"G{k}" for k in rng.sample(range(10), rng.randint(1, 6))]
+        assignments = [AssignmentRecord(a.animal_id, rng.choice(groups)) for a in animals]
+        expected = per_pair_reference(animals, assignments)
+        assert repr(compute_statistics(animals, assignments)) == repr(expected)
+        assert repr(compute_statistics(AnimalTable.from_records(animals), assignments)) == repr(expected)
+
+
+def test_cohens_d_matrix_is_antisymmetric_with_undefined_pairs_zeroed():
+    d = cohens_d_matrix(np.array([10.0, 12.0, 5.0]), np.array([2.0, 2.0, 0.0]), np.array([5, 5, 1]))
+    assert d[0, 1] == -1.0 and d[1, 0] == 1.0
+    assert d[0, 2] == 0.0 and d[2, 1] == 0.0
+
+
+def _rounded_close(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_rounded_close(a[k], b[k]) for k in a)
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) <= 1e-4
+    return a == b
+
+
+def test_stats_accumulator_tracks_adds_and_removes():
+    from animal_randomizer.stats import StatsAccumulator
+
+    rng = random.Random(4)
+    animals = [
+        AnimalRecord(f"A{i}", sex=rng.choice("MF"), weight=round(rng.uniform(200, 300), 1), cage=f"C{i % 5}")
+        for i in range(60)
+    ]
+    assignments = [AssignmentRecord(a.animal_id, f"G{i % 3}") for i, a in enumerate(animals)]
+
+    acc = StatsAccumulator()
+    for animal, row in zip(animals[:40], assignments[:40]):
+        acc.add(animal, row.group)
+    for animal, row in zip(animals[40:], assignments[40:]):
+        acc.add(animal, row.group)
+    stats, warnings = acc.result()
+    expected_stats, expected_warnings = compute_statistics(animals, assignments)
+    assert _rounded_close(stats, expected_stats)
+    assert warnings == expected_warnings
+
+    for animal, row in zip(animals[:30], assignments[:30]):
+        acc.remove(animal, row.group)
+    assert _rounded_close(acc.result()[0], compute_statistics(animals[30:], assignments[30:])[0])